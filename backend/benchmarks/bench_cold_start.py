@@ -0,0 +1,125 @@
+"""
+Cold-start benchmark for the API server.
+Starts `uvicorn main:app` in a fresh process and measures the time from
+process start to the first accepted /ws/conversation websocket, and to
+/health reporting ready (search structures built). The conversation
+upstream is a local stand-in, so only our own startup is measured.
+
+Usage (from the backend folder):
+    python benchmarks/bench_cold_start.py [--runs 5] [--app-dir /path/to/other/checkout/backend]
+
+--app-dir measures another checkout (e.g. before a change) with the same harness.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+import websockets
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _upstream(port: int) -> None:
+    """Stand-in ElevenLabs conversation websocket (sends the conversation ID only)."""
+    async def conversation(ws):
+        await ws.send(json.dumps({
+            "type": "conversation_initiation_metadata",
+            "conversation_initiation_metadata_event": {"conversation_id": "cold-start"}
+        }))
+        async for _ in ws:
+            pass
+
+    async def serve():
+        async with websockets.serve(conversation, "127.0.0.1", port):
+            await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+async def _first_websocket(url: str, deadline: float) -> float:
+    """Retry until a websocket is accepted; returns the perf_counter time it was."""
+    while time.perf_counter() < deadline:
+        try:
+            async with websockets.connect(url, open_timeout=2):
+                return time.perf_counter()
+        except (OSError, websockets.InvalidHandshake, asyncio.TimeoutError):
+            await asyncio.sleep(0.005)
+    raise TimeoutError("no websocket accepted")
+
+
+def _ready(port: int) -> bool:
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as response:
+            return json.loads(response.read()).get("ready", True)  # older builds have no flag: ready once up
+    except OSError:
+        return False
+
+
+def measure(app_dir: Path, port: int, env: dict, timeout: float = 60.0):
+    """One cold start; returns (ms to first websocket, ms to ready)."""
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=app_dir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        accepted = asyncio.run(_first_websocket(f"ws://127.0.0.1:{port}/ws/conversation", deadline))
+        while not _ready(port):
+            if time.perf_counter() > deadline:
+                raise TimeoutError("server never became ready")
+            time.sleep(0.005)
+        ready = time.perf_counter()
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return (accepted - start) * 1000, (ready - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API server cold start")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--app-dir", type=Path, default=BACKEND_DIR)
+    parser.add_argument("--port", type=int, default=8110)
+    parser.add_argument("--upstream-port", type=int, default=8109)
+    args = parser.parse_args()
+
+    env = {
+        **os.environ,
+        "ELEVENLABS_API_KEY": os.getenv("ELEVENLABS_API_KEY", "bench"),
+        "ELEVENLABS_AGENT_ID": os.getenv("ELEVENLABS_AGENT_ID", "bench-agent-id"),
+        "ELEVENLABS_WS_URL": f"ws://127.0.0.1:{args.upstream_port}",
+        "LOG_LEVEL": "WARNING",
+    }
+    upstream = multiprocessing.Process(target=_upstream, args=(args.upstream_port,), daemon=True)
+    upstream.start()
+
+    try:
+        accepted, ready = [], []
+        for _ in range(args.runs):
+            a, r = measure(args.app_dir, args.port, env)
+            accepted.append(a)
+            ready.append(r)
+    finally:
+        upstream.terminate()
+
+    print("\n" + "=" * 70)
+    print(f"  Cold start ({args.runs} runs, {args.app_dir})")
+    print("=" * 70 + "\n")
+    print(f"  {'':<28}{'median ms':>12}{'min ms':>10}{'max ms':>10}")
+    for label, values in (("first websocket accepted", accepted), ("/health ready", ready)):
+        print(f"  {label:<28}{statistics.median(values):>12.0f}{min(values):>10.0f}{max(values):>10.0f}")
+    print()
+
+
+if __name__ == "__main__":
+    main()
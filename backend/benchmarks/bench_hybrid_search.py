@@ -0,0 +1,92 @@
+"""
+Hybrid retrieval benchmark on a labelled query set.
+Reports recall@5 and latency for dense+rerank, hybrid without rerank,
+hybrid with adaptive rerank and hybrid with rerank on every query.
+
+Usage (from the backend folder):
+    python benchmarks/bench_hybrid_search.py [--queries benchmarks/data/labelled_queries.jsonl]
+
+Dense and rerank configurations need PINECONE_API_KEY; without it only the
+in-process BM25 configuration is measured.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pinecone_vdb.hybrid import BM25Index
+from pinecone_vdb.vector_search import VectorSearchEngine
+
+
+DEFAULT_QUERIES = Path(__file__).parent / "data" / "labelled_queries.jsonl"
+
+
+def load_queries(path: Path):
+    """Load {"query", "relevant"} rows."""
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def recall_at_k(results, relevant, k: int = 5) -> float:
+    """Share of relevant products found in the top k (capped at k relevant)."""
+    if not relevant:
+        return 1.0
+    found = {r.product_id for r in results[:k]}
+    return len(found & set(relevant)) / min(len(relevant), k)
+
+
+def run(label: str, search, queries) -> None:
+    """Run every query through search() and print recall@5 and latency percentiles."""
+    recalls, latencies = [], []
+    for row in queries:
+        start = time.perf_counter()
+        results = search(row["query"])
+        latencies.append((time.perf_counter() - start) * 1000)
+        recalls.append(recall_at_k(results, row["relevant"]))
+    latencies.sort()
+    p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+    print(
+        f"  {label:<28} recall@5 {statistics.mean(recalls):.3f}   "
+        f"p50 {statistics.median(latencies):8.2f} ms   p95 {p95:8.2f} ms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark hybrid BM25 + dense retrieval")
+    parser.add_argument("--queries", type=Path, default=DEFAULT_QUERIES, help="Labelled query set (JSON lines)")
+    parser.add_argument("--fusion", choices=["rrf", "weighted"], default="rrf")
+    args = parser.parse_args()
+
+    queries = load_queries(args.queries)
+    bm25 = BM25Index.from_csv()
+
+    print("\n" + "=" * 70)
+    print(f"  Hybrid retrieval benchmark ({len(queries)} labelled queries, fusion={args.fusion})")
+    print("=" * 70 + "\n")
+
+    run("bm25 only", lambda q: bm25.search(q, top_k=5), queries)
+
+    if not os.getenv("PINECONE_API_KEY"):
+        print("\n  ℹ️  PINECONE_API_KEY not set - skipping dense and rerank configurations\n")
+        return
+
+    engine = VectorSearchEngine(sparse_index=bm25)
+    run("dense + rerank (current)", lambda q: engine.search_with_reranking(q, top_k=20, top_n=5), queries)
+    run("dense only", lambda q: engine.semantic_search(q, top_k=5), queries)
+    run("hybrid, no rerank", lambda q: engine.hybrid_search(q, fusion=args.fusion, rerank="never"), queries)
+    run("hybrid, rerank always", lambda q: engine.hybrid_search(q, fusion=args.fusion, rerank="always"), queries)
+
+    engine.hybrid_stats.update(searches=0, rerank_calls=0, rerank_skipped=0)
+    run("hybrid, adaptive rerank", lambda q: engine.hybrid_search(q, fusion=args.fusion, rerank="auto"), queries)
+    stats = engine.hybrid_stats
+    print(f"\n  Adaptive: {stats['rerank_skipped']}/{stats['searches']} queries skipped the rerank call\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Replay benchmark for the lexical fast path.
+Runs a log of final transcripts through LexicalIndex and reports the share of
+turns that would be answered without touching the vector backend.
+
+Usage (from the backend folder):
+    python benchmarks/bench_lexical_fast_path.py [--log benchmarks/data/replay_transcripts.txt] [-v]
+
+The log is one transcript per line, or JSON lines with a "transcript" field.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pinecone_vdb.lexical_index import LexicalIndex
+
+
+DEFAULT_LOG = Path(__file__).parent / "data" / "replay_transcripts.txt"
+
+
+def read_transcripts(path: Path):
+    """Read transcripts from a plain-text or JSON-lines replay log."""
+    transcripts = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                transcript = json.loads(line).get("transcript")
+                if transcript:
+                    transcripts.append(transcript)
+            else:
+                transcripts.append(line)
+    return transcripts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure lexical fast-path coverage on a replay log")
+    parser.add_argument("--log", type=Path, default=DEFAULT_LOG, help="Replay log path")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Print every lookup")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = LexicalIndex.from_csv()
+    build_ms = (time.perf_counter() - start) * 1000
+
+    transcripts = read_transcripts(args.log)
+    timings = []
+    for transcript in transcripts:
+        match = index.lookup(transcript)
+        timings.append(match.elapsed_ms)
+        if args.verbose:
+            names = ", ".join(r.item_name for r in match.results) or "-"
+            flag = "⚡" if match.confident else "  "
+            print(f"{flag} [{match.method:<5} {match.confidence:.2f}] {transcript!r} -> {names}")
+
+    stats = index.stats
+    print("\n" + "=" * 70)
+    print("  Lexical fast-path replay")
+    print("=" * 70)
+    print(f"\n  Index build:        {build_ms:.1f} ms ({len(index)} products)")
+    print(f"  Turns replayed:     {stats.lookups}")
+    print(f"  Served by fast path: {stats.fast_path} ({stats.fast_path_ratio:.1%})")
+    for method, count in sorted(stats.by_method.items()):
+        print(f"    {method:<8} {count}")
+    if timings:
+        ordered = sorted(timings)
+        p99 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))]
+        print(f"  Lookup latency:     p50 {statistics.median(ordered) * 1000:.0f} µs, p99 {p99 * 1000:.0f} µs\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+CPU throughput benchmark for the local rerank stage.
+Compares scoring each request on its own against micro-batching requests
+from concurrent callers, and reports pairs/sec.
+
+Usage (from the backend folder):
+    python benchmarks/bench_local_rerank.py [--scorer local|lexical] [--sessions 1 8 32]
+
+--scorer local needs sentence-transformers; lexical runs anywhere.
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pinecone_vdb.catalog import load_catalog
+from pinecone_vdb.local_rerank import (
+    CrossEncoderScorer,
+    LexicalOverlapScorer,
+    LocalRerankStage,
+    DEFAULT_CROSS_ENCODER,
+)
+
+QUERIES = [
+    "Where can I find organic oranges?", "decaf coffee", "something for a headache",
+    "gluten free pasta", "dry dog food", "chocolate ice cream", "greek yogurt", "dish soap",
+]
+
+
+def run_sessions(stage: LocalRerankStage, products, sessions: int, requests_per_session: int, candidates: int) -> float:
+    """Run concurrent sessions of rerank requests; return pairs/sec."""
+    rng = random.Random(7)
+    workloads = [
+        [(rng.choice(QUERIES), rng.sample(products, candidates)) for _ in range(requests_per_session)]
+        for _ in range(sessions)
+    ]
+
+    def session(work):
+        for query, batch in work:
+            stage.rerank(query, batch, top_n=5)
+
+    threads = [threading.Thread(target=session, args=(work,)) for work in workloads]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return sessions * requests_per_session * candidates / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark local rerank pairs/sec on CPU")
+    parser.add_argument("--scorer", choices=["local", "lexical"], default="lexical")
+    parser.add_argument("--model", default=DEFAULT_CROSS_ENCODER)
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=20, help="Requests per session")
+    parser.add_argument("--candidates", type=int, default=20, help="Pairs per request (first-stage top_k)")
+    parser.add_argument("--window-ms", type=float, default=5.0)
+    parser.add_argument("--max-batch", type=int, default=256)
+    args = parser.parse_args()
+
+    products = load_catalog()
+    scorer = CrossEncoderScorer(args.model) if args.scorer == "local" else LexicalOverlapScorer()
+
+    print("\n" + "=" * 70)
+    print(f"  Local rerank throughput (scorer={getattr(scorer, 'model_name', args.scorer)})")
+    print("=" * 70 + "\n")
+
+    for sessions in args.sessions:
+        # window_ms=0 and max_batch=1 pair-request: every request is its own forward pass
+        unbatched = LocalRerankStage(scorer, window_ms=0, max_batch=1)
+        batched = LocalRerankStage(scorer, window_ms=args.window_ms, max_batch=args.max_batch)
+        per_request = run_sessions(unbatched, products, sessions, args.requests, args.candidates)
+        micro = run_sessions(batched, products, sessions, args.requests, args.candidates)
+        stats = batched.batcher.stats
+        avg_batch = stats["pairs"] / stats["batches"] if stats["batches"] else 0
+        print(
+            f"  {sessions:>3} sessions   per-request {per_request:>10,.0f} pairs/s   "
+            f"micro-batched {micro:>10,.0f} pairs/s   avg batch {avg_batch:.0f} pairs"
+        )
+        unbatched.close()
+        batched.close()
+    print()
+
+
+if __name__ == "__main__":
+    main()
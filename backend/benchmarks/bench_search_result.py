@@ -0,0 +1,119 @@
+"""
+Microbenchmark for SearchResult construction and hit parsing.
+Compares the previous dict-backed dataclass + probing parser against the
+slotted result types and the single-pass parse_hits.
+
+Usage (from the backend folder):
+    python benchmarks/bench_search_result.py
+"""
+
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pinecone_vdb.vector_search import parse_hits, SearchResult, FrozenSearchResult
+
+
+@dataclass
+class LegacySearchResult:
+    """The original (pre-slots) SearchResult, kept here as the baseline."""
+    product_id: int
+    item_name: str
+    category: str
+    description: str
+    aisle_location: str
+    score: float
+    chunk_text: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "product_id": self.product_id,
+            "item_name": self.item_name,
+            "category": self.category,
+            "description": self.description,
+            "aisle_location": self.aisle_location,
+            "score": self.score,
+            "chunk_text": self.chunk_text
+        }
+
+
+def legacy_parse_hits(hits):
+    """The original _parse_hits, kept here as the baseline."""
+    results = []
+    for i, hit in enumerate(hits):
+        fields = hit.get('fields', {}) if hasattr(hit, 'get') else hit.get('fields', {}) if isinstance(hit, dict) else {}
+        if not fields and hasattr(hit, '__getitem__'):
+            fields = hit['fields'] if 'fields' in hit else {}
+        result = LegacySearchResult(
+            product_id=int(fields.get('product_id', 0)) if fields.get('product_id') else 0,
+            item_name=fields.get('item_name', ''),
+            category=fields.get('category', ''),
+            description=fields.get('description', ''),
+            aisle_location=fields.get('aisle_location', ''),
+            score=hit.get('_score', 0.0) if hasattr(hit, 'get') else hit['_score'] if '_score' in hit else 0.0,
+            chunk_text=fields.get('chunk_text', '')
+        )
+        results.append(result)
+    return results
+
+
+def make_hits(count: int):
+    """Build Pinecone-shaped dict hits."""
+    return [
+        {
+            "_id": f"prod_{i}",
+            "_score": 1.0 / (i + 1),
+            "fields": {
+                "product_id": i,
+                "item_name": f"Product {i}",
+                "category": "Produce",
+                "description": "Fresh and tasty",
+                "aisle_location": "A1",
+                "chunk_text": f"Product {i} in Produce. Fresh and tasty Located in aisle A1.",
+            },
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def bench(label: str, fn, hits, rounds: int) -> None:
+    """Run fn(hits) for the given rounds and print results/sec."""
+    fn(hits)  # warm up
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn(hits)
+    elapsed = time.perf_counter() - start
+    per_sec = len(hits) * rounds / elapsed
+    print(f"  {label:<38} {per_sec:>14,.0f} results/sec")
+
+
+def main():
+    hits = make_hits(20)  # one search_with_reranking(top_k=20) worth of hits
+    rounds = 20000
+
+    print("\n" + "=" * 70)
+    print("  SearchResult / _parse_hits microbenchmark")
+    print("=" * 70 + "\n")
+
+    print("Parsing:")
+    bench("legacy _parse_hits", legacy_parse_hits, hits, rounds)
+    bench("parse_hits -> SearchResult", lambda h: parse_hits(h, SearchResult), hits, rounds)
+    bench("parse_hits -> FrozenSearchResult", lambda h: parse_hits(h, FrozenSearchResult), hits, rounds)
+
+    print("\nParsing + to_dict:")
+    bench("legacy", lambda h: [r.to_dict() for r in legacy_parse_hits(h)], hits, rounds)
+    bench("slotted", lambda h: [r.to_dict() for r in parse_hits(h)], hits, rounds)
+
+    print("\nInstance size (sys.getsizeof, incl. __dict__ where present):")
+    legacy = legacy_parse_hits(hits[:1])[0]
+    slotted = parse_hits(hits[:1])[0]
+    print(f"  legacy:  {sys.getsizeof(legacy) + sys.getsizeof(legacy.__dict__)} bytes")
+    print(f"  slotted: {sys.getsizeof(slotted)} bytes\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Concurrent-session scaling benchmark for cluster.py.
+Starts a local stand-in for the ElevenLabs conversation websocket (it answers
+every user audio chunk with an agent audio event of the same size), then for
+each worker count runs the cluster and drives /ws/conversation sessions
+through the sticky router. Each session sends a 100 ms audio frame and waits
+for the relayed answer, in a closed loop, so the relay (JSON, base64 and
+websocket framing in the workers) is the bottleneck.
+
+Usage (from the backend folder):
+    python benchmarks/bench_workers.py [--workers 1 2 4] [--sessions 64] [--seconds 10]
+
+Scaling is bounded by the cores left for the clients and the stand-in;
+on a box with fewer cores than workers the curve flattens.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import websockets
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+FRAME = bytes(3200)  # 100 ms of 16 kHz 16-bit mono audio
+
+
+def _upstream(port: int) -> None:
+    """Stand-in ElevenLabs conversation websocket."""
+    async def conversation(ws):
+        await ws.send(json.dumps({
+            "type": "conversation_initiation_metadata",
+            "conversation_initiation_metadata_event": {"conversation_id": f"bench-{id(ws)}"}
+        }))
+        event_id = 0
+        async for message in ws:
+            data = json.loads(message)
+            if "user_audio_chunk" in data:
+                event_id += 1
+                await ws.send(json.dumps({
+                    "type": "audio",
+                    "audio_event": {"audio_base_64": data["user_audio_chunk"], "event_id": event_id}
+                }))
+
+    async def serve():
+        async with websockets.serve(conversation, "127.0.0.1", port, compression=None, max_queue=None):
+            await asyncio.Event().wait()
+
+    asyncio.run(serve())
+
+
+def _clients(url: str, kiosks: list, seconds: float, results) -> None:
+    """Closed-loop sessions; puts (round trips, latencies in ms) on results."""
+    async def session(kiosk: str, deadline: float, latencies: list) -> int:
+        rounds = 0
+        async with websockets.connect(f"{url}?kiosk={kiosk}", compression=None, max_size=None) as ws:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                await ws.send(FRAME)
+                while True:
+                    message = json.loads(await ws.recv())
+                    if message.get("type") == "audio":
+                        break
+                latencies.append((time.perf_counter() - start) * 1000)
+                rounds += 1
+        return rounds
+
+    async def run():
+        latencies = []
+        deadline = time.perf_counter() + seconds
+        counts = await asyncio.gather(*[session(k, deadline, latencies) for k in kiosks], return_exceptions=True)
+        failed = sum(isinstance(c, Exception) for c in counts)
+        results.put((sum(c for c in counts if isinstance(c, int)), latencies, failed))
+
+    asyncio.run(run())
+
+
+def _wait_for_port(port: int, timeout: float = 90.0) -> bool:
+    import socket
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with socket.socket() as s:
+            if s.connect_ex(("127.0.0.1", port)) == 0:
+                return True
+        time.sleep(0.2)
+    return False
+
+
+def run_point(workers: int, sessions: int, seconds: float, client_processes: int, port: int, env: dict):
+    """Run the cluster with `workers` and return (round trips/sec, p50 ms, p99 ms, failed sessions)."""
+    cluster = subprocess.Popen(
+        [sys.executable, "cluster.py", "--workers", str(workers), "--host", "127.0.0.1",
+         "--port", str(port), "--artifacts", env["BENCH_ARTIFACTS"],
+         "--cache-socket", env["BENCH_CACHE_SOCKET"]],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        if not _wait_for_port(port):
+            raise RuntimeError("cluster did not start")
+        time.sleep(1.0)  # workers finish starting after the router is up
+        results = multiprocessing.Queue()
+        kiosks = [f"kiosk-{i}" for i in range(sessions)]
+        procs = [
+            multiprocessing.Process(
+                target=_clients,
+                args=(f"ws://127.0.0.1:{port}/ws/conversation", kiosks[i::client_processes], seconds, results)
+            )
+            for i in range(client_processes)
+        ]
+        for p in procs:
+            p.start()
+        rounds, latencies, failed = 0, [], 0
+        for _ in procs:
+            r, lat, f = results.get()
+            rounds += r
+            latencies.extend(lat)
+            failed += f
+        for p in procs:
+            p.join()
+    finally:
+        cluster.terminate()
+        cluster.wait(timeout=30)
+    if not latencies:
+        return 0.0, 0.0, 0.0, failed
+    latencies.sort()
+    return (
+        rounds / seconds,
+        statistics.median(latencies),
+        latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))],
+        failed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent sessions vs worker count")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--sessions", type=int, default=64)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 2) // 4))
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--upstream-port", type=int, default=8099)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp(prefix="storepal-bench-")
+    env = {
+        **os.environ,
+        "ELEVENLABS_API_KEY": os.getenv("ELEVENLABS_API_KEY", "bench"),
+        "ELEVENLABS_AGENT_ID": os.getenv("ELEVENLABS_AGENT_ID", "bench-agent-id"),
+        "ELEVENLABS_WS_URL": f"ws://127.0.0.1:{args.upstream_port}",
+        "PINECONE_API_KEY": "",
+        "LOG_LEVEL": "WARNING",
+        "BENCH_ARTIFACTS": str(Path(tmp) / "artifacts"),
+        "BENCH_CACHE_SOCKET": str(Path(tmp) / "cache.sock"),
+    }
+
+    upstream = multiprocessing.Process(target=_upstream, args=(args.upstream_port,), daemon=True)
+    upstream.start()
+    if not _wait_for_port(args.upstream_port):
+        print("❌ Stand-in upstream did not start")
+        sys.exit(1)
+
+    print("\n" + "=" * 70)
+    print(f"  Concurrent sessions vs workers ({args.sessions} sessions, {args.seconds:.0f} s, {os.cpu_count()} cores)")
+    print("=" * 70 + "\n")
+    print(f"  {'workers':>8}{'frames/s':>12}{'speedup':>10}{'p50 ms':>10}{'p99 ms':>10}{'failed':>8}")
+    baseline = None
+    try:
+        for workers in args.workers:
+            rate, p50, p99, failed = run_point(
+                workers, args.sessions, args.seconds, args.client_processes, args.port, env
+            )
+            baseline = baseline or rate
+            speedup = rate / baseline if baseline else 0.0
+            print(f"  {workers:>8}{rate:>12.0f}{speedup:>9.2f}x{p50:>10.1f}{p99:>10.1f}{failed:>8}")
+    finally:
+        upstream.terminate()
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,18 @@
+"""Agent-facing formatting of search results."""
+
+import pytest
+
+from conftest import synthetic_catalog
+
+
+@pytest.mark.parametrize("count", [0, 1, 5, 20])
+def test_format_results_for_agent(benchmark, canned_engine, count):
+    results = synthetic_catalog("1k")[:count]
+    text = benchmark(canned_engine.format_results_for_agent, results)
+    assert text
+
+
+@pytest.mark.parametrize("style", ["verbose", "terse", "voice"])
+def test_render_results_for_agent(benchmark, canned_engine, style):
+    results = synthetic_catalog("1k")[:5]
+    assert benchmark(canned_engine.render_results_for_agent, results, style).found
@@ -0,0 +1,26 @@
+"""Product-intent matching (ElevenLabsAgent.should_search_products) over replay transcripts."""
+
+from pathlib import Path
+
+import pytest
+
+TRANSCRIPTS = Path(__file__).resolve().parent.parent / "data" / "replay_transcripts.txt"
+
+
+@pytest.fixture
+def agent(app_module, canned_engine, monkeypatch):
+    monkeypatch.setattr(app_module, "vector_search", canned_engine)
+    return app_module.ElevenLabsAgent()
+
+
+def test_should_search_products(benchmark, agent):
+    transcripts = [line.strip() for line in TRANSCRIPTS.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+    def classify():
+        return sum(agent.should_search_products(t) for t in transcripts)
+    assert benchmark(classify) > 0
+
+
+def test_should_search_products_miss(benchmark, agent):
+    # Small talk checks every keyword before answering no
+    assert not benchmark(agent.should_search_products, "thanks so much, bye")
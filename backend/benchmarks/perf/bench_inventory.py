@@ -0,0 +1,49 @@
+"""Inventory endpoints: /api/inventory body serialization and compression, /api/aisles-categories."""
+
+import pytest
+
+from bench_prepare_records import catalog_frame
+
+
+@pytest.fixture
+def inventory_csv(app_module, catalog_size, tmp_path, monkeypatch):
+    path = tmp_path / f"inventory_{catalog_size}.csv"
+    catalog_frame(catalog_size).to_csv(path, index=False)
+    monkeypatch.setattr(app_module, "INVENTORY_CSV", str(path))
+    monkeypatch.setattr(app_module, "_inventory", {"mtime": None, "records": None, "payloads": {}})
+    return path
+
+
+def serialize_inventory(app_module) -> bytes:
+    # Done once per file version in the server (the body is then served from memory)
+    app_module._inventory["payloads"] = {}
+    return app_module.inventory_payload("inventory").body
+
+
+def test_inventory_payload_build(run_sized, app_module, inventory_csv):
+    app_module.inventory_records()  # parsed at warm-up in the server
+    body = run_sized(serialize_inventory, app_module)
+    assert body.startswith(b"[{")
+
+
+def test_inventory_gzip(run_sized, app_module, inventory_csv):
+    # Per-request level (static bodies are compressed once, at the best level, and cached)
+    body = app_module.inventory_payload("inventory").body
+    compressed = run_sized(app_module.compressor.encode, body, "gzip")
+    assert len(compressed) < len(body)
+
+
+def test_inventory_parse(run_sized, app_module, inventory_csv):
+    def parse():
+        app_module._inventory["mtime"] = None
+        return app_module.inventory_records()
+    assert run_sized(parse)
+
+
+def test_aisles_categories_payload_build(run_sized, app_module, inventory_csv):
+    app_module.inventory_records()
+
+    def build():
+        app_module._inventory["payloads"] = {}
+        return app_module.inventory_payload("aisles_categories").body
+    assert run_sized(build).startswith(b'{"aisles":[')
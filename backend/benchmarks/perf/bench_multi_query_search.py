@@ -0,0 +1,13 @@
+"""multi_query_search: per-query searches against the canned index, then dedup and sort."""
+
+import pytest
+
+QUERIES = ["healthy food", "organic", "fresh", "natural", "breakfast cereal"]
+
+
+@pytest.mark.parametrize("top_k_per_query", [3, 20, 200])
+def test_multi_query_search(benchmark, canned_engine, top_k_per_query):
+    results = benchmark(canned_engine.multi_query_search, QUERIES, top_k_per_query)
+    ids = [r.product_id for r in results]
+    assert len(ids) == len(set(ids))
+    assert all(a.score >= b.score for a, b in zip(results, results[1:]))
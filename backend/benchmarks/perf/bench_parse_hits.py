@@ -0,0 +1,24 @@
+"""Hit parsing: a typical 20-hit response, and whole-catalog responses."""
+
+import pytest
+
+from conftest import as_hit, synthetic_catalog
+from pinecone_vdb.vector_search import FrozenSearchResult, SearchResult, parse_hits
+
+
+@pytest.mark.parametrize("result_type", [SearchResult, FrozenSearchResult], ids=["mutable", "frozen"])
+def test_parse_hits_20(benchmark, result_type):
+    hits = [as_hit(p) for p in synthetic_catalog("1k")[:20]]
+    results = benchmark(parse_hits, hits, result_type)
+    assert len(results) == 20
+
+
+def test_parse_hits_catalog(run_sized, catalog_size):
+    hits = [as_hit(p) for p in synthetic_catalog(catalog_size)]
+    results = run_sized(parse_hits, hits)
+    assert len(results) == len(hits)
+
+
+def test_engine_parse_hits_20(benchmark, canned_engine):
+    hits = [as_hit(p) for p in synthetic_catalog("1k")[:20]]
+    assert len(benchmark(canned_engine._parse_hits, hits)) == 20
@@ -0,0 +1,31 @@
+"""Upload record preparation (upload_data.prepare_records) over synthetic catalogs."""
+
+import contextlib
+import io
+
+import pandas as pd
+
+from conftest import synthetic_catalog
+from pinecone_vdb.upload_data import prepare_records
+
+
+def catalog_frame(catalog_size: str) -> pd.DataFrame:
+    rows = synthetic_catalog(catalog_size)
+    return pd.DataFrame({
+        "id": [p.product_id for p in rows],
+        "item_name": [p.item_name for p in rows],
+        "category": [p.category for p in rows],
+        "description": [p.description for p in rows],
+        "aisle_location": [p.aisle_location for p in rows],
+    })
+
+
+def quiet_prepare_records(df):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return prepare_records(df)
+
+
+def test_prepare_records(run_sized, catalog_size):
+    df = catalog_frame(catalog_size)
+    records = run_sized(quiet_prepare_records, df)
+    assert len(records) == len(df)
@@ -0,0 +1,144 @@
+"""
+pytest-benchmark suite for the search and inventory hot paths.
+Runs against a canned in-process index and synthetic catalogs of 1k, 100k
+and 1M rows (the real inventory repeated with numbered variants), so no
+Pinecone account or network is needed.
+
+Usage (from the backend folder):
+    python -m pytest benchmarks/perf                                   # run
+    python -m pytest benchmarks/perf --benchmark-save=baseline         # store a baseline
+    python -m pytest benchmarks/perf --benchmark-compare --benchmark-compare-fail=median:15%
+    python -m pytest benchmarks/perf --catalog-sizes 1k,100k           # skip the 1M catalog
+
+Baselines are stored per machine under benchmarks/perf/baselines; compare
+against a baseline recorded on the same machine.
+"""
+
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+BASELINES_DIR = Path(__file__).resolve().parent / "baselines"
+sys.path.insert(0, str(BACKEND_DIR))
+
+# main.py checks its credentials at import; the suite never connects upstream
+os.environ.setdefault("ELEVENLABS_API_KEY", "bench")
+os.environ.setdefault("ELEVENLABS_AGENT_ID", "bench-agent-id")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["WARMUP"] = "0"
+os.environ.pop("QUERY_LOG", None)
+
+from pinecone_vdb.catalog import load_catalog
+from pinecone_vdb.vector_search import SearchResult, VectorSearchEngine
+
+SIZES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+# (rounds, warm-up rounds) for the catalog-sized benchmarks: the default
+# calibration would run the 1M catalog for minutes
+ROUNDS = {"1k": (50, 2), "100k": (5, 1), "1m": (2, 0)}
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--catalog-sizes", default="1k,100k,1m",
+        help="Synthetic catalog sizes to run, comma-separated (1k, 100k, 1m)"
+    )
+
+
+def pytest_configure(config):
+    # Keep baselines next to the suite rather than in the working directory
+    if config.getoption("benchmark_storage") == "file://./.benchmarks":
+        config.option.benchmark_storage = f"file://{BASELINES_DIR}"
+
+
+def pytest_generate_tests(metafunc):
+    if "catalog_size" in metafunc.fixturenames:
+        sizes = [s.strip().lower() for s in metafunc.config.getoption("catalog_sizes").split(",") if s.strip()]
+        unknown = [s for s in sizes if s not in SIZES]
+        if unknown:
+            raise pytest.UsageError(f"Unknown catalog size(s) {unknown}. Expected some of {', '.join(SIZES)}")
+        metafunc.parametrize("catalog_size", sizes)
+
+
+@lru_cache(maxsize=None)
+def synthetic_catalog(size: str) -> List[SearchResult]:
+    """The real inventory repeated to `size` rows, names and ids made unique."""
+    base = load_catalog()
+    rows = []
+    for i in range(SIZES[size]):
+        product = base[i % len(base)]
+        copy = i // len(base)
+        name = f"{product.item_name} #{copy}" if copy else product.item_name
+        rows.append(SearchResult(
+            i + 1, name, product.category, product.description, product.aisle_location,
+            1.0 - (i % 997) / 997, product.chunk_text
+        ))
+    return rows
+
+
+def as_hit(product: SearchResult) -> Dict[str, Any]:
+    """A Pinecone search hit (dict form) for a catalog row."""
+    return {
+        "_id": f"prod_{product.product_id}",
+        "_score": product.score,
+        "fields": {
+            "product_id": product.product_id,
+            "item_name": product.item_name,
+            "category": product.category,
+            "description": product.description,
+            "aisle_location": product.aisle_location,
+            "chunk_text": product.chunk_text,
+        },
+    }
+
+
+class CannedIndex:
+    """Index stand-in: every search returns the next top_k hits from a fixed list."""
+
+    def __init__(self, hits: List[Dict[str, Any]]):
+        self.hits = hits
+        self._offset = 0
+
+    def search(self, namespace: str, query: Dict[str, Any], rerank=None, **kwargs) -> Dict[str, Any]:
+        top_k = (rerank or {}).get("top_n") or query.get("top_k", 10)
+        start = self._offset
+        self._offset = (self._offset + max(1, top_k // 2)) % max(1, len(self.hits) - top_k)
+        return {"result": {"hits": self.hits[start:start + top_k]}}
+
+
+class CannedClient:
+    """pinecone.Pinecone stand-in holding one CannedIndex."""
+
+    def __init__(self, hits: List[Dict[str, Any]]):
+        self._index = CannedIndex(hits)
+        self.inference = None
+
+    def Index(self, name: str) -> CannedIndex:
+        return self._index
+
+
+@pytest.fixture(scope="session")
+def canned_engine() -> VectorSearchEngine:
+    """VectorSearchEngine over overlapping canned hits from the 1k catalog."""
+    hits = [as_hit(p) for p in synthetic_catalog("1k")]
+    return VectorSearchEngine(client=CannedClient(hits))
+
+
+@pytest.fixture(scope="session")
+def app_module():
+    import main
+    return main
+
+
+@pytest.fixture
+def run_sized(benchmark, catalog_size):
+    """Benchmark fn(*args) with a round count suited to the catalog size."""
+    rounds, warmup_rounds = ROUNDS[catalog_size]
+
+    def run(fn, *args):
+        return benchmark.pedantic(fn, args=args, rounds=rounds, iterations=1, warmup_rounds=warmup_rounds)
+    return run
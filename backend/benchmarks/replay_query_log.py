@@ -0,0 +1,227 @@
+"""
+Offline replay of a query log through the search stack.
+Every turn goes through main.py's own should_search_products and
+search_products (lexical fast path, query variants, SEARCH_MODE retrieval
+and rendering) against the chosen backend, at a fixed concurrency, and the
+run is compared against a baseline: a saved earlier run, or the answers
+recorded in the log itself.
+
+Usage (from the backend folder):
+    python benchmarks/replay_query_log.py --log query_log.jsonl --backend pinecone --concurrency 8
+    python benchmarks/replay_query_log.py --backend standin --save runs/before.json
+    python benchmarks/replay_query_log.py --backend standin --baseline runs/before.json --max-slowdown 1.1 --min-overlap 0.95
+
+Backends:
+    pinecone   the real index (needs PINECONE_API_KEY)
+    local      in-process BM25 index (pinecone_vdb/local_backend.py), no added latency
+    standin    local index plus simulated round trips (--latency-ms, --rerank-latency-ms)
+
+--log also accepts plain text transcripts (default: benchmarks/data/replay_transcripts.txt).
+The gate flags exit with status 1 when the run regresses against the baseline.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from pinecone_vdb.query_log import CURRENT_TURN, QueryTurn, read_log
+
+DEFAULT_LOG = Path(__file__).parent / "data" / "replay_transcripts.txt"
+
+
+class CountingProxy:
+    """Wraps a client object and counts backend round trips against the current turn."""
+
+    def __init__(self, target, methods, counts: Counter):
+        self._target = target
+        self._methods = methods
+        self._counts = counts
+
+    def __getattr__(self, name):
+        value = getattr(self._target, name)
+        if name not in self._methods:
+            return value
+
+        def call(*args, **kwargs):
+            turn = CURRENT_TURN.get()
+            if turn is not None:
+                self._counts[id(turn)] += 1
+            return value(*args, **kwargs)
+        return call
+
+
+def build_engine(args, counts: Counter):
+    from pinecone_vdb.vector_search import VectorSearchEngine
+    from pinecone_vdb.hybrid import BM25Index
+    from pinecone_vdb.local_backend import LocalClient
+
+    client = None
+    if args.backend == "local":
+        client = LocalClient()
+    elif args.backend == "standin":
+        client = LocalClient(latency_ms=args.latency_ms, rerank_latency_ms=args.rerank_latency_ms)
+    sparse_index = BM25Index.from_csv() if args.mode == "hybrid" else None
+    engine = VectorSearchEngine(sparse_index=sparse_index, client=client)
+    engine.index = CountingProxy(engine.index, {"search", "query"}, counts)
+    engine.pc.inference = CountingProxy(engine.pc.inference, {"rerank"}, counts)
+    return engine
+
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))] if ordered else 0.0
+
+
+def overlap(answer, expected) -> float:
+    """Shared products over the larger of the two answers (1.0 when both are empty)."""
+    if not answer and not expected:
+        return 1.0
+    return len(set(answer) & set(expected)) / max(len(answer), len(expected))
+
+
+async def replay(main, turns, concurrency: int, counts: Counter):
+    """Run every turn through the agent; returns (per-turn outcomes, wall seconds)."""
+    agent = main.ElevenLabsAgent()
+    outcomes = [None] * len(turns)
+    pending = asyncio.Queue()
+    for position, turn in enumerate(turns):
+        pending.put_nowait((position, turn))
+
+    async def worker():
+        while not pending.empty():
+            position, record = pending.get_nowait()
+            turn = QueryTurn("replay", record["q"])
+            CURRENT_TURN.set(turn)
+            started = time.perf_counter()
+            searched = agent.should_search_products(record["q"])
+            answer = await agent.search_products(record["q"]) if searched else None
+            outcomes[position] = {
+                "q": record["q"],
+                "s": int(searched),
+                "p": turn.path,
+                "ms": (time.perf_counter() - started) * 1000,
+                "search_calls": len(turn.calls),
+                "backend_calls": counts.pop(id(turn), 0),
+                "r": [r.product_id for r in answer.items] if answer else [],
+            }
+            CURRENT_TURN.set(None)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    return outcomes, time.perf_counter() - started
+
+
+def summarize(outcomes, seconds: float):
+    searched = [o for o in outcomes if o["s"]]
+    latencies = [o["ms"] for o in searched]
+    return {
+        "turns": len(outcomes),
+        "search_turns": len(searched),
+        "turns_per_s": len(outcomes) / seconds if seconds else 0.0,
+        "p50_ms": statistics.median(latencies) if latencies else 0.0,
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": max(latencies, default=0.0),
+        "search_calls_per_turn": statistics.mean(o["search_calls"] for o in searched) if searched else 0.0,
+        "backend_calls_per_turn": statistics.mean(o["backend_calls"] for o in searched) if searched else 0.0,
+        "paths": dict(Counter(o["p"] for o in outcomes)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a query log through the search stack")
+    parser.add_argument("--log", type=Path, default=DEFAULT_LOG, help="Query log (JSON lines) or transcripts (text)")
+    parser.add_argument("--backend", choices=["pinecone", "local", "standin"], default="standin")
+    parser.add_argument("--mode", choices=["rerank", "hybrid", "adaptive"], default=os.getenv("SEARCH_MODE", "rerank"))
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the log this many times")
+    parser.add_argument("--latency-ms", type=float, default=80.0, help="standin: simulated index round trip")
+    parser.add_argument("--rerank-latency-ms", type=float, default=60.0, help="standin: simulated rerank cost")
+    parser.add_argument("--answer-cache", action="store_true", help="Keep the rendered answer cache on")
+    parser.add_argument("--baseline", type=Path, help="Saved run to compare against (default: answers in the log)")
+    parser.add_argument("--save", type=Path, help="Write this run (summary and per-turn answers) as JSON")
+    parser.add_argument("--max-slowdown", type=float, help="Fail if p95 exceeds the baseline p95 by this factor")
+    parser.add_argument("--min-overlap", type=float, help="Fail if mean answer overlap with the baseline is lower")
+    args = parser.parse_args()
+
+    # main.py reads its configuration at import
+    os.environ["SEARCH_MODE"] = args.mode
+    os.environ.setdefault("ELEVENLABS_API_KEY", "replay")
+    os.environ.setdefault("ELEVENLABS_AGENT_ID", "replay-agent-id")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    for name in ("QUERY_LOG", "SHARED_CACHE_SOCKET"):
+        os.environ.pop(name, None)
+    os.chdir(BACKEND_DIR)
+    import main as app
+    from pinecone_vdb.catalog import load_catalog
+    from pinecone_vdb.lexical_index import LexicalIndex
+    from pinecone_vdb.warmup import AnswerCache
+
+    turns = list(read_log(args.log)) * args.repeat
+    counts: Counter = Counter()
+    app.vector_search = build_engine(args, counts)
+    app.lexical_index = LexicalIndex(load_catalog())
+    if not args.answer_cache:
+        app.answer_cache = AnswerCache(ttl=0)
+
+    outcomes, seconds = asyncio.run(replay(app, turns, args.concurrency, counts))
+    summary = summarize(outcomes, seconds)
+
+    baseline_summary, expected = None, None
+    if args.baseline:
+        saved = json.loads(args.baseline.read_text())
+        baseline_summary = saved["summary"]
+        expected = [t["r"] for t in saved["turns"]]
+    elif all("r" in t for t in turns):
+        expected = [t["r"] for t in turns]
+    if expected is not None and len(expected) == len(outcomes):
+        compared = [overlap(o["r"], e) for o, e in zip(outcomes, expected)]
+        summary["overlap"] = statistics.mean(compared) if compared else 1.0
+        summary["identical_answers"] = sum(1 for o, e in zip(outcomes, expected) if o["r"] == e) / len(compared)
+
+    print("\n" + "=" * 70)
+    print(f"  Query log replay ({len(turns)} turns, backend={args.backend}, mode={args.mode}, concurrency={args.concurrency})")
+    print("=" * 70 + "\n")
+    print(f"  {'':<26}{'this run':>14}{'baseline':>14}")
+    rows = [
+        ("turns/s", "turns_per_s", "{:.1f}"),
+        ("p50 ms (search turns)", "p50_ms", "{:.1f}"),
+        ("p95 ms", "p95_ms", "{:.1f}"),
+        ("p99 ms", "p99_ms", "{:.1f}"),
+        ("search calls / turn", "search_calls_per_turn", "{:.2f}"),
+        ("backend calls / turn", "backend_calls_per_turn", "{:.2f}"),
+    ]
+    for label, key, fmt in rows:
+        base = fmt.format(baseline_summary[key]) if baseline_summary else "-"
+        print(f"  {label:<26}{fmt.format(summary[key]):>14}{base:>14}")
+    print(f"\n  search turns: {summary['search_turns']}/{summary['turns']}   paths: {summary['paths']}")
+    if "overlap" in summary:
+        print(f"  answer overlap vs baseline: {summary['overlap']:.3f} (identical {summary['identical_answers']:.1%})")
+    print()
+
+    if args.save:
+        args.save.parent.mkdir(parents=True, exist_ok=True)
+        args.save.write_text(json.dumps({"summary": summary, "turns": outcomes}, indent=1))
+        print(f"✅ Run saved to {args.save}")
+
+    failures = []
+    if args.max_slowdown and baseline_summary and summary["p95_ms"] > baseline_summary["p95_ms"] * args.max_slowdown:
+        failures.append(f"p95 {summary['p95_ms']:.1f} ms > {args.max_slowdown}x baseline {baseline_summary['p95_ms']:.1f} ms")
+    if args.min_overlap is not None and summary.get("overlap", 1.0) < args.min_overlap:
+        failures.append(f"answer overlap {summary['overlap']:.3f} < {args.min_overlap}")
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
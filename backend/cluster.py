@@ -0,0 +1,288 @@
+"""
+Multi-worker deployment for the StorePal API on one box.
+
+The supervisor builds the shared artifacts once (memory-mapped by every
+worker), runs the shared search cache, starts N uvicorn workers on
+consecutive ports and routes connections to them:
+
+- /ws/conversation upgrades are sticky: a kiosk (the `kiosk` query parameter,
+  else its IP address) always lands on the same worker, chosen by rendezvous
+  hashing, so only the kiosks of a worker that dies are moved. The
+  X-Forwarded-For address is used instead of the peer's only with
+  --trust-forwarded (the router sits behind a proxy that sets it)
+- other requests are stateless and go to the worker with the fewest open
+  connections
+- `?worker=N` pins a request to worker N, for per-process state: /metrics
+  scrapes (one job per worker, or scrape the worker ports directly), /health
+  and /admin/* profiling
+
+Routing is decided per TCP connection, so plain HTTP requests are forwarded
+with `Connection: close`: the worker closes the connection after the
+response, and the client's next request is routed on its own.
+
+Usage (from the backend folder):
+    python cluster.py --workers 4 --port 8000
+    python cluster.py --workers 4 --no-router     # workers only, behind nginx/haproxy
+    curl "http://localhost:8000/metrics?worker=2" # one worker's registry through the router
+"""
+
+import argparse
+import asyncio
+import hashlib
+import os
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from pinecone_vdb.artifacts import DEFAULT_DIR as DEFAULT_ARTIFACTS_DIR, open_artifacts
+from pinecone_vdb.recommendations import DEFAULT_PATH as DEFAULT_RECOMMENDATIONS_PATH
+from pinecone_vdb.shared_cache import SharedCacheServer
+
+BACKEND_DIR = Path(__file__).resolve().parent
+MAX_HEAD_BYTES = 16384
+
+
+class Worker:
+    """One uvicorn process serving main:app on its own port."""
+
+    def __init__(self, index: int, port: int, env: dict):
+        self.index = index
+        self.port = port
+        self.env = env
+        self.process: Optional[subprocess.Popen] = None
+        self.connections = 0
+        self.restarts = 0
+
+    def start(self) -> None:
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1",
+             "--port", str(self.port), "--log-level", "warning"],
+            cwd=BACKEND_DIR,
+            env={**self.env, "WORKER_ID": str(self.index)},
+        )
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.poll() is None
+
+    async def wait_ready(self, timeout: float = 60.0) -> bool:
+        """Wait until the worker accepts connections."""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline and self.alive:
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", self.port)
+                writer.close()
+                return True
+            except OSError:
+                await asyncio.sleep(0.1)
+        return False
+
+    def stop(self) -> None:
+        if self.alive:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def sticky_worker(key: str, workers: List[Worker]) -> Worker:
+    """Rendezvous (highest random weight) choice of a worker for a key."""
+    return max(
+        workers,
+        key=lambda w: hashlib.blake2b(f"{key}|{w.index}".encode(), digest_size=8).digest()
+    )
+
+
+def parse_head(head: bytes, peer: str, trust_forwarded: bool = False) -> Tuple[bool, str, Optional[int]]:
+    """
+    Read what routing needs from an HTTP request head.
+
+    Args:
+        head: Request line and headers, up to the blank line
+        peer: Address of the connecting client
+        trust_forwarded: Key on the first X-Forwarded-For address (only safe
+            behind a proxy that sets it; clients can send any value)
+
+    Returns:
+        (is a websocket upgrade, sticky key, worker index from ?worker=N or None)
+    """
+    lines = head.decode("latin-1").split("\r\n")
+    target = lines[0].split(" ")[1] if len(lines[0].split(" ")) > 1 else "/"
+    headers = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        headers[name.strip().lower()] = value.strip()
+    upgrade = headers.get("upgrade", "").lower() == "websocket"
+    query = parse_qs(urlsplit(target).query)
+    kiosk = query.get("kiosk", [""])[0]
+    pinned = query.get("worker", [""])[0]
+    forwarded = headers.get("x-forwarded-for", "").split(",")[0].strip() if trust_forwarded else ""
+    return upgrade, kiosk or forwarded or peer, int(pinned) if pinned.isdigit() else None
+
+
+def close_after_response(head: bytes) -> bytes:
+    """The request head with its Connection / Keep-Alive headers replaced by Connection: close."""
+    lines = head[:-4].split(b"\r\n")
+    kept = [line for line in lines[1:] if line.split(b":", 1)[0].strip().lower() not in (b"connection", b"keep-alive")]
+    return b"\r\n".join([lines[0], *kept, b"Connection: close"]) + b"\r\n\r\n"
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            data = await reader.read(65536)
+            if not data:
+                break
+            writer.write(data)
+            await writer.drain()
+    except (ConnectionError, asyncio.CancelledError):
+        pass
+    finally:
+        writer.close()
+
+
+class Router:
+    """TCP-level router in front of the workers (no re-framing of websocket traffic)."""
+
+    def __init__(self, workers: List[Worker], trust_forwarded: bool = False):
+        """
+        Args:
+            workers: Workers to route to
+            trust_forwarded: Key sticky sessions on X-Forwarded-For (see parse_head)
+        """
+        self.workers = workers
+        self.trust_forwarded = trust_forwarded
+
+    def choose(self, upgrade: bool, key: str, pinned: Optional[int] = None) -> Optional[Worker]:
+        if pinned is not None:
+            # Per-process endpoints (/metrics, /admin/*): that worker or nothing
+            worker = next((w for w in self.workers if w.index == pinned), None)
+            return worker if worker is not None and worker.alive else None
+        alive = [w for w in self.workers if w.alive]
+        if not alive:
+            return None
+        if upgrade:
+            return sticky_worker(key, alive)
+        return min(alive, key=lambda w: w.connections)
+
+    async def handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        try:
+            head = await client_reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+            client_writer.close()
+            return
+        peer = (client_writer.get_extra_info("peername") or ("-",))[0]
+        upgrade, key, pinned = parse_head(head, peer, self.trust_forwarded)
+        worker = self.choose(upgrade, key, pinned)
+        if worker is None:
+            client_writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            client_writer.close()
+            return
+        try:
+            upstream_reader, upstream_writer = await asyncio.open_connection("127.0.0.1", worker.port)
+        except OSError:
+            client_writer.write(b"HTTP/1.1 502 Bad Gateway\r\nContent-Length: 0\r\nConnection: close\r\n\r\n")
+            client_writer.close()
+            return
+        worker.connections += 1
+        try:
+            # A websocket stays on its worker; any other request ends the connection, so
+            # a keep-alive client cannot carry later requests (or ?worker=N) to this worker
+            upstream_writer.write(head if upgrade else close_after_response(head))
+            await asyncio.gather(_pipe(client_reader, upstream_writer), _pipe(upstream_reader, client_writer))
+        finally:
+            worker.connections -= 1
+
+
+async def supervise(workers: List[Worker], stop: asyncio.Event) -> None:
+    """Restart workers that exit (with a short backoff) until stop is set."""
+    while not stop.is_set():
+        for worker in workers:
+            if not worker.alive and not stop.is_set():
+                code = worker.process.returncode if worker.process else None
+                print(f"⚠️  Worker {worker.index} exited ({code}) - restarting")
+                await asyncio.sleep(min(5.0, 0.5 * (worker.restarts + 1)))
+                worker.restarts += 1
+                worker.start()
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=1.0)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args) -> None:
+    start = time.perf_counter()
+    # Same recommendation table the workers check the artifacts against (main.py RECOMMENDATIONS_PATH)
+    recommendations_path = os.getenv("RECOMMENDATIONS_PATH") or DEFAULT_RECOMMENDATIONS_PATH
+    artifacts = open_artifacts(args.artifacts, rebuild=True, recommendations_path=recommendations_path)
+    print(f"✅ Artifacts ready in {(time.perf_counter() - start) * 1000:.0f} ms ({len(artifacts.catalog)} products)")
+
+    cache = SharedCacheServer(args.cache_socket, args.cache_entries, args.cache_ttl)
+    await cache.start()
+
+    env = {
+        **os.environ,
+        "ARTIFACTS_DIR": str(args.artifacts),
+        "SHARED_CACHE_SOCKET": args.cache_socket,
+    }
+    base_port = args.worker_port or args.port + 1
+    workers = [Worker(i, base_port + i, env) for i in range(args.workers)]
+    for worker in workers:
+        worker.start()
+    ready = await asyncio.gather(*[w.wait_ready() for w in workers])
+    print(f"✅ {sum(ready)}/{len(workers)} workers ready on ports {base_port}-{base_port + len(workers) - 1}")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    server = None
+    if args.router:
+        router = Router(workers, trust_forwarded=args.trust_forwarded)
+        server = await asyncio.start_server(router.handle, args.host, args.port, limit=MAX_HEAD_BYTES)
+        print(f"📡 Router: http://{args.host}:{args.port} (sticky /ws/conversation by kiosk)")
+    else:
+        print("ℹ️  Router disabled - hash on the kiosk parameter upstream (e.g. nginx: hash $arg_kiosk consistent)")
+
+    try:
+        await supervise(workers, stop)
+    finally:
+        if server is not None:
+            server.close()
+        for worker in workers:
+            worker.stop()
+        await cache.stop()
+        print("👋 Cluster stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run StorePal with several worker processes")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--worker-port", type=int, help="First worker port (default: --port + 1)")
+    parser.add_argument("--no-router", dest="router", action="store_false")
+    parser.add_argument(
+        "--trust-forwarded", action="store_true",
+        help="Key sticky sessions on X-Forwarded-For (only behind a proxy that sets it)"
+    )
+    parser.add_argument("--artifacts", type=Path, default=DEFAULT_ARTIFACTS_DIR)
+    parser.add_argument("--cache-socket", default="/tmp/storepal-cache.sock")
+    parser.add_argument("--cache-entries", type=int, default=10000)
+    parser.add_argument("--cache-ttl", type=float, default=300.0)
+    args = parser.parse_args()
+
+    print("\n" + "="*60)
+    print(f"  🚀 StorePal - CLUSTER MODE ({args.workers} workers)")
+    print("="*60 + "\n")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
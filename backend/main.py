@@ -1,30 +1,76 @@
 import asyncio
 import base64
+import itertools
+import logging
 import json
 import os
 import queue
+import secrets
 import threading
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
+from urllib.parse import urlsplit
 
-import pyaudio
 import websockets
 from dotenv import load_dotenv
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Request, Response, Header, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-import pandas as pd
-import os
+from fastapi.responses import FileResponse, StreamingResponse
 
 # Import vector search engine
-from pinecone_vdb.vector_search import VectorSearchEngine
+from pinecone_vdb.vector_search import VectorSearchEngine, SearchResult
+from pinecone_vdb.response_templates import FormattedResults
+from pinecone_vdb.lexical_index import LexicalIndex
+from pinecone_vdb.hybrid import BM25Index, fuse_rrf
+from pinecone_vdb.adaptive_rerank import RerankPolicy
+from pinecone_vdb.local_rerank import build_reranker, DEFAULT_CROSS_ENCODER
+from pinecone_vdb.metrics import REGISTRY, suppressed
+from pinecone_vdb.log import get_logger, setup_logging, bind_session, update_session
+from pinecone_vdb.tracing import Tracer, build_exporter, span
+from pinecone_vdb.profiling import SamplingProfiler, LoopWatchdog
+from pinecone_vdb.browse import BrowseGroupings, BrowsePayload, ORDERINGS, build_payload
+from pinecone_vdb.catalog import load_catalog
+from pinecone_vdb.catalog_filters import CatalogFilters
+from pinecone_vdb.shared_cache import SharedCacheClient
+from pinecone_vdb.admission import AdmissionController, ADMITTED, parse_shed_thresholds
+from pinecone_vdb.warmup import AnswerCache, load_queries, run_steps
+from pinecone_vdb.query_log import QueryLog, note_call, note_path
+from pinecone_vdb.topk import TopKMerger
+from pinecone_vdb.engine_registry import close_engines, get_registry
+from pinecone_vdb.compression import BodyCompressor, FastJSONResponse, coded_etag, dumps_json, etag_matches
+from pinecone_vdb.map_assets import IMMUTABLE, MapStore, MapTooLarge
 
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop_monitor.start()
+    if SLOW_CALLBACK_MS > 0:
+        try:
+            loop_monitor.enable_slow_callbacks(SLOW_CALLBACK_MS)
+        except RuntimeError as e:
+            logger.warning("⚠️  %s", e)
+    # Accept connections right away; search comes online when this finishes
+    startup_task = asyncio.create_task(initialize_in_background(), name="search-startup")
+    yield
+    if not startup_task.done():
+        startup_task.cancel()
+    await loop_monitor.stop()
+    tracer.close()
+    if query_log:
+        query_log.close()
+    close_engines()
+
+
 app = FastAPI(
     title="StorePal Conversational Agent",
     description="Real-time conversational AI using ElevenLabs",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 app.add_middleware(
@@ -35,12 +81,113 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Mount static files for uploaded maps
-app.mount("/static", StaticFiles(directory="static"), name="static")
-
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 AGENT_ID = os.getenv("ELEVENLABS_AGENT_ID")
+# Conversation websocket upstream (overridable to point at a local stand-in for load tests)
+ELEVENLABS_WS_URL = os.getenv("ELEVENLABS_WS_URL", "wss://api.elevenlabs.io/v1/convai/conversation")
 PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+# Search backend: "pinecone", or "local" (in-process BM25 stand-in, needs no API key)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "pinecone")
+# HTTP connections kept by the shared Pinecone client (0: one per search thread)
+PINECONE_POOL_SIZE = int(os.getenv("PINECONE_POOL_SIZE", "0"))
+# Template used for product results sent to the agent: verbose, terse or voice.
+# verbose matches the agent prompt (name, category, aisle and description); terse and
+# voice drop fields the prompt asks the agent to mention, so they are opt-in
+AGENT_RESPONSE_STYLE = os.getenv("AGENT_RESPONSE_STYLE", "verbose")
+# Retrieval mode: "rerank" (dense + hosted rerank), "hybrid" (BM25 + dense, rerank only when needed)
+# or "adaptive" (dense, rerank skipped/shrunk based on the first-stage score distribution)
+SEARCH_MODE = os.getenv("SEARCH_MODE", "rerank")
+# How query variants of a product question are merged: "max" (a product's best score)
+# or "rrf" (reciprocal-rank fusion), and the score at which 5 results end the wait for
+# slower variants early, once the customer's own query is in (0, the default, waits for every variant)
+SEARCH_FUSION = os.getenv("SEARCH_FUSION", "max")
+SEARCH_CONFIDENT_SCORE = float(os.getenv("SEARCH_CONFIDENT_SCORE", "0"))
+# Calibrated thresholds for adaptive mode (see pinecone_vdb/adaptive_rerank.py)
+RERANK_POLICY_PATH = os.getenv("RERANK_POLICY_PATH")
+# Share of skipped/shrunk adaptive queries that are also fully reranked to measure quality
+RERANK_SHADOW_RATE = float(os.getenv("RERANK_SHADOW_RATE", "0"))
+# Rerank stage: "hosted" (Pinecone inference), "local" (CPU cross-encoder) or "lexical"
+RERANKER = os.getenv("RERANKER", "hosted")
+LOCAL_RERANK_MODEL = os.getenv("LOCAL_RERANK_MODEL", DEFAULT_CROSS_ENCODER)
+RERANK_BATCH_WINDOW_MS = float(os.getenv("RERANK_BATCH_WINDOW_MS", "5"))
+RERANK_MAX_BATCH = int(os.getenv("RERANK_MAX_BATCH", "64"))
+# Precomputed neighbor table (see pinecone_vdb/recommendations.py)
+RECOMMENDATIONS_PATH = os.getenv("RECOMMENDATIONS_PATH", str(Path(__file__).parent / "data" / "recommendations.npz"))
+# Log level for the relay (DEBUG adds per-result dumps, interim transcripts and VAD scores)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Keep 1 in N records for high-rate debug events (interim transcripts, VAD scores)
+LOG_SAMPLE_EVERY = int(os.getenv("LOG_SAMPLE_EVERY", "20"))
+
+# Per-turn span tracing: "jsonl:<path>" or "otlp[:<endpoint>]" (see pinecone_vdb/tracing.py)
+TRACE_EXPORT = os.getenv("TRACE_EXPORT", "")
+# Token for the /admin endpoints (profiler, loop monitor); unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Event loop lag probe interval, and the threshold for reporting a slow callback. Timing
+# every callback patches asyncio, so it is off by default (0): turn it on at runtime with
+# POST /admin/loop/slow-callbacks, or set a threshold here to enable it at startup
+LOOP_PROBE_INTERVAL_MS = float(os.getenv("LOOP_PROBE_INTERVAL_MS", "100"))
+SLOW_CALLBACK_MS = float(os.getenv("SLOW_CALLBACK_MS", "0"))
+# Lag that the watchdog records as a spike, and how many spikes it keeps
+LOOP_SPIKE_MS = float(os.getenv("LOOP_SPIKE_MS", "25"))
+LOOP_SPIKE_HISTORY = int(os.getenv("LOOP_SPIKE_HISTORY", "500"))
+# Multi-worker mode (see cluster.py): prebuilt memory-mapped catalog artifacts,
+# the shared search cache socket, and this worker's number
+ARTIFACTS_DIR = os.getenv("ARTIFACTS_DIR")
+SHARED_CACHE_SOCKET = os.getenv("SHARED_CACHE_SOCKET")
+WORKER_ID = os.getenv("WORKER_ID", "0")
+# Admission control for /ws/conversation: sessions per worker (0 = no limit), clients
+# that may wait for a slot and for how long, and the base retry hint for rejected clients
+MAX_SESSIONS = int(os.getenv("MAX_SESSIONS", "0"))
+SESSION_QUEUE_SIZE = int(os.getenv("SESSION_QUEUE_SIZE", "10"))
+SESSION_QUEUE_TIMEOUT_S = float(os.getenv("SESSION_QUEUE_TIMEOUT_S", "15"))
+SESSION_RETRY_AFTER_S = float(os.getenv("SESSION_RETRY_AFTER_S", "10"))
+# Utilization at which optional work is shed, e.g. "vad_forwarding=0.75,search_variants=0.95"
+SHED_THRESHOLDS = os.getenv("SHED_THRESHOLDS", "")
+# Warm-up before /health reports ready: replay the top N queries from WARMUP_QUERIES_PATH
+# (plain text or a JSON lines query log) through product search, load the inventory
+# and the upstream TLS trust store (WARMUP=0 skips it)
+WARMUP = os.getenv("WARMUP", "1") == "1"
+WARMUP_QUERIES_PATH = os.getenv("WARMUP_QUERIES_PATH", str(Path(__file__).parent / "data" / "warmup_queries.txt"))
+WARMUP_TOP_N = int(os.getenv("WARMUP_TOP_N", "20"))
+WARMUP_CONCURRENCY = int(os.getenv("WARMUP_CONCURRENCY", "4"))
+# Rendered product answers kept per worker, by normalized query. Off by default (0 TTL):
+# a cached answer does not see inventory or index changes until it expires
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1000"))
+ANSWER_CACHE_TTL_S = float(os.getenv("ANSWER_CACHE_TTL_S", "0"))
+# REST bodies at least this size are gzip/brotli-compressed when the client accepts it (0 disables)
+COMPRESS_MIN_BYTES = int(os.getenv("COMPRESS_MIN_BYTES", "1024"))
+# Largest store map accepted by /api/upload-map
+MAP_MAX_BYTES = int(os.getenv("MAP_MAX_BYTES", str(20 * 1024 * 1024)))
+# Anonymized log of final transcripts and the search calls they triggered, for offline
+# replays (see benchmarks/replay_query_log.py); unset disables it. Share of turns kept
+QUERY_LOG = os.getenv("QUERY_LOG")
+QUERY_LOG_SAMPLE = float(os.getenv("QUERY_LOG_SAMPLE", "1"))
+
+setup_logging(LOG_LEVEL)
+logger = get_logger("relay")
+_session_ids = itertools.count(1)
+# Logging context of every open /ws/conversation session, by session number
+active_sessions: Dict[int, Dict[str, object]] = {}
+tracer = Tracer(build_exporter(TRACE_EXPORT))
+admission = AdmissionController(
+    max_sessions=MAX_SESSIONS,
+    max_waiting=SESSION_QUEUE_SIZE,
+    wait_timeout=SESSION_QUEUE_TIMEOUT_S,
+    retry_after=SESSION_RETRY_AFTER_S,
+    shed_thresholds=parse_shed_thresholds(SHED_THRESHOLDS)
+)
+loop_monitor = LoopWatchdog(
+    interval=LOOP_PROBE_INTERVAL_MS / 1000,
+    slow_callback_ms=SLOW_CALLBACK_MS or 50,
+    spike_ms=LOOP_SPIKE_MS,
+    spike_history=LOOP_SPIKE_HISTORY,
+    active_sessions=lambda: list(active_sessions.values())
+)
+answer_cache = AnswerCache(ANSWER_CACHE_SIZE, ANSWER_CACHE_TTL_S)
+query_log = QueryLog(QUERY_LOG, QUERY_LOG_SAMPLE) if QUERY_LOG else None
+compressor = BodyCompressor(COMPRESS_MIN_BYTES)
+# Uploaded maps, served under /static
+map_store = MapStore("static", compressor, MAP_MAX_BYTES)
 
 if not ELEVENLABS_API_KEY or not AGENT_ID:
     print("\n⚠️  ERROR: Missing credentials!")
@@ -49,32 +196,352 @@ if not ELEVENLABS_API_KEY or not AGENT_ID:
     print("ELEVENLABS_AGENT_ID=your_agent_id\n")
     raise ValueError("ELEVENLABS_API_KEY and AGENT_ID must be set in .env file")
 
-# Initialize Vector Search Engine (optional - will only be used if PINECONE_API_KEY is set)
+# Search and catalog state. Built by initialize_search() in a background task
+# after startup, so the worker accepts connections before it is done; until
+# then these are None and search paths answer as if search were unavailable.
+artifacts = None
+catalog = []
+shared_cache = None
+recommendations = None
 vector_search = None
-if PINECONE_API_KEY:
+lexical_index = None
+browse_groupings = None
+startup = {"ready": False, "ready_ms": None, "error": None, "warmup": None}
+_import_started = time.perf_counter()
+
+
+def initialize_search():
+    """Load the catalog and build every search structure (blocking; run in a thread)."""
+    global artifacts, catalog, shared_cache, recommendations, vector_search, lexical_index, browse_groupings
+    
+    # Catalog rows, shared by every in-process index: mapped from prebuilt artifacts
+    # in multi-worker mode, otherwise read from the inventory CSV once
+    if ARTIFACTS_DIR:
+        try:
+            from pinecone_vdb.artifacts import Artifacts
+            artifacts = Artifacts(ARTIFACTS_DIR)
+            if artifacts.is_current(recommendations_path=RECOMMENDATIONS_PATH):
+                logger.info("✅ Artifacts mapped from %s (worker %s)", ARTIFACTS_DIR, WORKER_ID)
+            else:
+                # Serving them would disagree with /api/inventory, which reads the CSV,
+                # or with the recommendation table on disk
+                logger.warning(
+                    "⚠️  Artifacts in %s are older than the inventory CSV or recommendation table - reading the CSV",
+                    ARTIFACTS_DIR
+                )
+                artifacts = None
+        except Exception as e:
+            logger.warning("⚠️  Artifacts not available, reading the CSV: %s", e)
+            artifacts = None
     try:
-        vector_search = VectorSearchEngine()
-        print("✅ Vector Search Engine initialized")
+        # Mapped rows are decoded on access, not copied into a list per worker
+        catalog = artifacts.catalog if artifacts else load_catalog()
     except Exception as e:
-        print(f"⚠️  Vector Search Engine not available: {e}")
-else:
-    print("ℹ️  Pinecone not configured - vector search disabled")
+        logger.warning("⚠️  Inventory not available: %s", e)
+    
+    # Search results shared across worker processes (optional)
+    shared_cache = SharedCacheClient(SHARED_CACHE_SOCKET) if SHARED_CACHE_SOCKET else None
+    
+    # Precomputed product recommendations (optional - built offline)
+    if artifacts and artifacts.manifest.get("recommendations_sha256"):
+        recommendations = artifacts.recommendations(catalog)
+        logger.info("✅ Recommendations mapped (%d products)", len(recommendations.product_ids))
+    elif Path(RECOMMENDATIONS_PATH).exists():
+        try:
+            from pinecone_vdb.recommendations import RecommendationTable
+            recommendations = RecommendationTable.load(RECOMMENDATIONS_PATH, catalog)
+            logger.info("✅ Recommendations loaded (%d products)", len(recommendations.product_ids))
+        except Exception as e:
+            logger.warning("⚠️  Recommendations not available: %s", e)
+    else:
+        logger.info("ℹ️  No precomputed recommendations - run python -m pinecone_vdb.recommendations")
+    
+    # Lexical index for queries that name a product outright (answered without vector search)
+    try:
+        lexical_index = LexicalIndex(catalog)
+        logger.info("✅ Lexical index built (%d products)", len(lexical_index))
+    except Exception as e:
+        logger.warning("⚠️  Lexical index not available: %s", e)
+    
+    # Aisle/category groupings for the browse endpoints, serialized once at startup
+    try:
+        if artifacts:
+            browse_groupings = artifacts.browse
+            logger.info("✅ Browse groupings mapped")
+        else:
+            browse_groupings = BrowseGroupings(CatalogFilters(catalog))
+            logger.info("✅ Browse groupings built")
+    except Exception as e:
+        logger.warning("⚠️  Browse groupings not available: %s", e)
+    
+    # Vector Search Engine (optional - will only be used if PINECONE_API_KEY is set,
+    # or with the local backend). Last, as it waits on the network (the Pinecone
+    # index handshake). The engine and its client come from the process-wide registry
+    if PINECONE_API_KEY or SEARCH_BACKEND == "local":
+        try:
+            sparse_index = BM25Index(catalog) if SEARCH_MODE == "hybrid" else None
+            rerank_policy = RerankPolicy.load(RERANK_POLICY_PATH) if RERANK_POLICY_PATH else None
+            reranker = build_reranker(
+                RERANKER, model_name=LOCAL_RERANK_MODEL,
+                window_ms=RERANK_BATCH_WINDOW_MS, max_batch=RERANK_MAX_BATCH
+            )
+            engine = get_registry(PINECONE_POOL_SIZE or None).get(
+                backend=SEARCH_BACKEND, sparse_index=sparse_index, rerank_policy=rerank_policy,
+                reranker=reranker, recommendations=recommendations
+            )
+            engine.adaptive_stats.shadow_rate = RERANK_SHADOW_RATE
+            if engine.reranker:
+                QUEUE_DEPTH.set_function(engine.reranker.batcher.qsize, "rerank_batcher")
+            vector_search = engine
+            logger.info(
+                "✅ Vector Search Engine initialized (backend: %s, mode: %s, reranker: %s)",
+                SEARCH_BACKEND, SEARCH_MODE, RERANKER
+            )
+        except Exception as e:
+            logger.warning("⚠️  Vector Search Engine not available: %s", e)
+    else:
+        logger.info("ℹ️  Pinecone not configured - vector search disabled")
+
+
+async def initialize_in_background():
+    """Run initialize_search off the event loop and flip the readiness flag."""
+    try:
+        await asyncio.to_thread(initialize_search)
+    except Exception as e:
+        startup["error"] = str(e)
+        logger.exception("❌ Search startup failed")
+    if WARMUP:
+        startup["warmup"] = await warm_up()
+        logger.info("🔥 Warm-up done in %.0f ms", startup["warmup"]["duration_ms"])
+    startup["ready"] = True
+    startup["ready_ms"] = round((time.perf_counter() - _import_started) * 1000, 1)
+    logger.info("✅ Ready %.0f ms after import", startup["ready_ms"])
+
+
+async def warm_up() -> Dict[str, object]:
+    """
+    Warm the worker before it reports ready.
+    
+    Replays the most common queries through the search engine (the Pinecone
+    connection pool, embedding and rerank, the shared search cache and the answer
+    templates), loads the inventory for the CSV endpoints, and loads the TLS trust
+    store used for the conversation upstream. Replays are not counted in /metrics
+    and never reach the query log or the answer cache.
+    
+    Returns:
+        Duration and per-step timings, plus the cache state left behind
+    """
+    async def replay_queries():
+        if not vector_search:
+            return {"skipped": "vector search not available"}
+        queries = load_queries(WARMUP_QUERIES_PATH, WARMUP_TOP_N)
+        gate = asyncio.Semaphore(WARMUP_CONCURRENCY)
+        
+        async def replay(query: str) -> FormattedResults:
+            async with gate:
+                results = await asyncio.to_thread(run_search, vector_search, query, 5)
+                return vector_search.render_results_for_agent(results, AGENT_RESPONSE_STYLE)
+        
+        # Tasks (and their search threads) inherit the suppression from this block
+        with suppressed():
+            answers = await asyncio.gather(*[replay(query) for query in queries])
+        return {"queries": len(queries), "found": sum(answer.found for answer in answers)}
+    
+    def prepare_inventory():
+        # Serialize the inventory bodies and compress them once for every coding we offer
+        rows = len(inventory_records())
+        for kind in ("inventory", "aisles_categories"):
+            payload = inventory_payload(kind)
+            for encoding in compressor.available:
+                if compressor.negotiate(encoding, len(payload.body)):
+                    compressor.encode(payload.body, encoding, payload.etag)
+        return {"rows": rows}
+    
+    async def load_inventory():
+        return await asyncio.to_thread(prepare_inventory)
+    
+    def load_trust_store():
+        # Only the shared TLS context carries over to sessions: a test connection would
+        # not be pooled, and Python keeps no DNS cache
+        if urlsplit(ELEVENLABS_WS_URL).scheme != "wss":
+            return {"skipped": "upstream is not TLS"}
+        return {"ca_certs": upstream_ssl_context().cert_store_stats()["x509_ca"]}
+    
+    async def load_tls():
+        return await asyncio.to_thread(load_trust_store)
+    
+    report = await run_steps([
+        ("search", replay_queries),
+        ("inventory", load_inventory),
+        ("tls", load_tls),
+    ])
+    report["cache"] = {
+        "answers": answer_cache.to_dict(),
+        "inventory_rows": len(_inventory["records"] or ()),
+        "compressed_bodies": compressor.to_dict()["cached_bodies"],
+        "shared_search": shared_cache is not None,
+        "lexical_index": lexical_index.stats.to_dict() if lexical_index else None,
+    }
+    for name, step in report["steps"].items():
+        if not step["ok"]:
+            logger.warning("⚠️  Warm-up step %s failed: %s", name, step["error"])
+    return report
+
+
+# Metrics served at /metrics (search latency per method is recorded by VectorSearchEngine)
+TRANSCRIPT_TO_ANSWER = REGISTRY.histogram(
+    "storepal_transcript_to_answer_seconds",
+    "Final user transcript to the first agent audio frame of the answer",
+    ["path"],
+    buckets=(0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0, 10.0)
+)
+FRAMES = REGISTRY.counter("storepal_frames_total", "WebSocket frames relayed by direction", ["direction"])
+ACTIVE_SESSIONS = REGISTRY.gauge("storepal_active_sessions", "Open /ws/conversation sessions")
+QUEUE_DEPTH = REGISTRY.gauge("storepal_queue_depth", "Work items waiting or running in internal queues", ["queue"])
+CACHE_REQUESTS = REGISTRY.counter("storepal_cache_requests_total", "Cache lookups by result", ["cache", "result"])
+CACHE_HIT_RATIO = REGISTRY.gauge("storepal_cache_hit_ratio", "Share of cache lookups that hit", ["cache"])
+RESPONSE_BYTES = REGISTRY.histogram(
+    "storepal_response_bytes",
+    "REST response body bytes on the wire by endpoint and content coding",
+    ["endpoint", "encoding"],
+    buckets=(256, 1024, 4096, 16384, 65536, 262144, 1048576)
+)
+SERIALIZE_SECONDS = REGISTRY.histogram(
+    "storepal_serialize_seconds",
+    "JSON serialization and compression time per REST response",
+    ["endpoint", "step"],
+    buckets=(0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05)
+)
+SEARCH_STREAM = REGISTRY.histogram(
+    "storepal_search_stream_seconds",
+    "/search/stream request start to the first result event, and to the last event",
+    ["stage"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 5.0)
+)
+
+ACTIVE_SESSIONS.set(0)
+QUEUE_DEPTH.set(0, "search_threads")
+for _direction in ("upstream", "downstream"):
+    FRAMES.inc(_direction, amount=0)
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache, "hit" if hit else "miss")
+
+
+def _hit_ratio(cache: str):
+    def ratio() -> float:
+        hits, misses = CACHE_REQUESTS.value(cache, "hit"), CACHE_REQUESTS.value(cache, "miss")
+        return hits / (hits + misses) if hits + misses else 0.0
+    return ratio
+
+
+for _cache in ("lexical_fast_path", "browse_etag", "static_etag", "shared_search", "answers"):
+    CACHE_HIT_RATIO.set_function(_hit_ratio(_cache), _cache)
+
+
+def run_search(engine: VectorSearchEngine, query: str, top_n: int = 5):
+    """Run the configured retrieval mode (SEARCH_MODE) for one query."""
+    if shared_cache is None:
+        return _run_search(engine, query, top_n)
+    # Results are shared by every worker process (keyed by mode, size and normalized query)
+    key = f"{SEARCH_MODE}|{top_n}|{' '.join(query.lower().split())}"
+    cached = shared_cache.get(key)
+    record_cache("shared_search", cached is not None)
+    if cached is not None:
+        return [SearchResult(**fields) for fields in json.loads(cached)]
+    results = _run_search(engine, query, top_n)
+    shared_cache.set(key, json.dumps([r.to_dict() for r in results]).encode("utf-8"))
+    return results
+
+
+def _run_search(engine: VectorSearchEngine, query: str, top_n: int):
+    if SEARCH_MODE == "hybrid":
+        return engine.hybrid_search(query, top_k=20, top_n=top_n)
+    if SEARCH_MODE == "adaptive":
+        return engine.adaptive_search(query, top_k=20, top_n=top_n)
+    return engine.search_with_reranking(query=query, top_k=20, top_n=top_n)
+
+
+def variant_merger() -> TopKMerger:
+    """TopKMerger for the query variants of one product question, suited to SEARCH_MODE."""
+    if SEARCH_MODE == "hybrid":
+        # hybrid_search returns RRF scores when it skips the rerank and rerank scores
+        # otherwise: variants are merged by rank, and absolute thresholds do not apply
+        return TopKMerger(k=5, fusion="rrf")
+    # Filter out results with very low relevance scores
+    # This helps avoid returning irrelevant products when user asks for something not in inventory
+    min_relevance_score = 0.003  # Even lower threshold to allow more results for conversational queries
+    return TopKMerger(
+        k=5, fusion=SEARCH_FUSION, min_score=min_relevance_score,
+        # RRF has no absolute scale: every variant is waited for
+        confident_score=(SEARCH_CONFIDENT_SCORE or None) if SEARCH_FUSION == "max" else None
+    )
+
+
+async def search_in_thread(engine: VectorSearchEngine, query: str, top_n: int = 5):
+    """run_search in a worker thread, tracked in the search_threads queue depth."""
+    QUEUE_DEPTH.inc("search_threads")
+    started = time.perf_counter()
+    try:
+        results = await asyncio.to_thread(run_search, engine, query, top_n)
+    finally:
+        QUEUE_DEPTH.dec("search_threads")
+    note_call(query, top_n, (time.perf_counter() - started) * 1000, results)
+    return results
+
+
+_upstream_ssl = None
+
+
+def upstream_ssl_context():
+    """One client TLS context for every upstream connection (the CA store is loaded once)."""
+    global _upstream_ssl
+    if _upstream_ssl is None:
+        import ssl
+        _upstream_ssl = ssl.create_default_context()
+    return _upstream_ssl
+
+
+def connect_upstream(uri: str, headers: Dict[str, str]):
+    """websockets.connect with auth headers (the keyword was renamed in websockets 14)."""
+    options = {"ssl": upstream_ssl_context()} if uri.startswith("wss:") else {}
+    if int(websockets.__version__.split(".")[0]) >= 14:
+        return websockets.connect(uri, additional_headers=headers, **options)
+    return websockets.connect(uri, extra_headers=headers, **options)
 
 
 class ElevenLabsAgent:
     def __init__(self):
         self.elevenlabs_ws: Optional[websockets.WebSocketClientProtocol] = None
         self.client_ws: Optional[WebSocket] = None
-        self.vector_search = vector_search
+        # Start of the current turn (final transcript), for transcript-to-answer latency
+        self._turn_started: Optional[float] = None
+        self._turn_path = "direct"
+        # Per-turn tracing state
+        self.conversation_id: Optional[str] = None
+        self.turn_number = 0
+        self._trace_turn = None
+        self._first_interim_ns: Optional[int] = None
+        self._awaiting_answer_ns: Optional[int] = None
+    
+    # Read at use: sessions that start before search is ready pick it up once it is
+    @property
+    def vector_search(self) -> Optional[VectorSearchEngine]:
+        return vector_search
+    
+    @property
+    def lexical_index(self) -> Optional[LexicalIndex]:
+        return lexical_index
         
     async def connect_to_elevenlabs(self):
-        uri = f"wss://api.elevenlabs.io/v1/convai/conversation?agent_id={AGENT_ID}"
+        uri = f"{ELEVENLABS_WS_URL}?agent_id={AGENT_ID}"
         headers = {"xi-api-key": ELEVENLABS_API_KEY}
         try:
-            self.elevenlabs_ws = await websockets.connect(uri, extra_headers=headers)
-            print("✅ Connected to ElevenLabs API")
+            self.elevenlabs_ws = await connect_upstream(uri, headers)
+            logger.info("✅ Connected to ElevenLabs API")
         except Exception as e:
-            print(f"❌ Failed to connect to ElevenLabs: {e}")
+            logger.error("❌ Failed to connect to ElevenLabs: %s", e)
             raise
     
     def should_search_products(self, query: str) -> bool:
@@ -107,7 +574,7 @@ class ElevenLabsAgent:
         query_lower = query.lower()
         return any(keyword in query_lower for keyword in search_keywords)
     
-    async def search_products(self, query: str) -> str:
+    async def search_products(self, query: str) -> FormattedResults:
         """
         Search for products using vector search and return formatted response.
         
@@ -115,13 +582,34 @@ class ElevenLabsAgent:
             query: User's product query
             
         Returns:
-            Formatted product information string
+            FormattedResults with found flag, items and agent-facing text
         """
         if not self.vector_search:
-            return "I'm sorry, product search is not available at the moment."
+            return FormattedResults(False, (), "I'm sorry, product search is not available at the moment.")
         
         try:
+            # Repeated questions are answered from the rendered answer cache (ANSWER_CACHE_TTL_S)
+            if answer_cache.enabled:
+                cached = answer_cache.get(query)
+                record_cache("answers", cached is not None)
+                if cached is not None:
+                    note_path("answer_cache")
+                    return cached
+            
+            # Fast path: the query names a product outright
+            if self.lexical_index:
+                match = self.lexical_index.lookup(query)
+                record_cache("lexical_fast_path", match.confident)
+                if match.confident:
+                    note_path("lexical")
+                    logger.info(
+                        "⚡ Lexical match (%s, %.2f ms): '%s' -> %d results",
+                        match.method, match.elapsed_ms, query, len(match.results)
+                    )
+                    return self.vector_search.render_results_for_agent(match.results, AGENT_RESPONSE_STYLE)
+            
             # Try multiple search variations for better results
+            note_path("search")
             search_queries = [query]
             
             # Add variations for common queries
@@ -131,60 +619,81 @@ class ElevenLabsAgent:
                 search_queries.extend(["cereal", "oatmeal", "yogurt", "eggs", "bread"])
             if "recommend" in query.lower() or "suggest" in query.lower():
                 search_queries.extend(["popular", "best", "top"])
+            # Under load, search only what the customer said (and do not cache the smaller answer)
+            shed = len(search_queries) > 1 and admission.shedding("search_variants")
+            if shed:
+                search_queries = search_queries[:1]
             
-            all_results = []
-            for search_query in search_queries:
-                results = self.vector_search.search_with_reranking(
-                    query=search_query,
-                    top_k=20,
-                    top_n=5
-                )
-                all_results.extend(results)
-            
-            # Remove duplicates and sort by score
-            seen = set()
-            unique_results = []
-            for result in all_results:
-                if result.item_name not in seen:
-                    seen.add(result.item_name)
-                    unique_results.append(result)
-            
-            # Sort by score and take top results
-            results = sorted(unique_results, key=lambda x: x.score, reverse=True)[:5]
-            
-            # Filter out results with very low relevance scores
-            # This helps avoid returning irrelevant products when user asks for something not in inventory
-            min_relevance_score = 0.003  # Even lower threshold to allow more results for conversational queries
-            results = [r for r in results if r.score >= min_relevance_score]
+            # Run variants in worker threads: keeps the event loop free and lets a
+            # local rerank stage batch pairs from concurrent sessions together.
+            # Results are merged (top 5 by product ID) as each variant finishes. With
+            # SEARCH_CONFIDENT_SCORE set, the answer goes out once the customer's own
+            # query is in and 5 confident products are in hand (such an answer is not cached)
+            merger = variant_merger()
+            searches = [
+                asyncio.ensure_future(search_in_thread(self.vector_search, search_query, 5))
+                for search_query in search_queries
+            ]
+            waiting = set(searches)
+            cut_short = False
+            try:
+                while waiting:
+                    finished, waiting = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                    for search in sorted(finished, key=searches.index):
+                        merger.add(search.result())
+                    if waiting and merger.done and searches[0] not in waiting:
+                        cut_short = True
+                        break
+            finally:
+                for pending in searches:
+                    pending.cancel()  # stop waiting; a running search thread finishes on its own
+            results = merger.results()
             
             # Log the search
-            print(f"🔍 Product search: '{query}' -> {len(results)} results")
-            print(f"\n🔍 DEBUG - Results details:")
-            for i, result in enumerate(results, 1):
-                print(f"  {i}. {result.item_name}")
-                print(f"     Category: {result.category}")
-                print(f"     Aisle: {result.aisle_location}")
-                print(f"     Description: {result.description}")
-                print(f"     Score: {result.score}")
+            logger.info("🔍 Product search: '%s' -> %d results", query, len(results))
+            if logger.isEnabledFor(logging.DEBUG):
+                for i, result in enumerate(results, 1):
+                    logger.debug(
+                        "  %d. %s | %s | aisle %s | %s | score %s",
+                        i, result.item_name, result.category, result.aisle_location, result.description, result.score
+                    )
             
             # Format results for the agent
-            response = self.vector_search.format_results_for_agent(results)
-            print(f"\n🔍 DEBUG - Formatted response:")
-            print(response)
+            response = self.vector_search.render_results_for_agent(results, AGENT_RESPONSE_STYLE)
+            logger.debug("🔍 Formatted response: %s", response.text)
+            if not shed and not cut_short:
+                answer_cache.put(query, response)
             
             return response
             
         except Exception as e:
-            print(f"❌ Error searching products: {e}")
-            return "I encountered an error while searching for products. Please try again."
+            logger.exception("❌ Error searching products: %s", e)
+            return FormattedResults(False, (), "I encountered an error while searching for products. Please try again.")
         
     async def send_initiation_message(self, config_override: dict = None):
         initiation_message = {"type": "conversation_initiation_client_data"}
         if config_override:
             initiation_message["conversation_config_override"] = config_override
         await self.elevenlabs_ws.send(json.dumps(initiation_message))
-        print("✅ Sent conversation initiation")
+        logger.info("✅ Sent conversation initiation")
+        
+    def shed_downstream(self, message_type: Optional[str], data: dict) -> bool:
+        """
+        Check whether a UI-only event should be dropped instead of relayed.
         
+        Args:
+            message_type: ElevenLabs event type
+            data: Parsed event
+            
+        Returns:
+            True when the worker is loaded enough to shed this kind of event
+        """
+        if message_type == "vad_score":
+            return admission.shedding("vad_forwarding")
+        if message_type == "user_transcript" and not data.get("user_transcription_event", {}).get("is_final", True):
+            return admission.shedding("interim_transcripts")
+        return False
+    
     async def handle_elevenlabs_messages(self):
         try:
             async for message in self.elevenlabs_ws:
@@ -194,31 +703,37 @@ class ElevenLabsAgent:
                     
                     # Forward all messages to client (only if client is still connected)
                     try:
-                        if self.client_ws and self.client_ws.client_state.name == "CONNECTED":
+                        if (
+                            self.client_ws and self.client_ws.client_state.name == "CONNECTED"
+                            and not self.shed_downstream(message_type, data)
+                        ):
                             await self.client_ws.send_json(data)
+                            FRAMES.inc("downstream")
                     except Exception as e:
-                        print(f"⚠️ Error sending message to client: {e}")
+                        logger.warning("⚠️ Error sending message to client: %s", e)
                         # Don't break the loop, just continue processing
                         continue
                 except json.JSONDecodeError as e:
-                    print(f"⚠️ Error parsing ElevenLabs message: {e}")
+                    logger.warning("⚠️ Error parsing ElevenLabs message: %s", e)
                     continue
                 except Exception as e:
-                    print(f"⚠️ Error processing ElevenLabs message: {e}")
+                    logger.warning("⚠️ Error processing ElevenLabs message: %s", e)
                     continue
                 
                 if message_type == "conversation_initiation_metadata":
                     conv_id = data.get('conversation_initiation_metadata_event', {}).get('conversation_id')
-                    print(f"🎉 Conversation ID: {conv_id}")
+                    self.conversation_id = conv_id
+                    update_session(conversation_id=conv_id)
+                    logger.info("🎉 Conversation ID: %s", conv_id)
                 elif message_type == "agent_response":
                     # Check if this is a product query that we're handling
                     if hasattr(self, '_handling_product_query') and self._handling_product_query:
-                        print(f"\n🤖 Agent: [SKIPPED - Product query being handled]")
+                        logger.info("🤖 Agent: [SKIPPED - Product query being handled]")
                         self._handling_product_query = False
                         continue
                     
                     agent_response = data.get("agent_response_event", {}).get("agent_response")
-                    print(f"\n🤖 Agent: {agent_response}")
+                    logger.info("🤖 Agent: %s", agent_response)
                 elif message_type == "user_transcript":
                     # Handle both interim and final transcripts
                     transcript_event = data.get("user_transcription_event", {})
@@ -227,78 +742,128 @@ class ElevenLabsAgent:
                     
                     if user_transcript:
                         if is_final:
-                            print(f"\n👤 User: {user_transcript}")
+                            logger.info("👤 User: %s", user_transcript)
+                            self._turn_started = time.perf_counter()
+                            self._turn_path = "direct"
+                            self.start_trace_turn()
+                            logged_turn = query_log.begin(user_transcript, self.conversation_id) if query_log else None
+                            product_info, search_ms = None, None
                             
                             # Check if this is a product query and search if needed
-                            if self.should_search_products(user_transcript):
-                                print(f"🔍 Triggering product search...")
+                            with span("should_search_products"):
+                                is_product_query = self.should_search_products(user_transcript)
+                            if is_product_query:
+                                self._turn_path = "search"
+                                logger.debug("🔍 Triggering product search...")
                                 # Mark that we're handling a product query
                                 self._handling_product_query = True
                                 
-                                product_info = await self.search_products(user_transcript)
+                                with span("search_products"):
+                                    search_started = time.perf_counter()
+                                    product_info = await self.search_products(user_transcript)
+                                    search_ms = (time.perf_counter() - search_started) * 1000
                                 
                                 # Send contextual update to ElevenLabs with database results
                                 # Only send if we have relevant results, not if we couldn't find anything
-                                if product_info and "couldn't find" not in product_info.lower() and "no products" not in product_info.lower():
+                                if product_info.found:
                                     # Send contextual update to ElevenLabs with database results
                                     contextual_update = {
                                         "type": "contextual_update",
-                                        "text": f"IMPORTANT: Use these exact database results to answer the user's question: {product_info}"
+                                        "text": f"IMPORTANT: Use these exact database results to answer the user's question: {product_info.text}"
                                     }
-                                    await self.elevenlabs_ws.send(json.dumps(contextual_update))
-                                    print(f"📤 Sent database results as contextual update to ElevenLabs")
+                                    with span("contextual_update_send"):
+                                        await self.elevenlabs_ws.send(json.dumps(contextual_update))
+                                    logger.debug("📤 Sent database results as contextual update to ElevenLabs")
                                     
                                     # Add a small delay to ensure the contextual update is processed
-                                    await asyncio.sleep(0.2)
+                                    with span("contextual_update_sleep"):
+                                        await asyncio.sleep(0.2)
                                     
                                     # Send a follow-up message to trigger the agent response
                                     follow_up = {
                                         "type": "user_message",
-                                        "text": f"Please respond with the database results I just provided: {product_info}"
+                                        "text": f"Please respond with the database results I just provided: {product_info.text}"
                                     }
-                                    await self.elevenlabs_ws.send(json.dumps(follow_up))
-                                    print(f"📤 Sent follow-up message to trigger response")
+                                    with span("follow_up_send"):
+                                        await self.elevenlabs_ws.send(json.dumps(follow_up))
+                                    logger.debug("📤 Sent follow-up message to trigger response")
                                 
                                 # Also send to client for UI display
-                                await self.client_ws.send_json({
-                                    "type": "product_search_result",
-                                    "query": user_transcript,
-                                    "results": product_info
-                                })
+                                with span("client_send"):
+                                    await self.client_ws.send_json({
+                                        "type": "product_search_result",
+                                        "query": user_transcript,
+                                        "found": product_info.found,
+                                        "results": product_info.text
+                                    })
+                            if logged_turn:
+                                query_log.finish(
+                                    logged_turn, is_product_query,
+                                    product_info.items if product_info else (), search_ms
+                                )
+                            self._awaiting_answer_ns = time.time_ns()
                         else:
-                            # Print interim transcripts in real-time with carriage return
-                            print(f"\r👤 User (interim): {user_transcript}", end='', flush=True)
+                            if self._first_interim_ns is None:
+                                self._first_interim_ns = time.time_ns()
+                            # Interim transcripts arrive many times per utterance: sampled debug output
+                            logger.debug("👤 User (interim): %s", user_transcript, extra={"sample_every": LOG_SAMPLE_EVERY})
                 elif message_type == "interruption":
                     # ElevenLabs VAD detected user interruption
                     event_id = data.get("interruption_event", {}).get("event_id")
-                    print(f"\n🛑 Interruption detected by ElevenLabs VAD (event_id: {event_id})")
+                    logger.info("🛑 Interruption detected by ElevenLabs VAD (event_id: %s)", event_id)
                 elif message_type == "vad_score":
                     # Optional: log high VAD scores
                     vad_score = data.get("vad_score_event", {}).get("vad_score", 0)
                     if vad_score > 0.8:
-                        print(f"\r🎙️ VAD: {vad_score:.2f}", end='', flush=True)
+                        logger.debug("🎙️ VAD: %.2f", vad_score, extra={"sample_every": LOG_SAMPLE_EVERY})
                 elif message_type == "audio":
                     # Just forward audio chunks, don't log them
-                    pass
+                    if self._turn_started is not None:
+                        TRANSCRIPT_TO_ANSWER.observe(time.perf_counter() - self._turn_started, self._turn_path)
+                        self._turn_started = None
+                        self.end_trace_turn(answered=True)
                 elif message_type == "ping":
                     event_id = data.get("ping_event", {}).get("event_id")
                     pong_message = {"type": "pong", "event_id": event_id}
                     await self.elevenlabs_ws.send(json.dumps(pong_message))
                     
         except websockets.exceptions.ConnectionClosed:
-            print("\n❌ ElevenLabs connection closed")
+            logger.info("❌ ElevenLabs connection closed")
             
+    def start_trace_turn(self):
+        """Start a traced turn at the final transcript (ends any unanswered one)."""
+        self.end_trace_turn(answered=False)
+        self.turn_number += 1
+        turn = tracer.start_turn(self.conversation_id, self.turn_number)
+        if turn is not None and self._first_interim_ns is not None:
+            # The turn covers transcription too: first interim to final transcript
+            turn.add("transcription", self._first_interim_ns, turn.root.start_ns)
+            turn.root.start_ns = self._first_interim_ns
+        self._first_interim_ns = None
+        self._trace_turn = turn
+    
+    def end_trace_turn(self, answered: bool):
+        """Finish the current traced turn, recording the wait for the first agent audio."""
+        turn, self._trace_turn = self._trace_turn, None
+        if turn is None:
+            return
+        if answered and self._awaiting_answer_ns is not None:
+            turn.add("wait_first_audio", self._awaiting_answer_ns, time.time_ns())
+        self._awaiting_answer_ns = None
+        tracer.end_turn(turn, answered=answered, path=self._turn_path)
+    
     async def send_audio_to_elevenlabs(self, audio_base64: str):
         message = {"user_audio_chunk": audio_base64}
         await self.elevenlabs_ws.send(json.dumps(message))
         
     async def close(self):
+        self.end_trace_turn(answered=False)
         if self.elevenlabs_ws:
             try:
                 await self.elevenlabs_ws.close()
-                print("✅ ElevenLabs connection closed")
+                logger.info("✅ ElevenLabs connection closed")
             except Exception as e:
-                print(f"⚠️ Error closing ElevenLabs connection: {e}")
+                logger.warning("⚠️ Error closing ElevenLabs connection: %s", e)
             finally:
                 self.elevenlabs_ws = None
 
@@ -317,13 +882,21 @@ async def root():
 async def health():
     return {
         "status": "healthy",
+        # False until the background search startup has finished
+        "ready": startup["ready"],
+        "startup": startup,
+        "worker": WORKER_ID,
+        "admission": admission.to_dict(),
         "api_configured": bool(ELEVENLABS_API_KEY and AGENT_ID),
-        "vector_search_enabled": vector_search is not None
+        "vector_search_enabled": vector_search is not None,
+        "lexical_index": lexical_index.stats.to_dict() if lexical_index else None,
+        "compression": compressor.to_dict(),
+        "engines": get_registry().to_dict()
     }
 
 
 @app.get("/search")
-async def search_products(q: str, top_k: int = 5):
+async def search_products(q: str, request: Request, top_k: int = 5):
     """
     API endpoint to search for products.
     
@@ -332,7 +905,7 @@ async def search_products(q: str, top_k: int = 5):
         top_k: Number of results to return
         
     Returns:
-        List of matching products
+        List of matching products (compressed when large and accepted)
     """
     if not vector_search:
         return {
@@ -340,65 +913,452 @@ async def search_products(q: str, top_k: int = 5):
         }
     
     try:
-        results = vector_search.search_with_reranking(q, top_k=20, top_n=top_k)
-        return {
+        results = await search_in_thread(vector_search, q, top_k)
+        return json_response(request, {
             "query": q,
             "results": [result.to_dict() for result in results],
             "formatted_response": vector_search.format_results_for_agent(results)
-        }
+        }, "search")
     except Exception as e:
         return {
             "error": f"Search failed: {str(e)}"
         }
 
 
+def stream_event(fmt: str, event: str, payload: dict) -> bytes:
+    """One Server-Sent Event, or one NDJSON line with the event name inside."""
+    if fmt == "ndjson":
+        return dumps_json({"event": event, **payload}) + b"\n"
+    return b"event: " + event.encode() + b"\ndata: " + dumps_json(payload) + b"\n\n"
+
+
+def first_stage_search(engine: VectorSearchEngine, query: str, top_k: int):
+    """The first stage of SEARCH_MODE, before any rerank (dense, or dense + BM25 fused in hybrid mode)."""
+    if SEARCH_MODE == "hybrid" and engine.sparse_index is not None:
+        dense = engine.semantic_search(query, top_k=20)
+        sparse = engine.sparse_index.search(query, top_k=20)
+        return fuse_rrf([dense, sparse])[:top_k]
+    return engine.semantic_search(query, top_k=top_k)
+
+
+@app.get("/search/stream")
+async def search_products_stream(q: str, request: Request, top_k: int = 5, format: Optional[str] = None):
+    """
+    Streaming variant of /search: first-stage hits as soon as they are in, then
+    the final list (the same results /search returns).
+    
+    Events (Server-Sent Events, or NDJSON lines with format=ndjson):
+        first_stage: {"query", "results", "elapsed_ms"} - SEARCH_MODE's first stage, before
+            reranking (skipped when the final list is ready first, e.g. from the shared cache)
+        reranked: {"query", "results", "formatted_response", "elapsed_ms"}
+        done: {"first_result_ms", "total_ms"}
+        error: {"error"}
+    
+    Args:
+        q: Search query
+        top_k: Number of results to return
+        format: "sse" or "ndjson" (default: sse, or ndjson if the client accepts only that)
+        
+    Returns:
+        text/event-stream or application/x-ndjson response
+    """
+    if not vector_search:
+        return {
+            "error": "Vector search is not available. Please configure PINECONE_API_KEY."
+        }
+    if format is None:
+        format = "ndjson" if "application/x-ndjson" in request.headers.get("accept", "") else "sse"
+    if format not in ("sse", "ndjson"):
+        raise HTTPException(status_code=400, detail="format must be sse or ndjson")
+    engine = vector_search
+    
+    async def events():
+        started = time.perf_counter()
+        
+        def elapsed_ms() -> float:
+            return round((time.perf_counter() - started) * 1000, 1)
+        
+        # Both stages start together: the final list comes from run_search (SEARCH_MODE,
+        # shared cache), so it takes no longer than /search and matches what the agent hears
+        final = asyncio.ensure_future(search_in_thread(engine, q, top_k))
+        first = asyncio.ensure_future(asyncio.to_thread(first_stage_search, engine, q, top_k))
+        try:
+            first_result_ms = None
+            done, _ = await asyncio.wait({first, final}, return_when=asyncio.FIRST_COMPLETED)
+            if first in done and not final.done() and first.exception() is None:
+                first_result_ms = elapsed_ms()
+                yield stream_event(format, "first_stage", {
+                    "query": q,
+                    "results": [result.to_dict() for result in first.result()],
+                    "elapsed_ms": first_result_ms
+                })
+            
+            results = await final
+            if first_result_ms is None:
+                first_result_ms = elapsed_ms()
+            SEARCH_STREAM.observe(first_result_ms / 1000, "first_result")
+            yield stream_event(format, "reranked", {
+                "query": q,
+                "results": [result.to_dict() for result in results],
+                "formatted_response": engine.format_results_for_agent(results),
+                "elapsed_ms": elapsed_ms()
+            })
+            total_ms = elapsed_ms()
+            SEARCH_STREAM.observe(total_ms / 1000, "total")
+            yield stream_event(format, "done", {"first_result_ms": first_result_ms, "total_ms": total_ms})
+        except Exception as e:
+            logger.exception("❌ Streaming search failed: %s", e)
+            yield stream_event(format, "error", {"error": f"Search failed: {str(e)}"})
+        finally:
+            first.cancel()  # a running search thread finishes on its own
+            final.cancel()
+    
+    return StreamingResponse(
+        events(),
+        media_type="application/x-ndjson" if format == "ndjson" else "text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/recommendations/{product_id}")
+async def get_recommendations(product_id: int, top_k: int = 5):
+    """
+    Get precomputed "customers may also like" products for a product.
+    
+    Args:
+        product_id: Product to recommend for
+        top_k: Number of recommendations
+        
+    Returns:
+        List of similar products
+    """
+    if recommendations is None:
+        return {
+            "error": "Recommendations are not available. Run python -m pinecone_vdb.recommendations first."
+        }
+    if product_id not in recommendations:
+        raise HTTPException(status_code=404, detail=f"Unknown product {product_id}")
+    
+    results = recommendations.recommend(product_id, top_k=top_k)
+    return {
+        "product_id": product_id,
+        "recommendations": [result.to_dict() for result in results]
+    }
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint: search latency per method, transcript-to-answer
+    latency, relayed frames, queue depths, active sessions and cache hit rates.
+    """
+    return Response(content=REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def require_admin(x_admin_token: Optional[str] = Header(None)):
+    """Admin endpoints need ADMIN_TOKEN set on the server and sent as X-Admin-Token."""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Admin endpoints are disabled (set ADMIN_TOKEN)")
+    if not x_admin_token or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+
+@app.post("/admin/profile", dependencies=[Depends(require_admin)])
+async def admin_profile(seconds: float = 10, interval_ms: float = 5):
+    """
+    Run a sampling profiler over every thread for N seconds.
+    
+    Args:
+        seconds: Profile duration (max 60)
+        interval_ms: Sampling interval
+        
+    Returns:
+        Collapsed stacks (flamegraph.pl / speedscope / inferno input)
+    """
+    if SamplingProfiler.busy():
+        raise HTTPException(status_code=409, detail="A profile is already running")
+    seconds = min(max(seconds, 0.1), 60)
+    profiler = SamplingProfiler(interval=max(interval_ms, 1) / 1000)
+    # Sample from a worker thread so the loop (and the code being profiled) keeps running
+    collapsed = await asyncio.to_thread(profiler.run, seconds)
+    return Response(
+        content=collapsed,
+        media_type="text/plain",
+        headers={"Content-Disposition": f'attachment; filename="storepal-{int(time.time())}.collapsed"'}
+    )
+
+
+@app.get("/admin/loop", dependencies=[Depends(require_admin)])
+async def admin_loop():
+    """
+    Get event loop lag and recent slow callbacks.
+    
+    Returns:
+        Lag (last, recent p99, max) and the latest callbacks over the threshold
+    """
+    return loop_monitor.to_dict()
+
+
+@app.post("/admin/loop/slow-callbacks", dependencies=[Depends(require_admin)])
+async def admin_slow_callbacks(enabled: bool = True, threshold_ms: Optional[float] = None):
+    """
+    Turn slow-callback detection on or off at runtime.
+    
+    Args:
+        enabled: Time every loop callback
+        threshold_ms: Report callbacks longer than this
+        
+    Returns:
+        Current loop monitor state
+    """
+    if enabled:
+        try:
+            loop_monitor.enable_slow_callbacks(threshold_ms)
+        except RuntimeError as e:
+            raise HTTPException(status_code=409, detail=str(e))
+    else:
+        loop_monitor.disable_slow_callbacks()
+    return loop_monitor.to_dict()
+
+
+@app.get("/admin/loop/spikes", dependencies=[Depends(require_admin)])
+async def admin_loop_spikes(limit: int = 50):
+    """
+    Get recent event loop lag spikes with the code path and session behind each.
+    
+    Args:
+        limit: Number of spikes to return (newest first)
+        
+    Returns:
+        Spikes (blocked stack and task, slow callbacks, sessions affected)
+        and per-session totals over the ring buffer
+    """
+    return loop_monitor.spikes_to_dict(max(1, min(limit, LOOP_SPIKE_HISTORY)))
+
+
+@app.get("/api/search/stats")
+async def search_stats():
+    """
+    Get search-path counters: lexical fast path, hybrid and adaptive rerank decisions.
+    
+    Returns:
+        Dictionary of counters per search path
+    """
+    return {
+        "search_mode": SEARCH_MODE,
+        "lexical": lexical_index.stats.to_dict() if lexical_index else None,
+        "hybrid": dict(vector_search.hybrid_stats) if vector_search else None,
+        "adaptive_rerank": vector_search.adaptive_stats.to_dict() if vector_search else None,
+        "local_rerank": dict(vector_search.reranker.batcher.stats) if vector_search and vector_search.reranker else None
+    }
+
+
+INVENTORY_CSV = "data/winmart_inventory.csv"
+# Parsed inventory and serialized endpoint bodies; rebuilt when the file changes
+_inventory = {"mtime": None, "records": None, "payloads": {}}
+
+
+def inventory_records():
+    """Inventory CSV rows as dicts (parsed once per file version; raises if the file is missing)."""
+    mtime = os.path.getmtime(INVENTORY_CSV)
+    if _inventory["mtime"] != mtime:
+        import pandas as pd  # only the CSV endpoints need it: loaded on first use
+        
+        _inventory["records"] = pd.read_csv(INVENTORY_CSV).to_dict('records')
+        _inventory["payloads"] = {}
+        _inventory["mtime"] = mtime
+    return _inventory["records"]
+
+
+def inventory_payload(kind: str) -> BrowsePayload:
+    """
+    Serialized body of an inventory endpoint, built once per file version.
+    
+    Args:
+        kind: "inventory" (every row) or "aisles_categories" (unique aisles and categories)
+        
+    Returns:
+        BrowsePayload (JSON bytes and ETag)
+    """
+    records = inventory_records()
+    payload = _inventory["payloads"].get(kind)
+    if payload is None:
+        if kind == "inventory":
+            data = records
+        else:
+            data = {
+                "aisles": sorted({row['aisle_location'] for row in records}),
+                "categories": sorted({row['category'] for row in records})
+            }
+        payload = _inventory["payloads"][kind] = build_payload(data)
+    return payload
+
+
 @app.get("/api/inventory")
-async def get_inventory():
+async def get_inventory(request: Request):
     """
     Get the complete inventory from the CSV file.
     
     Returns:
-        List of all products in inventory
+        List of all products in inventory (pre-serialized, compressed when accepted, ETag)
     """
     try:
-        csv_path = "data/winmart_inventory.csv"
-        if not os.path.exists(csv_path):
+        if not os.path.exists(INVENTORY_CSV):
             return {"error": "Inventory file not found"}
         
-        df = pd.read_csv(csv_path)
-        inventory = df.to_dict('records')
-        return inventory
+        return browse_response(request, inventory_payload("inventory"), "inventory")
     except Exception as e:
         return {"error": f"Failed to load inventory: {str(e)}"}
 
 
 @app.get("/api/aisles-categories")
-async def get_aisles_categories():
+async def get_aisles_categories(request: Request):
     """
     Get available aisles and product categories.
     
     Returns:
-        Dictionary with aisles and categories lists
+        Dictionary with aisles and categories lists (pre-serialized, ETag)
     """
     try:
-        csv_path = "data/winmart_inventory.csv"
-        if not os.path.exists(csv_path):
+        if not os.path.exists(INVENTORY_CSV):
             return {"error": "Inventory file not found"}
         
-        df = pd.read_csv(csv_path)
+        return browse_response(request, inventory_payload("aisles_categories"), "aisles_categories")
+    except Exception as e:
+        return {"error": f"Failed to load aisles and categories: {str(e)}"}
+
+
+def encoded_response(
+    request: Request,
+    body: bytes,
+    endpoint: str,
+    cache_key: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    serialize_s: float = 0.0
+) -> Response:
+    """
+    Send a JSON body, compressed if the client accepts it and it is large enough.
+    
+    Args:
+        request: Incoming request (for Accept-Encoding)
+        body: Serialized JSON body
+        endpoint: Metric label
+        cache_key: ETag of a static body, whose compressed variants are cached
+        headers: Extra response headers
+        serialize_s: Time spent serializing the body for this request
         
-        # Get unique aisles
-        aisles = sorted(df['aisle_location'].unique().tolist())
+    Returns:
+        Response with Content-Encoding and Server-Timing (serialize and compress ms)
+    """
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    encoding = compressor.negotiate(request.headers.get("accept-encoding", ""), len(body))
+    compress_s = 0.0
+    if encoding:
+        started = time.perf_counter()
+        body = compressor.encode(body, encoding, cache_key)
+        compress_s = time.perf_counter() - started
+        headers["Content-Encoding"] = encoding
+    headers["Server-Timing"] = f"serialize;dur={serialize_s * 1000:.3f}, compress;dur={compress_s * 1000:.3f}"
+    RESPONSE_BYTES.observe(len(body), endpoint, encoding or "identity")
+    SERIALIZE_SECONDS.observe(serialize_s, endpoint, "serialize")
+    SERIALIZE_SECONDS.observe(compress_s, endpoint, "compress")
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def json_response(request: Request, data, endpoint: str) -> Response:
+    """Serialize a per-request result (orjson when available) and send it via encoded_response."""
+    started = time.perf_counter()
+    body = dumps_json(data)
+    return encoded_response(request, body, endpoint, serialize_s=time.perf_counter() - started)
+
+
+def browse_response(request: Request, payload: BrowsePayload, endpoint: str = "browse") -> Response:
+    """
+    Serve a pre-serialized body, answering 304 when the client's copy is current.
+    Each content coding is sent with its own ETag (payload.etag plus "-gzip" / "-br").
+    """
+    codings = (None, *compressor.available)
+    not_modified = etag_matches(request.headers.get("if-none-match", ""), [coded_etag(payload.etag, e) for e in codings])
+    record_cache("browse_etag", not_modified)
+    if not_modified:
+        encoding = compressor.negotiate(request.headers.get("accept-encoding", ""), len(payload.body))
+        return Response(status_code=304, headers={
+            "ETag": coded_etag(payload.etag, encoding), "Cache-Control": "no-cache", "Vary": "Accept-Encoding"
+        })
+    response = encoded_response(request, payload.body, endpoint, cache_key=payload.etag, headers={"Cache-Control": "no-cache"})
+    response.headers["ETag"] = coded_etag(payload.etag, response.headers.get("content-encoding"))
+    return response
+
+
+def require_browse_groupings() -> None:
+    if browse_groupings is None:
+        if not startup["ready"]:
+            raise HTTPException(status_code=503, detail="Starting up, retry shortly", headers={"Retry-After": "1"})
+        raise HTTPException(status_code=503, detail="Inventory groupings are not available")
+
+
+def browse_group(request: Request, kind: str, name: str, order: str) -> Response:
+    require_browse_groupings()
+    if order not in ORDERINGS:
+        raise HTTPException(status_code=400, detail=f"order must be one of {', '.join(ORDERINGS)}")
+    payload = browse_groupings.get(kind, name, order)
+    if payload is None:
+        raise HTTPException(status_code=404, detail=f"Unknown {kind} '{name}'")
+    return browse_response(request, payload)
+
+
+@app.get("/api/aisles")
+async def list_aisles(request: Request):
+    """
+    Get every aisle with its product count.
+    
+    Returns:
+        {"count", "groups": [{"aisle", "count"}]}
+    """
+    require_browse_groupings()
+    return browse_response(request, browse_groupings.index("aisle"))
+
+
+@app.get("/api/aisles/{aisle}")
+async def browse_aisle(aisle: str, request: Request, order: str = "name"):
+    """
+    Get the products in an aisle.
+    
+    Args:
+        aisle: Aisle location (e.g., "A1", "N3"), case-insensitive
+        order: "name" or "id"
         
-        # Get unique categories
-        categories = sorted(df['category'].unique().tolist())
+    Returns:
+        {"aisle", "count", "order", "products"}
+    """
+    return browse_group(request, "aisle", aisle, order)
+
+
+@app.get("/api/categories")
+async def list_categories(request: Request):
+    """
+    Get every category with its product count.
+    
+    Returns:
+        {"count", "groups": [{"category", "count"}]}
+    """
+    require_browse_groupings()
+    return browse_response(request, browse_groupings.index("category"))
+
+
+@app.get("/api/categories/{category}")
+async def browse_category(category: str, request: Request, order: str = "name"):
+    """
+    Get the products in a category.
+    
+    Args:
+        category: Product category (e.g., "Dairy"), case-insensitive
+        order: "name" or "id"
         
-        return {
-            "aisles": aisles,
-            "categories": categories
-        }
-    except Exception as e:
-        return {"error": f"Failed to load aisles and categories: {str(e)}"}
+    Returns:
+        {"category", "count", "order", "products"}
+    """
+    return browse_group(request, "category", category, order)
 
 
 @app.post("/api/upload-map")
@@ -412,38 +1372,130 @@ async def upload_map(file: UploadFile = File(...)):
     Returns:
         Success message or error
     """
+    # Check if file is SVG
+    if not file.filename.endswith('.svg'):
+        raise HTTPException(status_code=400, detail="Only SVG files are allowed")
+    
     try:
-        # Check if file is SVG
-        if not file.filename.endswith('.svg'):
-            raise HTTPException(status_code=400, detail="Only SVG files are allowed")
-        
-        # Create static directory if it doesn't exist
-        os.makedirs("static", exist_ok=True)
-        
-        # Save the file
-        file_path = f"static/{file.filename}"
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
-        
-        return {
-            "message": "Map uploaded successfully",
-            "filename": file.filename,
-            "path": f"/static/{file.filename}"
-        }
+        # Streamed to a temp file, minified, renamed into place, then .gz/.br variants written
+        asset = await map_store.save(file, file.filename)
+    except MapTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+    
+    logger.info("🗺️  Map %s published (%s)", asset.name, asset.to_dict()["bytes"])
+    return {
+        "message": "Map uploaded successfully",
+        "filename": file.filename,
+        "path": f"/static/{file.filename}",
+        # Content-hashed URL: cacheable forever, changes with every upload
+        "url": f"/static/{asset.hashed_name}",
+        "etag": asset.etag(),
+        "bytes": asset.to_dict()["bytes"]
+    }
+
+
+@app.get("/api/maps")
+async def list_maps():
+    """
+    List the uploaded maps.
+    
+    Returns:
+        {"maps": [{"filename", "url", "etag", "bytes"}]} - url is the content-hashed URL
+    """
+    assets = await asyncio.to_thread(map_store.assets)
+    return {"maps": [asset.to_dict() for asset in assets.values()]}
+
+
+@app.api_route("/static/{filename}", methods=["GET", "HEAD"])
+async def static_file(filename: str, request: Request):
+    """
+    Serve an uploaded map, precompressed when the client accepts it.
+    
+    Content-hashed names (/static/store_map.<hash>.svg) are cached for a year;
+    plain names are revalidated with their strong ETag (304 when unchanged).
+    
+    Args:
+        filename: Plain or content-hashed file name
+        
+    Returns:
+        The file, or 304 / 404
+    """
+    found = await asyncio.to_thread(map_store.lookup, filename)
+    if found is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    asset, immutable = found
+    encoding = asset.negotiate(request.headers.get("accept-encoding", ""))
+    headers = {
+        "ETag": asset.etag(encoding),
+        "Cache-Control": IMMUTABLE if immutable else "no-cache",
+        "Vary": "Accept-Encoding"
+    }
+    not_modified = asset.matches(request.headers.get("if-none-match", ""))
+    record_cache("static_etag", not_modified)
+    if not_modified:
+        return Response(status_code=304, headers=headers)
+    path, size = asset.variants[encoding] if encoding else (asset.path, asset.size)
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    RESPONSE_BYTES.observe(size, "static", encoding or "identity")
+    return FileResponse(path, media_type=asset.media_type, headers=headers)
 
 
 @app.websocket("/ws/conversation")
 async def websocket_conversation(websocket: WebSocket):
     await websocket.accept()
-    print("✅ Client connected")
+    # Tasks and worker threads started from here inherit this logging context
+    session = bind_session(session=next(_session_ids))
+    
+    queued = False
+    
+    async def hold(position: int):
+        nonlocal queued
+        queued = True
+        logger.info("⏳ Worker full - client waiting (position %d)", position)
+        await websocket.send_json({
+            "type": "admission",
+            "status": "queued",
+            "position": position,
+            "message": "Please hold, StorePal will be with you in a moment."
+        })
+    
+    try:
+        outcome = await admission.acquire(on_queued=hold)
+    except Exception as e:
+        logger.info("❌ Client left while waiting: %s", e)
+        return
+    if outcome != ADMITTED:
+        retry_after = admission.retry_after_hint()
+        logger.warning("🚦 Session rejected (%s) - retry after %d s", outcome, retry_after)
+        try:
+            await websocket.send_json({
+                "type": "admission",
+                "status": "rejected",
+                "reason": outcome,
+                "retry_after": retry_after
+            })
+            # 1013: Try Again Later
+            await websocket.close(code=1013, reason=f"Busy, retry after {retry_after} s")
+        except Exception:
+            pass
+        return
+    
+    logger.info("✅ Client connected")
+    ACTIVE_SESSIONS.inc()
+    active_sessions[session["session"]] = session
+    loop_monitor.register_task(asyncio.current_task(), session)
     
     agent = ElevenLabsAgent()
     agent.client_ws = websocket
     
     try:
+        if queued:
+            await websocket.send_json({"type": "admission", "status": "admitted"})
         await agent.connect_to_elevenlabs()
         
         # Enhanced prompt with product search capabilities
@@ -484,11 +1536,15 @@ async def websocket_conversation(websocket: WebSocket):
         await agent.send_initiation_message(config_override)
         
         elevenlabs_task = asyncio.create_task(agent.handle_elevenlabs_messages())
+        loop_monitor.register_task(elevenlabs_task, session)
         
         try:
             while True:
                 try:
                     message = await websocket.receive()
+                    if message.get("type") == "websocket.disconnect":
+                        break
+                    FRAMES.inc("upstream")
                     
                     if "text" in message:
                         data = json.loads(message["text"])
@@ -506,16 +1562,16 @@ async def websocket_conversation(websocket: WebSocket):
                         await agent.send_audio_to_elevenlabs(audio_base64)
                         
                 except WebSocketDisconnect:
-                    print("❌ Client disconnected")
+                    logger.info("❌ Client disconnected")
                     break
                 except Exception as e:
-                    print(f"⚠️ Error processing message: {e}")
+                    logger.warning("⚠️ Error processing message: %s", e)
                     continue
                     
         except WebSocketDisconnect:
-            print("❌ Client disconnected")
+            logger.info("❌ Client disconnected")
         except Exception as e:
-            print(f"❌ Error in WebSocket loop: {e}")
+            logger.error("❌ Error in WebSocket loop: %s", e)
         finally:
             if not elevenlabs_task.done():
                 elevenlabs_task.cancel()
@@ -525,7 +1581,7 @@ async def websocket_conversation(websocket: WebSocket):
                     pass
             
     except Exception as e:
-        print(f"❌ Error: {e}")
+        logger.error("❌ Error: %s", e)
         # Only send error if websocket is still open
         try:
             if websocket.client_state.name == "CONNECTED":
@@ -535,8 +1591,11 @@ async def websocket_conversation(websocket: WebSocket):
             pass
         
     finally:
+        ACTIVE_SESSIONS.dec()
+        admission.release()
+        active_sessions.pop(session["session"], None)
         await agent.close()
-        print("🔌 Connection closed")
+        logger.info("🔌 Connection closed")
 
 
 async def run_server():
@@ -564,6 +1623,11 @@ async def run_testing():
     print("  💬 Start speaking... (Press Ctrl+C to stop)")
     print("\n" + "="*60 + "\n")
     
+    # The audio stack is only needed here, never in server mode
+    import pyaudio
+    
+    initialize_search()
+    
     CHUNK = 1024
     FORMAT = pyaudio.paInt16
     CHANNELS = 1
@@ -595,11 +1659,11 @@ async def run_testing():
     playback_thread = threading.Thread(target=audio_playback_thread, daemon=True)
     playback_thread.start()
     
-    uri = f"wss://api.elevenlabs.io/v1/convai/conversation?agent_id={AGENT_ID}"
+    uri = f"{ELEVENLABS_WS_URL}?agent_id={AGENT_ID}"
     headers = {"xi-api-key": ELEVENLABS_API_KEY}
     
     try:
-        async with websockets.connect(uri, extra_headers=headers) as ws:
+        async with connect_upstream(uri, headers) as ws:
             print("✅ Connected to ElevenLabs\n")
             
             # Enhanced prompt with product search capabilities
@@ -3,12 +3,24 @@ Pinecone integration for StorePal.
 Provides vector search capabilities for WinMart inventory.
 """
 
-from .vector_search import VectorSearchEngine, SearchResult, quick_search, search_and_format
+from .vector_search import (
+    VectorSearchEngine,
+    SearchResult,
+    FrozenSearchResult,
+    quick_search,
+    search_and_format
+)
+from .response_templates import FormattedResults, render_results
+from .hybrid import BM25Index
 
 __all__ = [
     'VectorSearchEngine',
     'SearchResult',
+    'FrozenSearchResult',
     'quick_search',
-    'search_and_format'
+    'search_and_format',
+    'FormattedResults',
+    'render_results',
+    'BM25Index'
 ]
 
@@ -0,0 +1,274 @@
+"""
+Adaptive reranking for WinMart inventory search.
+Looks at the first-stage score distribution (top-1 margin and entropy) to
+decide per query whether to skip the hosted reranker, rerank a smaller
+candidate set, or rerank the full set. Thresholds are calibrated offline from
+a query log.
+
+Usage (from the backend folder):
+    # 1. Record first-stage scores and full rerank results for logged queries
+    python -m pinecone_vdb.adaptive_rerank collect --queries queries.txt --out rerank_log.jsonl
+    # 2. Fit thresholds offline
+    python -m pinecone_vdb.adaptive_rerank calibrate --log rerank_log.jsonl --out rerank_policy.json
+"""
+
+import argparse
+import json
+import math
+import random
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+
+@dataclass
+class RerankPolicy:
+    """Thresholds for the skip / shrink / full decision."""
+    skip_margin: float = 0.08        # top-1 minus top-2 first-stage score
+    skip_max_entropy: float = 0.6    # normalized entropy of softmax(scores / temperature)
+    shrink_margin: float = 0.03
+    shrink_k: int = 8                # candidates sent to the reranker when shrinking
+    temperature: float = 0.05
+
+    @classmethod
+    def load(cls, path: Union[str, Path]) -> "RerankPolicy":
+        """Load a calibrated policy written by `calibrate`."""
+        with open(path, encoding="utf-8") as f:
+            return cls(**json.load(f))
+
+    def save(self, path: Union[str, Path]) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(asdict(self), f, indent=2)
+
+
+@dataclass(slots=True)
+class RerankDecision:
+    """What to do with one query's candidates."""
+    action: str  # "skip", "shrink" or "full"
+    candidates: int
+    margin: float
+    entropy: float
+
+
+def score_margin(scores: Sequence[float]) -> float:
+    """Top-1 minus top-2 score (scores are best first)."""
+    if len(scores) < 2:
+        return float("inf") if scores else 0.0
+    return scores[0] - scores[1]
+
+
+def score_entropy(scores: Sequence[float], temperature: float = 0.05) -> float:
+    """Normalized Shannon entropy (0 = one clear winner, 1 = flat) of softmax(scores / T)."""
+    if len(scores) < 2:
+        return 0.0
+    top = scores[0]
+    weights = [math.exp((s - top) / temperature) for s in scores]
+    total = sum(weights)
+    entropy = -sum((w / total) * math.log(w / total) for w in weights if w > 0)
+    return entropy / math.log(len(scores))
+
+
+def decide(scores: Sequence[float], policy: RerankPolicy) -> RerankDecision:
+    """
+    Decide how much reranking a query needs from its first-stage scores.
+
+    Args:
+        scores: First-stage scores, best first
+        policy: Thresholds
+
+    Returns:
+        RerankDecision
+    """
+    margin = score_margin(scores)
+    entropy = score_entropy(scores, policy.temperature)
+    if margin >= policy.skip_margin and entropy <= policy.skip_max_entropy:
+        return RerankDecision("skip", 0, margin, entropy)
+    if margin >= policy.shrink_margin and len(scores) > policy.shrink_k:
+        return RerankDecision("shrink", policy.shrink_k, margin, entropy)
+    return RerankDecision("full", len(scores), margin, entropy)
+
+
+class AdaptiveRerankStats:
+    """
+    Counters for the adaptive reranker: decisions taken, rerank calls and
+    candidate pairs avoided, and a shadow-evaluated quality delta.
+    """
+
+    def __init__(self, shadow_rate: float = 0.0):
+        """
+        Args:
+            shadow_rate: Share of skipped/shrunk queries that also run the full
+                rerank to measure top-1 agreement (one extra rerank call each, made
+                in a background thread by VectorSearchEngine)
+        """
+        self.shadow_rate = shadow_rate
+        self.decisions: Dict[str, int] = {"skip": 0, "shrink": 0, "full": 0}
+        self.rerank_calls_avoided = 0
+        self.pairs_reranked = 0
+        self.pairs_avoided = 0
+        self.shadow_checks = 0
+        self.shadow_top1_agree = 0
+
+    def record(self, decision: RerankDecision, candidate_count: int) -> None:
+        self.decisions[decision.action] += 1
+        if decision.action == "skip":
+            self.rerank_calls_avoided += 1
+        reranked = 0 if decision.action == "skip" else min(decision.candidates, candidate_count)
+        self.pairs_reranked += reranked
+        self.pairs_avoided += candidate_count - reranked
+
+    def should_shadow(self, decision: RerankDecision) -> bool:
+        return decision.action != "full" and self.shadow_rate > 0 and random.random() < self.shadow_rate
+
+    def record_shadow(self, agreed: bool) -> None:
+        self.shadow_checks += 1
+        if agreed:
+            self.shadow_top1_agree += 1
+
+    def to_dict(self) -> Dict[str, object]:
+        total = sum(self.decisions.values())
+        agreement = self.shadow_top1_agree / self.shadow_checks if self.shadow_checks else None
+        return {
+            "queries": total,
+            "decisions": dict(self.decisions),
+            "rerank_calls_avoided": self.rerank_calls_avoided,
+            "rerank_call_avoided_ratio": round(self.rerank_calls_avoided / total, 4) if total else 0.0,
+            "pairs_reranked": self.pairs_reranked,
+            "pairs_avoided": self.pairs_avoided,
+            "shadow_checks": self.shadow_checks,
+            "shadow_top1_agreement": round(agreement, 4) if agreement is not None else None,
+            # Share of adaptive answers whose top-1 differs from the full rerank
+            "quality_delta_top1": round(1 - agreement, 4) if agreement is not None else None,
+        }
+
+
+def calibrate(
+    rows: List[Dict],
+    target_agreement: float = 0.98,
+    top_n: int = 5,
+    min_queries: int = 20,
+    base: Optional[RerankPolicy] = None
+) -> RerankPolicy:
+    """
+    Fit skip and shrink thresholds from a logged set of queries.
+
+    Each row holds the first-stage `scores` and `ids` (best first) and the
+    `reranked_ids` the full rerank returned. The skip margin is the smallest
+    margin at which the first-stage top-1 matches the reranked top-1 for at
+    least target_agreement of the queries above it. The shrink size is the
+    smallest candidate count that contains the reranked top_n for at least
+    target_agreement of the remaining queries. If no margin meets the target,
+    the policy never skips (skip_margin is infinite) and only shrinks.
+
+    Args:
+        rows: Logged queries (see `collect`)
+        target_agreement: Required top-1 agreement / coverage rate
+        top_n: Number of results returned per query
+        min_queries: Minimum queries above the skip threshold (guards tiny logs)
+        base: Policy to take the remaining settings from
+
+    Returns:
+        Calibrated RerankPolicy
+    """
+    policy = RerankPolicy(**asdict(base)) if base else RerankPolicy()
+    usable = [r for r in rows if len(r["scores"]) >= 2 and r["reranked_ids"]]
+    if not usable:
+        return policy
+
+    # Skip threshold: sweep candidate margins from large to small and keep the
+    # smallest one whose above-threshold set still meets the agreement target.
+    by_margin = sorted(usable, key=lambda r: score_margin(r["scores"]), reverse=True)
+    agree = 0
+    skip_margin = None
+    for seen, row in enumerate(by_margin, 1):
+        agree += row["ids"][0] == row["reranked_ids"][0]
+        if seen >= min(min_queries, len(by_margin)) and agree / seen >= target_agreement:
+            skip_margin = score_margin(row["scores"])
+    if skip_margin is None:
+        # The log does not justify skipping at any margin (not even the default one)
+        policy.skip_margin = float("inf")
+    else:
+        policy.skip_margin = round(skip_margin, 6)
+        policy.skip_max_entropy = round(max(
+            score_entropy(r["scores"], policy.temperature)
+            for r in usable if score_margin(r["scores"]) >= skip_margin
+        ), 6)
+
+    # Shrink size: how deep in the first stage do the reranked results come from?
+    remaining = [r for r in usable if score_margin(r["scores"]) < policy.skip_margin]
+    if remaining:
+        depths = sorted(
+            max(r["ids"].index(pid) + 1 if pid in r["ids"] else len(r["ids"]) for pid in r["reranked_ids"][:top_n])
+            for r in remaining
+        )
+        policy.shrink_k = max(top_n, depths[min(len(depths) - 1, int(len(depths) * target_agreement))])
+        # Shrinking is only offered above the median margin of the remaining queries
+        margins = sorted(score_margin(r["scores"]) for r in remaining)
+        policy.shrink_margin = round(margins[len(margins) // 2], 6)
+    return policy
+
+
+def collect(engine, queries: List[str], top_k: int = 20, top_n: int = 5) -> List[Dict]:
+    """
+    Record first-stage scores and full rerank output for each query.
+
+    Args:
+        engine: VectorSearchEngine
+        queries: Query strings (e.g. from a query log)
+        top_k: First-stage candidates
+        top_n: Results kept after reranking
+
+    Returns:
+        Rows suitable for `calibrate`
+    """
+    rows = []
+    for query in queries:
+        candidates = engine.semantic_search(query, top_k=top_k)
+        reranked = engine.rerank(query, candidates, top_n=top_n)
+        rows.append({
+            "query": query,
+            "scores": [c.score for c in candidates],
+            "ids": [c.product_id for c in candidates],
+            "reranked_ids": [r.product_id for r in reranked],
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Calibrate adaptive reranking thresholds")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    collect_parser = sub.add_parser("collect", help="Run logged queries against Pinecone and record scores")
+    collect_parser.add_argument("--queries", type=Path, required=True, help="One query per line")
+    collect_parser.add_argument("--out", type=Path, required=True)
+    collect_parser.add_argument("--top-k", type=int, default=20)
+
+    calibrate_parser = sub.add_parser("calibrate", help="Fit thresholds from a collected log")
+    calibrate_parser.add_argument("--log", type=Path, required=True)
+    calibrate_parser.add_argument("--out", type=Path, required=True)
+    calibrate_parser.add_argument("--target", type=float, default=0.98, help="Required top-1 agreement")
+    args = parser.parse_args()
+
+    if args.command == "collect":
+        from .vector_search import VectorSearchEngine
+        queries = [line.strip() for line in open(args.queries, encoding="utf-8") if line.strip()]
+        rows = collect(VectorSearchEngine(), queries, top_k=args.top_k)
+        with open(args.out, "w", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        print(f"✅ Recorded {len(rows)} queries to {args.out}")
+    else:
+        rows = [json.loads(line) for line in open(args.log, encoding="utf-8") if line.strip()]
+        policy = calibrate(rows, target_agreement=args.target)
+        policy.save(args.out)
+        decisions = [decide(r["scores"], policy).action for r in rows]
+        print(f"✅ Calibrated on {len(rows)} queries -> {args.out}")
+        if math.isinf(policy.skip_margin):
+            print(f"⚠️  No margin reaches {args.target:.0%} top-1 agreement: reranking is never skipped")
+        print(f"   {asdict(policy)}")
+        for action in ("skip", "shrink", "full"):
+            print(f"   {action:<7} {decisions.count(action)}")
+
+
+if __name__ == "__main__":
+    main()
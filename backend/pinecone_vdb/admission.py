@@ -0,0 +1,180 @@
+"""
+Admission control and load shedding for /ws/conversation sessions.
+A worker admits up to max_sessions conversations; further clients wait in a
+short FIFO queue (and are told to hold) until a slot frees or the wait times
+out, and clients beyond the queue are rejected with a retry-after hint.
+As the worker fills up, optional per-session work is shed in priority order
+(VAD score forwarding first), so the audio of admitted sessions stays smooth.
+
+Usage:
+    admission = AdmissionController(max_sessions=40, max_waiting=10, wait_timeout=15)
+    outcome = await admission.acquire(on_queued=tell_client_to_hold)
+    if outcome != ADMITTED: reject(...)
+    try: ... finally: admission.release()
+
+    if admission.shedding("vad_forwarding"): skip the frame
+"""
+
+import asyncio
+import random
+from collections import deque
+from typing import Awaitable, Callable, Deque, Dict, Optional
+
+try:
+    from .metrics import REGISTRY
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from metrics import REGISTRY
+
+
+ADMITTED = "admitted"
+QUEUE_FULL = "queue_full"
+TIMEOUT = "timeout"
+
+# Optional work shed as the worker fills up, and the utilization (active
+# sessions / max_sessions) at which each is dropped - lowest first
+DEFAULT_SHED_THRESHOLDS: Dict[str, float] = {
+    "vad_forwarding": 0.75,        # VAD score events relayed to the kiosk UI
+    "interim_transcripts": 0.85,   # live (non-final) transcripts relayed to the kiosk UI
+    "search_variants": 0.95,       # extra query variants searched per product question
+}
+
+SESSIONS_ADMITTED = REGISTRY.counter(
+    "storepal_sessions_admitted_total", "Conversation sessions admitted, directly or after waiting", ["path"]
+)
+SESSIONS_REJECTED = REGISTRY.counter(
+    "storepal_sessions_rejected_total", "Conversation sessions turned away by admission control", ["reason"]
+)
+SESSIONS_WAITING = REGISTRY.gauge("storepal_sessions_waiting", "Conversation sessions waiting for a slot")
+SHED_EVENTS = REGISTRY.counter(
+    "storepal_shed_events_total", "Optional work skipped by load shedding", ["feature"]
+)
+
+
+def parse_shed_thresholds(spec: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a SHED_THRESHOLDS value such as "vad_forwarding=0.6,search_variants=0.9".
+
+    Features that are not listed keep their default threshold; a threshold
+    above 1 never sheds.
+    """
+    thresholds = dict(DEFAULT_SHED_THRESHOLDS)
+    for item in (spec or "").split(","):
+        if not item.strip():
+            continue
+        feature, _, value = item.partition("=")
+        feature = feature.strip()
+        if feature not in thresholds:
+            raise ValueError(f"Unknown shed feature '{feature}'. Expected one of {', '.join(thresholds)}")
+        thresholds[feature] = float(value)
+    return thresholds
+
+
+class AdmissionController:
+    """Per-worker session cap with a bounded wait queue."""
+
+    def __init__(
+        self,
+        max_sessions: int = 0,
+        max_waiting: int = 10,
+        wait_timeout: float = 15.0,
+        retry_after: float = 10.0,
+        shed_thresholds: Optional[Dict[str, float]] = None
+    ):
+        """
+        Args:
+            max_sessions: Concurrent sessions admitted (0 = no limit, no shedding)
+            max_waiting: Clients that may wait for a slot
+            wait_timeout: Seconds a client waits before being turned away
+            retry_after: Base retry hint in seconds (jittered up to 2x so
+                rejected kiosks do not come back in lockstep)
+            shed_thresholds: Utilization per shed feature (see DEFAULT_SHED_THRESHOLDS)
+        """
+        self.max_sessions = max_sessions
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.retry_after = retry_after
+        self.shed_thresholds = dict(shed_thresholds or DEFAULT_SHED_THRESHOLDS)
+        self.active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        SESSIONS_WAITING.set_function(lambda: len(self._waiters))
+
+    @property
+    def waiting(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def utilization(self) -> float:
+        return self.active / self.max_sessions if self.max_sessions else 0.0
+
+    def shedding(self, feature: str) -> bool:
+        """True if `feature` should be skipped at the current load (counted when it is)."""
+        if not self.max_sessions or self.active < self.max_sessions * self.shed_thresholds[feature]:
+            return False
+        SHED_EVENTS.inc(feature)
+        return True
+
+    def retry_after_hint(self) -> int:
+        return int(self.retry_after * (1 + random.random())) or 1
+
+    async def acquire(self, on_queued: Optional[Callable[[int], Awaitable[None]]] = None) -> str:
+        """
+        Take a session slot, waiting in the queue if the worker is full.
+
+        Args:
+            on_queued: Awaited with the queue position when the client has to
+                wait (e.g. to send a "please hold" message)
+
+        Returns:
+            ADMITTED, QUEUE_FULL or TIMEOUT
+        """
+        if not self.max_sessions or (self.active < self.max_sessions and not self._waiters):
+            self.active += 1
+            SESSIONS_ADMITTED.inc("direct")
+            return ADMITTED
+        if len(self._waiters) >= self.max_waiting:
+            SESSIONS_REJECTED.inc(QUEUE_FULL)
+            return QUEUE_FULL
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            if on_queued is not None:
+                await on_queued(len(self._waiters))
+            await asyncio.wait_for(asyncio.shield(waiter), self.wait_timeout)
+        except BaseException as e:
+            # The slot may have been handed over just as the wait ended
+            handed_over = waiter.done() and not waiter.cancelled()
+            if not handed_over:
+                waiter.cancel()
+                if waiter in self._waiters:
+                    self._waiters.remove(waiter)
+            if not isinstance(e, asyncio.TimeoutError):
+                if handed_over:
+                    self.release()
+                raise
+            if not handed_over:
+                SESSIONS_REJECTED.inc(TIMEOUT)
+                return TIMEOUT
+        SESSIONS_ADMITTED.inc("queued")
+        return ADMITTED
+
+    def release(self) -> None:
+        """Free a slot, handing it straight to the longest-waiting client."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)  # the slot moves to the waiter; active is unchanged
+                return
+        self.active = max(0, self.active - 1)
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "max_sessions": self.max_sessions,
+            "active": self.active,
+            "waiting": self.waiting,
+            "utilization": round(self.utilization, 3),
+            "shedding": {
+                feature: bool(self.max_sessions) and self.active >= self.max_sessions * threshold
+                for feature, threshold in self.shed_thresholds.items()
+            },
+        }
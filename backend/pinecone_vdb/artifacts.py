@@ -0,0 +1,317 @@
+"""
+Prebuilt, memory-mapped catalog artifacts shared by StorePal worker processes.
+The catalog rows, every pre-serialized browse payload and the recommendation
+table are written once to a directory; each worker maps the files read-only,
+so N workers share one copy in the page cache instead of parsing the CSV and
+serializing groupings N times at startup.
+
+Usage (from the backend folder):
+    python -m pinecone_vdb.artifacts build [--out artifacts]
+    python -m pinecone_vdb.artifacts check [--dir artifacts]
+
+    ARTIFACTS_DIR=artifacts python main.py
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+try:
+    from .browse import BrowseGroupings, BrowsePayload
+    from .catalog import DATA_PATH, build_chunk_text, load_catalog
+    from .catalog_filters import CatalogFilters
+    from .recommendations import RecommendationTable, DEFAULT_PATH as DEFAULT_RECOMMENDATIONS_PATH
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from browse import BrowseGroupings, BrowsePayload
+    from catalog import DATA_PATH, build_chunk_text, load_catalog
+    from catalog_filters import CatalogFilters
+    from recommendations import RecommendationTable, DEFAULT_PATH as DEFAULT_RECOMMENDATIONS_PATH
+    from vector_search import SearchResult
+
+
+DEFAULT_DIR = Path(__file__).parent.parent / "artifacts"
+FORMAT_VERSION = 1
+
+MANIFEST = "manifest.json"
+CATALOG = "catalog.bin"
+CATALOG_OFFSETS = "catalog_offsets.npy"
+BROWSE = "browse.bin"
+BROWSE_INDEX = "browse_index.json"
+RECOMMENDATION_ARRAYS = ("product_ids", "neighbors", "scores")
+
+
+def _sha256(path: Path) -> Optional[str]:
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _browse_key(kind: str, name: str, order: str) -> str:
+    return f"{kind}/{name.strip().lower()}/{order}"
+
+
+def build_artifacts(
+    out_dir: Union[str, Path] = DEFAULT_DIR,
+    csv_path: Optional[Union[str, Path]] = None,
+    recommendations_path: Optional[Union[str, Path]] = DEFAULT_RECOMMENDATIONS_PATH
+) -> Dict[str, object]:
+    """
+    Write the shared artifacts for a catalog.
+
+    Args:
+        out_dir: Directory to write (created if missing)
+        csv_path: Inventory CSV (defaults to data/winmart_inventory.csv)
+        recommendations_path: Recommendation table .npz, copied as mappable
+            .npy arrays when it exists
+
+    Returns:
+        The manifest that was written
+    """
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    (out / MANIFEST).unlink(missing_ok=True)
+    csv_path = Path(csv_path or DATA_PATH)
+    products = load_catalog(csv_path)
+
+    # Catalog: a JSON list of compact rows (parsed in one call), with the
+    # offset of every row so a single product can be decoded on its own
+    offsets = []
+    with open(out / CATALOG, "wb") as f:
+        position = f.write(b"[")
+        for i, p in enumerate(products):
+            if i:
+                position += f.write(b",")
+            row = json.dumps(
+                [p.product_id, p.item_name, p.category, p.description, p.aisle_location],
+                separators=(",", ":"), ensure_ascii=False
+            ).encode("utf-8")
+            offsets.append(position)
+            position += f.write(row)
+        offsets.append(position)
+        f.write(b"]")
+    np.save(out / CATALOG_OFFSETS, np.array(offsets, dtype=np.int64))
+
+    # Browse payloads: bodies back to back, with (offset, length, etag) per key
+    groupings = BrowseGroupings(CatalogFilters(products))
+    index: Dict[str, Tuple[int, int, str]] = {}
+    position = 0
+    with open(out / BROWSE, "wb") as f:
+        def write(key: str, payload: BrowsePayload) -> None:
+            nonlocal position
+            f.write(payload.body)
+            index[key] = (position, len(payload.body), payload.etag)
+            position += len(payload.body)
+
+        for kind in ("aisle", "category"):
+            write(f"index/{kind}", groupings.index(kind))
+        for kind, name, order, payload in groupings.payloads():
+            write(_browse_key(kind, name, order), payload)
+    (out / BROWSE_INDEX).write_text(json.dumps(index), encoding="utf-8")
+
+    recommendations_path = Path(recommendations_path) if recommendations_path else None
+    has_recommendations = bool(recommendations_path and recommendations_path.exists())
+    if has_recommendations:
+        data = np.load(recommendations_path)
+        for name in RECOMMENDATION_ARRAYS:
+            np.save(out / f"recommendations_{name}.npy", data[name])
+
+    manifest = {
+        "version": FORMAT_VERSION,
+        "built_at": time.time(),
+        "products": len(products),
+        "catalog_sha256": _sha256(csv_path),
+        "recommendations_sha256": _sha256(recommendations_path) if has_recommendations else None,
+    }
+    # Written last: a directory without a manifest is an incomplete build
+    (out / MANIFEST).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return manifest
+
+
+def _product(row: List) -> SearchResult:
+    product_id, name, category, description, aisle = row
+    return SearchResult(
+        product_id, name, category, description, aisle, 0.0,
+        build_chunk_text(name, category, description, aisle)
+    )
+
+
+class MappedCatalog:
+    """
+    Read-only catalog rows decoded on access from a memory-mapped file.
+    A sequence like load_catalog's list, but no row is kept in memory: the
+    in-process indexes hold it and decode the few rows a lookup returns.
+    """
+
+    def __init__(self, directory: Path):
+        with open(directory / CATALOG, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._offsets = np.load(directory / CATALOG_OFFSETS, mmap_mode="r")
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int) -> SearchResult:
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return _product(json.loads(self._data[start:end].rstrip(b",")))
+
+    def __iter__(self) -> Iterator[SearchResult]:
+        # One json.loads for the whole file (much faster than one per row); the
+        # decoded rows are dropped as the caller moves on
+        for row in json.loads(self._data[:]):
+            yield _product(row)
+
+    def products(self) -> List[SearchResult]:
+        """All rows as a list, in CSV order (a private copy; prefer the catalog itself)."""
+        return list(self)
+
+
+class MappedBrowseGroupings:
+    """BrowseGroupings served from the prebuilt payload file (same get/index API)."""
+
+    def __init__(self, directory: Path):
+        with open(directory / BROWSE, "rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._index: Dict[str, List] = json.loads((directory / BROWSE_INDEX).read_text(encoding="utf-8"))
+
+    def _payload(self, key: str) -> Optional[BrowsePayload]:
+        entry = self._index.get(key)
+        if entry is None:
+            return None
+        offset, length, etag = entry
+        return BrowsePayload(self._data[offset:offset + length], etag)
+
+    def get(self, kind: str, name: str, order: str = "name") -> Optional[BrowsePayload]:
+        return self._payload(_browse_key(kind, name, order))
+
+    def index(self, kind: str) -> BrowsePayload:
+        return self._payload(f"index/{kind}")
+
+
+class Artifacts:
+    """An opened artifact directory."""
+
+    def __init__(self, directory: Union[str, Path] = DEFAULT_DIR):
+        """
+        Map the artifacts in a directory.
+
+        Args:
+            directory: Directory written by build_artifacts
+
+        Raises:
+            FileNotFoundError: No complete build in the directory
+            ValueError: Built by an incompatible version
+        """
+        self.directory = Path(directory)
+        manifest_path = self.directory / MANIFEST
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No artifacts in {self.directory} - run python -m pinecone_vdb.artifacts build")
+        self.manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if self.manifest.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Artifacts in {self.directory} are format {self.manifest.get('version')}, expected {FORMAT_VERSION}")
+        self.catalog = MappedCatalog(self.directory)
+        self.browse = MappedBrowseGroupings(self.directory)
+
+    def is_current(
+        self,
+        csv_path: Optional[Union[str, Path]] = None,
+        recommendations_path: Optional[Union[str, Path]] = DEFAULT_RECOMMENDATIONS_PATH
+    ) -> bool:
+        """
+        True if the artifacts were built from the current inventory CSV and
+        recommendation table (a table added, changed or removed since the build
+        makes them stale too).
+        """
+        recommendations_path = Path(recommendations_path) if recommendations_path else None
+        return (
+            self.manifest["catalog_sha256"] == _sha256(Path(csv_path or DATA_PATH))
+            and self.manifest.get("recommendations_sha256") == (_sha256(recommendations_path) if recommendations_path else None)
+        )
+
+    def recommendations(self, products: Optional[Sequence[SearchResult]] = None) -> Optional[RecommendationTable]:
+        """The recommendation table with memory-mapped arrays, if one was built."""
+        if not self.manifest.get("recommendations_sha256"):
+            return None
+        arrays = [
+            np.load(self.directory / f"recommendations_{name}.npy", mmap_mode="r")
+            for name in RECOMMENDATION_ARRAYS
+        ]
+        return RecommendationTable(*arrays, products if products is not None else self.catalog)
+
+
+def open_artifacts(
+    directory: Union[str, Path] = DEFAULT_DIR,
+    csv_path: Optional[Union[str, Path]] = None,
+    rebuild: bool = False,
+    recommendations_path: Optional[Union[str, Path]] = DEFAULT_RECOMMENDATIONS_PATH
+) -> Artifacts:
+    """
+    Open an artifact directory, building it first if it is missing or stale.
+
+    Args:
+        directory: Artifact directory
+        csv_path: Inventory CSV the artifacts must match
+        rebuild: Build when missing or stale (the cluster supervisor does
+            this once before starting workers)
+        recommendations_path: Recommendation table the artifacts must match
+
+    Returns:
+        Artifacts
+    """
+    try:
+        artifacts = Artifacts(directory)
+        if artifacts.is_current(csv_path, recommendations_path):
+            return artifacts
+        if not rebuild:
+            raise ValueError(f"Artifacts in {directory} are stale - rebuild with python -m pinecone_vdb.artifacts build")
+    except FileNotFoundError:
+        if not rebuild:
+            raise
+    build_artifacts(directory, csv_path, recommendations_path)
+    return Artifacts(directory)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or check StorePal shared artifacts")
+    sub = parser.add_subparsers(dest="command", required=True)
+    build_parser = sub.add_parser("build", help="Write the artifacts for the inventory CSV")
+    build_parser.add_argument("--out", type=Path, default=DEFAULT_DIR)
+    build_parser.add_argument("--csv", type=Path, default=DATA_PATH)
+    build_parser.add_argument("--recommendations", type=Path, default=DEFAULT_RECOMMENDATIONS_PATH)
+    check_parser = sub.add_parser("check", help="Verify the artifacts match the inventory CSV")
+    check_parser.add_argument("--dir", type=Path, default=DEFAULT_DIR)
+    check_parser.add_argument("--csv", type=Path, default=DATA_PATH)
+    check_parser.add_argument("--recommendations", type=Path, default=DEFAULT_RECOMMENDATIONS_PATH)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        start = time.perf_counter()
+        manifest = build_artifacts(args.out, args.csv, args.recommendations)
+        elapsed = time.perf_counter() - start
+        recommendations = "with" if manifest["recommendations_sha256"] else "without"
+        print(f"✅ {manifest['products']} products ({recommendations} recommendations) in {elapsed * 1000:.0f} ms -> {args.out}")
+        return
+
+    try:
+        artifacts = Artifacts(args.dir)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"❌ {e}")
+        raise SystemExit(1)
+    if not artifacts.is_current(args.csv, args.recommendations):
+        print(f"⚠️  Artifacts in {args.dir} are stale (inventory CSV or recommendation table changed)")
+        raise SystemExit(1)
+    print(f"✅ Artifacts in {args.dir} are current ({len(artifacts.catalog)} products)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Precomputed aisle and category groupings for WinMart inventory browse endpoints.
+Every grouping is built once from the catalog and serialized to JSON bytes
+with an ETag, so a browse request is a dict lookup and never touches the
+vector backend or re-reads the CSV.
+"""
+
+import hashlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+try:
+    from .catalog_filters import CatalogFilters
+    from .compression import dumps_json
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from catalog_filters import CatalogFilters
+    from compression import dumps_json
+    from vector_search import SearchResult
+
+
+# Orderings every grouping is pre-serialized in
+ORDERINGS = ("name", "id")
+
+
+@dataclass(slots=True, frozen=True)
+class BrowsePayload:
+    """A pre-serialized JSON body and its ETag."""
+    body: bytes
+    etag: str
+
+
+def _product_record(product: SearchResult) -> Dict[str, object]:
+    """Same fields as a row of /api/inventory."""
+    return {
+        "id": product.product_id,
+        "item_name": product.item_name,
+        "category": product.category,
+        "description": product.description,
+        "aisle_location": product.aisle_location,
+    }
+
+
+def build_payload(data: object) -> BrowsePayload:
+    """Serialize once (compact JSON) and derive the ETag from the bytes."""
+    body = dumps_json(data)
+    return BrowsePayload(body, '"' + hashlib.sha1(body).hexdigest()[:20] + '"')
+
+
+def _ordered(products: List[SearchResult], order: str) -> List[SearchResult]:
+    if order == "name":
+        return sorted(products, key=lambda p: (p.item_name.lower(), p.product_id))
+    return sorted(products, key=lambda p: p.product_id)
+
+
+class BrowseGroupings:
+    """Aisle and category groupings, pre-serialized per ordering."""
+
+    def __init__(self, filters: CatalogFilters):
+        """
+        Build and serialize every grouping.
+
+        Args:
+            filters: Category/aisle bitsets over the catalog
+        """
+        self._groups: Dict[str, Dict[str, Dict[str, BrowsePayload]]] = {"aisle": {}, "category": {}}
+        self._indexes: Dict[str, BrowsePayload] = {}
+        for kind, names in (("aisle", filters.aisles), ("category", filters.categories)):
+            counts = []
+            for name in names:
+                products = filters.browse(**{kind: name}, top_k=None)
+                counts.append({kind: name, "count": len(products)})
+                self._groups[kind][name.strip().lower()] = {
+                    order: build_payload({
+                        kind: name,
+                        "count": len(products),
+                        "order": order,
+                        "products": [_product_record(p) for p in _ordered(products, order)],
+                    })
+                    for order in ORDERINGS
+                }
+            self._indexes[kind] = build_payload({"count": len(counts), "groups": counts})
+
+    @classmethod
+    def from_csv(cls, path: Optional[Union[str, Path]] = None) -> "BrowseGroupings":
+        """Build the groupings from winmart_inventory.csv (or another catalog CSV)."""
+        return cls(CatalogFilters.from_csv(path))
+
+    def get(self, kind: str, name: str, order: str = "name") -> Optional[BrowsePayload]:
+        """
+        Look up a pre-serialized grouping.
+
+        Args:
+            kind: "aisle" or "category"
+            name: Aisle or category name (case-insensitive)
+            order: "name" or "id"
+
+        Returns:
+            BrowsePayload, or None if the aisle/category does not exist
+        """
+        group = self._groups[kind].get(name.strip().lower())
+        return group[order] if group else None
+
+    def index(self, kind: str) -> BrowsePayload:
+        """Every aisle or category with its product count."""
+        return self._indexes[kind]
+
+    def payloads(self) -> Iterator[Tuple[str, str, str, BrowsePayload]]:
+        """Every grouping as (kind, lowercased name, order, payload)."""
+        for kind, groups in self._groups.items():
+            for key, group in groups.items():
+                for order, payload in group.items():
+                    yield kind, key, order, payload
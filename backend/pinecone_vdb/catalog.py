@@ -0,0 +1,51 @@
+"""
+Local catalog loading for WinMart inventory.
+Reads winmart_inventory.csv into SearchResult objects for in-process indexes.
+"""
+
+import csv
+from pathlib import Path
+from typing import List, Optional, Union
+
+try:
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from vector_search import SearchResult
+
+
+# Path to CSV file
+DATA_PATH = Path(__file__).parent.parent / "data" / "winmart_inventory.csv"
+
+
+def build_chunk_text(item_name: str, category: str, description: str, aisle_location: str) -> str:
+    """Build the text that is embedded for a product (must match what is uploaded)."""
+    return (
+        f"{item_name} in {category}. "
+        f"{description} "
+        f"Located in aisle {aisle_location}."
+    )
+
+
+def load_catalog(path: Optional[Union[str, Path]] = None) -> List[SearchResult]:
+    """
+    Load the inventory CSV as SearchResult objects (score 0.0).
+
+    Args:
+        path: CSV path (defaults to data/winmart_inventory.csv)
+
+    Returns:
+        List of SearchResult objects in file order
+    """
+    products = []
+    with open(path or DATA_PATH, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            products.append(SearchResult(
+                int(row["id"]),
+                row["item_name"],
+                row["category"],
+                row["description"],
+                row["aisle_location"],
+                0.0,
+                build_chunk_text(row["item_name"], row["category"], row["description"], row["aisle_location"])
+            ))
+    return products
@@ -0,0 +1,121 @@
+"""
+Category and aisle pre-filters for WinMart inventory.
+Keeps one bitset (a Python int, bit i = catalog row i) per category and per
+aisle, so local indexes can restrict candidates with a single AND before
+scoring, and browse requests without a query are answered straight from the
+catalog with no embedding call.
+"""
+
+import re
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+try:
+    from .catalog import load_catalog
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from catalog import load_catalog
+    from vector_search import SearchResult
+
+
+def _key(value: str) -> str:
+    return value.strip().lower()
+
+
+def _aisle_sort_key(aisle: str):
+    """Natural order for aisle labels: A2 before A10."""
+    return [int(part) if part.isdigit() else part for part in re.split(r"(\d+)", aisle.upper())]
+
+
+def rows_of(bits: int) -> List[int]:
+    """Row numbers set in a bitset, ascending."""
+    rows = []
+    while bits:
+        low = bits & -bits
+        rows.append(low.bit_length() - 1)
+        bits ^= low
+    return rows
+
+
+class CatalogFilters:
+    """Per-category and per-aisle bitsets over catalog rows."""
+
+    def __init__(self, products: List[SearchResult]):
+        """
+        Build the bitsets.
+
+        Args:
+            products: Catalog rows (see catalog.load_catalog); bit i is products[i]
+        """
+        self.products = products
+        self.all = (1 << len(products)) - 1
+        self._categories: Dict[str, int] = {}
+        self._aisles: Dict[str, int] = {}
+        self._category_names: Dict[str, str] = {}
+        self._aisle_names: Dict[str, str] = {}
+        for row, product in enumerate(products):
+            bit = 1 << row
+            category, aisle = _key(product.category), _key(product.aisle_location)
+            self._categories[category] = self._categories.get(category, 0) | bit
+            self._aisles[aisle] = self._aisles.get(aisle, 0) | bit
+            self._category_names.setdefault(category, product.category)
+            self._aisle_names.setdefault(aisle, product.aisle_location)
+
+    @classmethod
+    def from_csv(cls, path: Optional[Union[str, Path]] = None) -> "CatalogFilters":
+        """Build the filters from winmart_inventory.csv (or another catalog CSV)."""
+        return cls(load_catalog(path))
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    @property
+    def categories(self) -> List[str]:
+        return sorted(self._category_names.values())
+
+    @property
+    def aisles(self) -> List[str]:
+        return sorted(self._aisle_names.values(), key=_aisle_sort_key)
+
+    def mask(self, category: Optional[str] = None, aisle: Optional[str] = None) -> int:
+        """
+        Bitset of the rows matching every given filter (case-insensitive).
+
+        Args:
+            category: Product category (e.g., "Produce", "Dairy")
+            aisle: Aisle location (e.g., "A1", "B2")
+
+        Returns:
+            Bitset of matching rows (all rows when no filter is given, 0 for an unknown value)
+        """
+        bits = self.all
+        if category:
+            bits &= self._categories.get(_key(category), 0)
+        if aisle:
+            bits &= self._aisles.get(_key(aisle), 0)
+        return bits
+
+    def count(self, category: Optional[str] = None, aisle: Optional[str] = None) -> int:
+        return self.mask(category, aisle).bit_count()
+
+    def browse(
+        self,
+        category: Optional[str] = None,
+        aisle: Optional[str] = None,
+        top_k: Optional[int] = 10
+    ) -> List[SearchResult]:
+        """
+        List the products matching the filters, in catalog order.
+
+        Args:
+            category: Product category
+            aisle: Aisle location
+            top_k: Number of results to return (None for all)
+
+        Returns:
+            List of SearchResult objects (catalog rows, score 0.0)
+        """
+        rows = rows_of(self.mask(category, aisle))
+        if top_k is not None:
+            rows = rows[:top_k]
+        return [self.products[row] for row in rows]
@@ -0,0 +1,176 @@
+"""
+Response body encoding for the REST endpoints: fast JSON serialization and
+gzip/brotli negotiation.
+
+orjson is used to serialize JSON when it is installed (else the standard
+library, compact; FastJSONResponse is the app's default response class),
+and brotli is offered when the brotli package is
+installed. Bodies below a size threshold are sent uncompressed. Compressed
+variants of static bodies (inventory, browse groupings) are cached by ETag
+at the highest compression level, so they are compressed once. Each content
+coding of a body is a separate representation with its own ETag
+(coded_etag), and If-None-Match is checked with etag_matches.
+
+Usage:
+    compressor = BodyCompressor(min_size=1024)
+    encoding = compressor.negotiate(request.headers.get("accept-encoding", ""), len(body))
+    if encoding:
+        body = compressor.encode(body, encoding, cache_key=etag)
+"""
+
+import gzip
+import json
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from starlette.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def dumps_json(data: Any) -> bytes:
+    """Serialize to compact UTF-8 JSON (orjson if available)."""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps_json (the app's default response class)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_json(content)
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """Accept-Encoding as {coding: q}, e.g. "gzip, br;q=0.9" -> {"gzip": 1.0, "br": 0.9}."""
+    accepted = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+# One entity tag of an If-None-Match list; the weak prefix is dropped (If-None-Match
+# uses weak comparison), and commas inside the quotes are part of the tag
+_ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+def coded_etag(etag: str, encoding: Optional[str]) -> str:
+    """ETag of one content coding of a body, e.g. ('"3f2a"', "gzip") -> '"3f2a-gzip"' (identity: unchanged)."""
+    return f'{etag[:-1]}-{encoding}"' if encoding else etag
+
+
+def etag_matches(if_none_match: str, etags: Iterable[str]) -> bool:
+    """True if an If-None-Match header lists any of `etags`, or is "*"."""
+    header = if_none_match.strip()
+    if header == "*":
+        return True
+    listed = set(_ENTITY_TAG.findall(header))
+    return any(etag in listed for etag in etags)
+
+
+def choose_encoding(accept_encoding: str, offered: List[str]) -> Optional[str]:
+    """The client's preferred coding among `offered` (in server preference order; None: identity)."""
+    if not accept_encoding:
+        return None
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in offered:  # server preference breaks ties
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+class BodyCompressor:
+    """Negotiates and applies gzip/brotli, caching compressed static bodies."""
+
+    def __init__(
+        self,
+        min_size: int = 1024,
+        gzip_level: int = 5,
+        brotli_quality: int = 4,
+        max_cached: int = 512
+    ):
+        """
+        Args:
+            min_size: Bodies smaller than this are sent uncompressed (0 disables compression)
+            gzip_level: gzip level for per-request bodies (cached bodies use 9)
+            brotli_quality: brotli quality for per-request bodies (cached bodies use 11)
+            max_cached: Compressed static bodies kept (least recently used dropped first)
+        """
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.max_cached = max_cached
+        self.available: List[str] = (["br"] if brotli is not None else []) + ["gzip"]
+        self._cache: "OrderedDict[Tuple[str, str], bytes]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def negotiate(self, accept_encoding: str, size: int) -> Optional[str]:
+        """The coding to send a body of `size` bytes in (None: identity)."""
+        if not self.min_size or size < self.min_size:
+            return None
+        return choose_encoding(accept_encoding, self.available)
+
+    def compress(self, body: bytes, encoding: str, best: bool = False) -> bytes:
+        """Compress without caching (best: highest level, for bodies compressed once)."""
+        if encoding == "br":
+            return brotli.compress(body, quality=11 if best else self.brotli_quality)
+        return gzip.compress(body, compresslevel=9 if best else self.gzip_level, mtime=0)
+
+    def encode(self, body: bytes, encoding: str, cache_key: Optional[str] = None) -> bytes:
+        """
+        Compress a body.
+
+        Args:
+            body: Uncompressed body
+            encoding: "gzip" or "br" (from negotiate)
+            cache_key: ETag of a static body: compressed once at the best level and cached
+
+        Returns:
+            The compressed body
+        """
+        if cache_key is None:
+            return self.compress(body, encoding)
+        key = (cache_key, encoding)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return cached
+        compressed = self.compress(body, encoding, best=True)
+        with self._lock:
+            self._cache[key] = compressed
+            while len(self._cache) > self.max_cached:
+                self._cache.popitem(last=False)
+        return compressed
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "min_size": self.min_size,
+            "encodings": self.available,
+            "json": "orjson" if orjson is not None else "json",
+            "cached_bodies": len(self._cache),
+        }
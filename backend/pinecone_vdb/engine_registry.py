@@ -0,0 +1,202 @@
+"""
+Process-wide registry of VectorSearchEngine instances.
+Engines are keyed by (index, namespace, backend, engine options) and share
+one client per backend and one index handle per index, so repeated
+quick_search / search_and_format calls (and main.py) reuse the same
+keep-alive HTTP connection pool and index handles instead of building a
+client, looking up the index host and opening new connections on every
+call. Differently configured callers (main.py's engine has a sparse index
+and reranker, quick_search's has neither) get separate engines.
+
+Backends:
+    pinecone   the Pinecone SDK (needs PINECONE_API_KEY); the connection pool
+               is sized for pool_size concurrent searches
+    local      in-process BM25 stand-in (local_backend.LocalClient)
+
+Fork-safe: a child process (pre-fork servers, multiprocessing) starts with
+an empty registry and builds its own clients, since connections inherited
+from the parent cannot be shared.
+
+Usage:
+    engine = get_engine()                                  # default index, namespace, backend
+    engine = get_engine(namespace="winmart-products", backend="local")
+    close_engines()                                        # on shutdown
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+try:
+    from .vector_search import VectorSearchEngine
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from vector_search import VectorSearchEngine
+
+BACKENDS = ("pinecone", "local")
+# Same as the default asyncio.to_thread executor: one connection per search thread
+DEFAULT_POOL_SIZE = min(32, (os.cpu_count() or 1) + 4)
+
+EngineKey = Tuple[str, str, str, Tuple[Tuple[str, Any], ...]]
+
+
+def _pinecone_client(pool_size: int):
+    from pinecone import Pinecone
+    api_key = os.getenv("PINECONE_API_KEY")
+    if not api_key:
+        raise ValueError("PINECONE_API_KEY must be set in environment")
+    try:
+        return Pinecone(api_key=api_key, connection_pool_maxsize=pool_size)
+    except TypeError:  # SDKs before connection_pool_maxsize size the pool by pool_threads
+        return Pinecone(api_key=api_key, pool_threads=pool_size)
+
+
+def _local_client(pool_size: int):
+    try:
+        from .local_backend import LocalClient
+    except ImportError:  # running as a script from inside pinecone_vdb/
+        from local_backend import LocalClient
+    return LocalClient()
+
+
+CLIENT_FACTORIES: Dict[str, Callable[[int], Any]] = {"pinecone": _pinecone_client, "local": _local_client}
+
+
+def _option_key(value: Any) -> Any:
+    """Hashable values compare by value; others (lists, dicts) by identity."""
+    try:
+        hash(value)
+        return value
+    except TypeError:
+        return ("id", id(value))
+
+
+def _close(resource) -> None:
+    close = getattr(resource, "close", None)
+    if close is not None:
+        try:
+            close()
+        except Exception as e:
+            print(f"⚠️  Error closing {type(resource).__name__}: {e}")
+
+
+class EngineRegistry:
+    """Engines by (index, namespace, backend, options), clients by backend, index handles by (backend, index)."""
+
+    def __init__(self, pool_size: Optional[int] = None):
+        """
+        Args:
+            pool_size: HTTP connections kept per client (defaults to DEFAULT_POOL_SIZE)
+        """
+        self.pool_size = pool_size or DEFAULT_POOL_SIZE
+        self._reset()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._reset)
+
+    def _reset(self) -> None:
+        # Also run in a forked child: inherited clients are dropped, not closed
+        # (closing them would shut connections the parent is still using)
+        self._pid = os.getpid()
+        self._lock = threading.RLock()
+        self._clients: Dict[str, Any] = {}
+        self._indexes: Dict[Tuple[str, str], Any] = {}
+        self._engines: Dict[EngineKey, VectorSearchEngine] = {}
+
+    def _check_pid(self) -> None:
+        if self._pid != os.getpid():  # forked without register_at_fork
+            self._reset()
+
+    def client(self, backend: str = "pinecone"):
+        """The shared client of a backend (created on first use)."""
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown backend '{backend}'. Expected one of {', '.join(BACKENDS)}")
+        self._check_pid()
+        with self._lock:
+            if backend not in self._clients:
+                self._clients[backend] = CLIENT_FACTORIES[backend](self.pool_size)
+            return self._clients[backend]
+
+    def get(
+        self,
+        index_name: str = "winmart-inventory",
+        namespace: str = "winmart-products",
+        backend: str = "pinecone",
+        **options
+    ) -> VectorSearchEngine:
+        """
+        The engine for (index_name, namespace, backend, options), created on first use.
+
+        Args:
+            index_name: Name of the index
+            namespace: Namespace within the index
+            backend: "pinecone" or "local"
+            **options: Other VectorSearchEngine arguments (sparse_index, reranker, ...);
+                part of the key, so callers configured differently never share an
+                engine (objects such as a BM25Index match by identity)
+
+        Returns:
+            The shared VectorSearchEngine
+        """
+        key = (index_name, namespace, backend, tuple(sorted((name, _option_key(value)) for name, value in options.items())))
+        self._check_pid()
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                client = self.client(backend)
+                index = self._indexes.get((backend, index_name))
+                if index is None:
+                    index = self._indexes[(backend, index_name)] = client.Index(index_name)
+                engine = VectorSearchEngine(
+                    index_name=index_name, namespace=namespace, client=client, index=index, **options
+                )
+                self._engines[key] = engine
+            return engine
+
+    def close(self) -> None:
+        """Close every index handle and client (a later get() starts over)."""
+        self._check_pid()
+        with self._lock:
+            for resource in [*self._indexes.values(), *self._clients.values()]:
+                _close(resource)
+            self._clients.clear()
+            self._indexes.clear()
+            self._engines.clear()
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "pool_size": self.pool_size,
+            "clients": sorted(self._clients),
+            "engines": [
+                "/".join(key[:3]) + (f" ({', '.join(name for name, _ in key[3])})" if key[3] else "")
+                for key in self._engines
+            ],
+        }
+
+
+_registry: Optional[EngineRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry(pool_size: Optional[int] = None) -> EngineRegistry:
+    """The process-wide registry (pool_size applies when it is first created)."""
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                _registry = EngineRegistry(pool_size or int(os.getenv("PINECONE_POOL_SIZE", "0")) or None)
+    return _registry
+
+
+def get_engine(
+    index_name: str = "winmart-inventory",
+    namespace: str = "winmart-products",
+    backend: str = "pinecone",
+    **options
+) -> VectorSearchEngine:
+    """Shared engine from the process-wide registry (see EngineRegistry.get)."""
+    return get_registry().get(index_name, namespace, backend, **options)
+
+
+def close_engines() -> None:
+    """Close the process-wide registry's clients, if it was ever used."""
+    if _registry is not None:
+        _registry.close()
@@ -0,0 +1,188 @@
+"""
+Hybrid (BM25 + dense) retrieval for WinMart inventory.
+Provides an in-process BM25 index over chunk_text and score fusion helpers
+(weighted and reciprocal-rank) used by VectorSearchEngine.hybrid_search.
+"""
+
+import math
+from collections import Counter, defaultdict
+from dataclasses import replace
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+try:
+    from .catalog import load_catalog
+    from .catalog_filters import CatalogFilters, rows_of
+    from .lexical_index import tokenize
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from catalog import load_catalog
+    from catalog_filters import CatalogFilters, rows_of
+    from lexical_index import tokenize
+    from vector_search import SearchResult
+
+
+class BM25Index:
+    """
+    Okapi BM25 over product chunk_text (item name, category, description, aisle).
+    """
+
+    def __init__(self, products: List[SearchResult], k1: float = 1.2, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            products: Catalog rows (see catalog.load_catalog)
+            k1: Term-frequency saturation
+            b: Length normalization
+        """
+        self.products = products
+        self.k1 = k1
+        self.b = b
+        self.filters = CatalogFilters(products)
+
+        self._postings: Dict[str, List[tuple]] = defaultdict(list)  # term -> [(row, tf)]
+        lengths = []
+        for row, product in enumerate(products):
+            terms = tokenize(product.chunk_text)
+            lengths.append(len(terms))
+            for term, tf in Counter(terms).items():
+                self._postings[term].append((row, tf))
+
+        count = len(products)
+        avg_length = (sum(lengths) / count) if count else 0.0
+        # Per-document length normalization, precomputed once
+        self._norms = [k1 * (1 - b + b * length / avg_length) if avg_length else k1 for length in lengths]
+        self._idf = {
+            term: math.log(1 + (count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self._postings.items()
+        }
+
+    @classmethod
+    def from_csv(cls, path: Optional[Union[str, Path]] = None, **kwargs) -> "BM25Index":
+        """Build the index from winmart_inventory.csv (or another catalog CSV)."""
+        return cls(load_catalog(path), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def search(
+        self,
+        query: str,
+        top_k: int = 20,
+        category: Optional[str] = None,
+        aisle: Optional[str] = None
+    ) -> List[SearchResult]:
+        """
+        Score products against the query.
+
+        Args:
+            query: Natural language query
+            top_k: Number of results to return
+            category: Only score products in this category
+            aisle: Only score products in this aisle
+
+        Returns:
+            List of SearchResult objects with BM25 scores, best first
+        """
+        allowed = None
+        if category or aisle:
+            # Pre-filter: postings outside the category/aisle bitset are never scored
+            allowed = set(rows_of(self.filters.mask(category, aisle)))
+            if not allowed:
+                return []
+
+        scores: Dict[int, float] = defaultdict(float)
+        k1 = self.k1
+        for term in set(tokenize(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for row, tf in self._postings[term]:
+                if allowed is not None and row not in allowed:
+                    continue
+                scores[row] += idf * tf * (k1 + 1) / (tf + self._norms[row])
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [replace(self.products[row], score=score) for row, score in ranked]
+
+
+def fuse_rrf(ranked_lists: Sequence[Sequence[SearchResult]], k: int = 60) -> List[SearchResult]:
+    """
+    Reciprocal-rank fusion: score = sum(1 / (k + rank)) over the input lists.
+
+    Args:
+        ranked_lists: Result lists, each best first
+        k: RRF damping constant
+
+    Returns:
+        Fused list, best first, scored by RRF
+    """
+    scores: Dict[int, float] = defaultdict(float)
+    first_seen: Dict[int, SearchResult] = {}
+    for results in ranked_lists:
+        for rank, result in enumerate(results, 1):
+            scores[result.product_id] += 1.0 / (k + rank)
+            first_seen.setdefault(result.product_id, result)
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    return [replace(first_seen[pid], score=score) for pid, score in ranked]
+
+
+def _min_max(results: Sequence[SearchResult]) -> Dict[int, float]:
+    """Min-max normalize scores to [0, 1], keyed by product_id."""
+    if not results:
+        return {}
+    high = max(r.score for r in results)
+    low = min(r.score for r in results)
+    spread = high - low
+    return {r.product_id: (r.score - low) / spread if spread else 1.0 for r in results}
+
+
+def fuse_weighted(
+    dense: Sequence[SearchResult],
+    sparse: Sequence[SearchResult],
+    alpha: float = 0.5
+) -> List[SearchResult]:
+    """
+    Weighted fusion of min-max normalized scores: alpha * dense + (1 - alpha) * sparse.
+
+    Args:
+        dense: Dense (vector) results
+        sparse: BM25 results
+        alpha: Weight of the dense scores
+
+    Returns:
+        Fused list, best first, scored in [0, 1]
+    """
+    dense_scores = _min_max(dense)
+    sparse_scores = _min_max(sparse)
+    first_seen: Dict[int, SearchResult] = {}
+    for result in list(dense) + list(sparse):
+        first_seen.setdefault(result.product_id, result)
+    fused = {
+        pid: alpha * dense_scores.get(pid, 0.0) + (1 - alpha) * sparse_scores.get(pid, 0.0)
+        for pid in first_seen
+    }
+    ranked = sorted(fused.items(), key=lambda item: item[1], reverse=True)
+    return [replace(first_seen[pid], score=score) for pid, score in ranked]
+
+
+def top1_separated(
+    fused: Sequence[SearchResult],
+    dense: Sequence[SearchResult],
+    sparse: Sequence[SearchResult],
+    min_margin: float
+) -> bool:
+    """
+    Decide whether the fused top-1 is clear enough to skip reranking.
+    Dense and BM25 must agree on the top product, and the fused top-1 must lead
+    the runner-up by at least min_margin (relative to its own score).
+    """
+    if not fused:
+        return True
+    if not dense or not sparse or dense[0].product_id != sparse[0].product_id:
+        return False
+    if len(fused) == 1:
+        return True
+    top, runner_up = fused[0].score, fused[1].score
+    return top > 0 and (top - runner_up) / top >= min_margin
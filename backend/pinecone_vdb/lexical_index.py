@@ -0,0 +1,256 @@
+"""
+Lexical index for fast product-name lookups.
+Answers queries that name a product outright without touching the vector
+backend: a normalized-name hash map for exact mentions, a token inverted index
+for reordered names, and a trigram index for fuzzy (ASR-mangled) names.
+"""
+
+import re
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+try:
+    from .catalog import load_catalog
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from catalog import load_catalog
+    from vector_search import SearchResult
+
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+# Filler that carries no product information in kiosk questions
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "do", "does", "you", "your", "have", "has", "i", "im",
+    "we", "me", "my", "can", "could", "would", "find", "need", "want", "looking", "look",
+    "for", "some", "any", "of", "please", "get", "show", "which", "aisle", "aisles", "store",
+    "buy", "to", "what", "about", "it", "its", "they", "them", "there", "how", "much",
+    "where", "located", "locate", "sell", "carry", "stock", "in", "at", "on", "and", "or",
+    "with", "be", "kind", "sort", "type", "hi", "hello", "hey", "thanks", "thank",
+    "um", "uh", "like", "just", "also", "again", "that", "this", "these", "those",
+})
+
+
+def _singular(token: str) -> str:
+    """Very small plural folding so "apple" matches "Apples"."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, strip punctuation and fold plurals."""
+    return [_singular(t) for t in _NON_WORD.split(text.lower()) if t]
+
+
+def trigrams(text: str) -> Set[str]:
+    """Character trigrams of a normalized string, padded at word edges."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass(slots=True)
+class LexicalMatch:
+    """Outcome of a lexical lookup."""
+    results: List[SearchResult]
+    method: str  # "exact", "token", "fuzzy" or "none"
+    confidence: float
+    confident: bool
+    elapsed_ms: float = 0.0
+
+
+@dataclass
+class LexicalStats:
+    """Counters for measuring how many lookups the fast path serves."""
+    lookups: int = 0
+    fast_path: int = 0
+    by_method: Dict[str, int] = field(default_factory=lambda: defaultdict(int))
+
+    @property
+    def fast_path_ratio(self) -> float:
+        return self.fast_path / self.lookups if self.lookups else 0.0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "lookups": self.lookups,
+            "fast_path": self.fast_path,
+            "fast_path_ratio": round(self.fast_path_ratio, 4),
+            "by_method": dict(self.by_method),
+        }
+
+
+class LexicalIndex:
+    """
+    In-process lexical index over the product catalog.
+    Built once at startup; lookups are pure dict/set operations.
+    """
+
+    def __init__(
+        self,
+        products: List[SearchResult],
+        min_fuzzy_similarity: float = 0.75,
+        min_fuzzy_margin: float = 0.1,
+        max_results: int = 5
+    ):
+        """
+        Build the index.
+
+        Args:
+            products: Catalog rows (see catalog.load_catalog)
+            min_fuzzy_similarity: Trigram Dice similarity needed for a confident fuzzy match
+            min_fuzzy_margin: Required lead of the best fuzzy match over the runner-up
+            max_results: Maximum products returned by one lookup
+        """
+        self.products = products
+        self.min_fuzzy_similarity = min_fuzzy_similarity
+        self.min_fuzzy_margin = min_fuzzy_margin
+        self.max_results = max_results
+        self.stats = LexicalStats()
+
+        self._names: Dict[str, List[int]] = defaultdict(list)        # normalized name -> rows
+        self._postings: Dict[str, Set[int]] = defaultdict(set)       # token -> rows
+        self._trigram_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._name_tokens: List[Tuple[str, ...]] = []
+        self._name_trigrams: List[Set[str]] = []
+        self._max_name_len = 1
+
+        for row, product in enumerate(products):
+            tokens = tuple(tokenize(product.item_name))
+            normalized = " ".join(tokens)
+            self._names[normalized].append(row)
+            self._name_tokens.append(tokens)
+            self._max_name_len = max(self._max_name_len, len(tokens))
+            for token in set(tokens):
+                self._postings[token].add(row)
+            grams = trigrams(normalized)
+            self._name_trigrams.append(grams)
+            for gram in grams:
+                self._trigram_postings[gram].add(row)
+
+    @classmethod
+    def from_csv(cls, path: Optional[Union[str, Path]] = None, **kwargs) -> "LexicalIndex":
+        """Build the index from winmart_inventory.csv (or another catalog CSV)."""
+        return cls(load_catalog(path), **kwargs)
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def _result(self, row: int, score: float) -> SearchResult:
+        product = self.products[row]
+        return SearchResult(
+            product.product_id, product.item_name, product.category, product.description,
+            product.aisle_location, score, product.chunk_text
+        )
+
+    def _exact_matches(self, tokens: List[str]) -> List[int]:
+        """Products whose full normalized name appears as a contiguous span of the query."""
+        spans = []
+        for start in range(len(tokens)):
+            for end in range(min(len(tokens), start + self._max_name_len), start, -1):
+                rows = self._names.get(" ".join(tokens[start:end]))
+                if rows:
+                    spans.append((start, end, rows))
+                    break  # longest name starting here wins
+        # Drop mentions contained in a longer one ("apple" inside "granny smith apple")
+        kept = [
+            span for span in spans
+            if not any(o is not span and o[0] <= span[0] and span[1] <= o[1] for o in spans)
+        ]
+        matches = []
+        for _, _, rows in kept:
+            for row in rows:
+                if row not in matches:
+                    matches.append(row)
+        return matches
+
+    def _token_cover_matches(self, tokens: List[str]) -> List[int]:
+        """Products whose name tokens all appear in the query, in any order."""
+        query_tokens = set(tokens)
+        counts: Dict[int, int] = defaultdict(int)
+        for token in query_tokens:
+            for row in self._postings.get(token, ()):
+                counts[row] += 1
+        covered = [row for row, count in counts.items() if count == len(set(self._name_tokens[row]))]
+        # A name that is a subset of another covered name is not what was asked for
+        return [
+            row for row in covered
+            if not any(
+                other != row and set(self._name_tokens[row]) < set(self._name_tokens[other])
+                for other in covered
+            )
+        ]
+
+    def _fuzzy_matches(self, content: str) -> List[Tuple[float, float, int]]:
+        """Top (similarity, name coverage, row) trigram candidates for the query's content words."""
+        query_grams = trigrams(content)
+        overlap: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for row in self._trigram_postings.get(gram, ()):
+                overlap[row] += 1
+        scored = [
+            (
+                2.0 * common / (len(query_grams) + len(self._name_trigrams[row])),
+                common / len(self._name_trigrams[row]),
+                row
+            )
+            for row, common in overlap.items()
+        ]
+        scored.sort(reverse=True)
+        return scored[:2]
+
+    def _lookup(self, query: str) -> LexicalMatch:
+        tokens = tokenize(query)
+        if not tokens:
+            return LexicalMatch([], "none", 0.0, False)
+
+        rows = self._exact_matches(tokens)
+        if rows and len(rows) <= self.max_results:
+            return LexicalMatch([self._result(r, 1.0) for r in rows], "exact", 1.0, True)
+
+        content_tokens = [t for t in tokens if t not in STOPWORDS]
+        if not content_tokens:
+            return LexicalMatch([], "none", 0.0, False)
+
+        rows = self._token_cover_matches(content_tokens)
+        if len(rows) == 1:
+            return LexicalMatch([self._result(rows[0], 0.95)], "token", 0.95, True)
+
+        candidates = self._fuzzy_matches(" ".join(content_tokens))
+        if candidates:
+            best_score, best_coverage, best_row = candidates[0]
+            runner_up = candidates[1][0] if len(candidates) > 1 else 0.0
+            # Coverage keeps "baby food" from resolving to "Baby Food Bananas"
+            confident = (
+                best_score >= self.min_fuzzy_similarity
+                and best_coverage >= self.min_fuzzy_similarity
+                and best_score - runner_up >= self.min_fuzzy_margin
+            )
+            if confident:
+                return LexicalMatch([self._result(best_row, best_score)], "fuzzy", best_score, True)
+            return LexicalMatch([], "none", best_score, False)
+
+        return LexicalMatch([], "none", 0.0, False)
+
+    def lookup(self, query: str) -> LexicalMatch:
+        """
+        Resolve a query against product names.
+
+        Args:
+            query: User transcript or search text
+
+        Returns:
+            LexicalMatch; when `confident` is False the caller should fall
+            through to vector search
+        """
+        start = time.perf_counter()
+        match = self._lookup(query)
+        match.elapsed_ms = (time.perf_counter() - start) * 1000
+
+        self.stats.lookups += 1
+        if match.confident:
+            self.stats.fast_path += 1
+        self.stats.by_method[match.method] += 1
+        return match
@@ -0,0 +1,112 @@
+"""
+In-process stand-in for the Pinecone client, backed by BM25 over the local catalog.
+VectorSearchEngine(client=LocalClient()) runs every search path without a
+Pinecone account, for replaying query logs and benchmarking offline.
+Optional simulated latencies stand in for the network round trips
+(time.sleep releases the GIL, so concurrent callers overlap as they would
+on real sockets).
+
+Usage:
+    engine = VectorSearchEngine(client=LocalClient(latency_ms=80, rerank_latency_ms=60))
+    engine.search_with_reranking("organic oranges")
+"""
+
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+try:
+    from .hybrid import BM25Index
+    from .local_rerank import LexicalOverlapScorer
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from hybrid import BM25Index
+    from local_rerank import LexicalOverlapScorer
+    from vector_search import SearchResult
+
+
+def _hit(product: SearchResult, score: float) -> Dict[str, Any]:
+    fields = product.to_dict()
+    del fields["score"]
+    return {"_id": f"prod_{product.product_id}", "_score": score, "fields": fields}
+
+
+class LocalIndex:
+    """Answers Index.search (integrated embedding, optional rerank) from a BM25 index."""
+
+    def __init__(self, bm25: BM25Index, calls: Counter, lock: threading.Lock, latency_ms: float, rerank_latency_ms: float):
+        self.bm25 = bm25
+        self.calls = calls
+        self._lock = lock
+        self.latency_ms = latency_ms
+        self.rerank_latency_ms = rerank_latency_ms
+        self._scorer = LexicalOverlapScorer()
+
+    def search(self, namespace: str, query: Dict[str, Any], rerank: Optional[Dict[str, Any]] = None, **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            self.calls["search_rerank" if rerank else "search"] += 1
+        conditions = query.get("filter") or {}
+        results = self.bm25.search(
+            query["inputs"]["text"], top_k=query.get("top_k", 10),
+            category=(conditions.get("category") or {}).get("$eq"),
+            aisle=(conditions.get("aisle_location") or {}).get("$eq"),
+        )
+        # BM25 scores are unbounded; squash them into (0, 1) like similarity scores
+        hits = [_hit(r, r.score / (1.0 + r.score)) for r in results]
+        delay = self.latency_ms + (self.rerank_latency_ms if rerank else 0.0)
+        if rerank:
+            scores = self._scorer([(query["inputs"]["text"], h["fields"]["chunk_text"]) for h in hits])
+            ranked = sorted(zip(scores, range(len(hits))), reverse=True)[:rerank.get("top_n", len(hits))]
+            hits = [{**hits[i], "_score": score} for score, i in ranked]
+        if delay:
+            time.sleep(delay / 1000)
+        return {"result": {"hits": hits}}
+
+    def describe_index_stats(self) -> Dict[str, Any]:
+        return {"total_vector_count": len(self.bm25), "dimension": 0, "metric": "bm25", "namespaces": {}}
+
+
+class LocalInference:
+    """Answers inference.rerank with the lexical overlap scorer."""
+
+    def __init__(self, calls: Counter, lock: threading.Lock, latency_ms: float):
+        self.calls = calls
+        self._lock = lock
+        self.latency_ms = latency_ms
+        self._scorer = LexicalOverlapScorer()
+
+    def rerank(self, model: str, query: str, documents: List[Dict[str, Any]], top_n: int, rank_fields: List[str], **kwargs) -> Dict[str, Any]:
+        with self._lock:
+            self.calls["rerank"] += 1
+        field = rank_fields[0]
+        scores = self._scorer([(query, d[field]) for d in documents])
+        ranked = sorted(zip(scores, range(len(documents))), reverse=True)[:top_n]
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        return {"data": [{"index": i, "score": score} for score, i in ranked]}
+
+
+class LocalClient:
+    """Drop-in for pinecone.Pinecone with one in-process index shared by every Index(name)."""
+
+    def __init__(self, products: Optional[List[SearchResult]] = None, latency_ms: float = 0.0, rerank_latency_ms: float = 0.0):
+        """
+        Args:
+            products: Catalog rows (defaults to the inventory CSV)
+            latency_ms: Simulated round trip added to every index search
+            rerank_latency_ms: Simulated cost added to every rerank (hosted or integrated)
+        """
+        self.bm25 = BM25Index(products) if products is not None else BM25Index.from_csv()
+        self.calls: Counter = Counter()
+        self._lock = threading.Lock()
+        self._index = LocalIndex(self.bm25, self.calls, self._lock, latency_ms, rerank_latency_ms)
+        self.inference = LocalInference(self.calls, self._lock, rerank_latency_ms)
+
+    def Index(self, name: str) -> LocalIndex:
+        return self._index
+
+    def backend_calls(self) -> int:
+        """Round trips a real deployment would have made so far."""
+        with self._lock:
+            return sum(self.calls.values())
@@ -0,0 +1,247 @@
+"""
+Local (in-process) rerank stage for WinMart inventory search.
+Scores (query, chunk_text) pairs on CPU with a small cross-encoder, or with a
+dependency-free lexical scorer, and micro-batches pairs from all concurrent
+sessions into one forward pass.
+
+Select it with VectorSearchEngine(reranker=build_reranker("local")); main.py
+reads RERANKER (hosted|local|lexical), LOCAL_RERANK_MODEL,
+RERANK_BATCH_WINDOW_MS and RERANK_MAX_BATCH.
+"""
+
+import math
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import replace
+from typing import Callable, List, Optional, Sequence, Tuple
+
+try:
+    from .lexical_index import tokenize
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from lexical_index import tokenize
+    from vector_search import SearchResult
+
+
+DEFAULT_CROSS_ENCODER = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+Pair = Tuple[str, str]
+
+
+class CrossEncoderScorer:
+    """
+    Scores pairs with a sentence-transformers CrossEncoder on CPU.
+    sentence-transformers is optional and only imported when this is built.
+    Scores are relevance probabilities in [0, 1], like the hosted reranker's
+    (search_products thresholds and TopKMerger's early exit rely on that scale):
+    models that output raw logits, such as the ms-marco cross-encoders, are
+    passed through a sigmoid.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_CROSS_ENCODER, device: str = "cpu"):
+        try:
+            from sentence_transformers import CrossEncoder
+        except ImportError as e:
+            raise ImportError(
+                "The local cross-encoder reranker needs sentence-transformers "
+                "(pip install sentence-transformers)"
+            ) from e
+        self.model_name = model_name
+        self.model = CrossEncoder(model_name, device=device)
+        # The attribute was renamed in sentence-transformers 4 (default_activation_function before)
+        activation = getattr(self.model, "activation_fn", None) or getattr(self.model, "default_activation_function", None)
+        self.outputs_logits = activation is None or type(activation).__name__ == "Identity"
+
+    def __call__(self, pairs: Sequence[Pair]) -> List[float]:
+        scores = self.model.predict(list(pairs), batch_size=max(1, len(pairs)), show_progress_bar=False)
+        if self.outputs_logits:
+            return [1.0 / (1.0 + math.exp(-float(s))) for s in scores]
+        return [float(s) for s in scores]
+
+
+class LexicalOverlapScorer:
+    """
+    Dependency-free stand-in scorer: IDF-free soft token overlap between the
+    query and the document, length-normalized. Useful where a model cannot be
+    installed and as a baseline in benchmarks.
+    """
+
+    model_name = "lexical-overlap"
+
+    def __call__(self, pairs: Sequence[Pair]) -> List[float]:
+        scores = []
+        for query, document in pairs:
+            query_tokens = set(tokenize(query))
+            if not query_tokens:
+                scores.append(0.0)
+                continue
+            doc_tokens = tokenize(document)
+            overlap = sum(1 for t in doc_tokens if t in query_tokens)
+            scores.append(overlap / math.sqrt(len(query_tokens) * max(1, len(doc_tokens))))
+        return scores
+
+
+class _Request:
+    __slots__ = ("pairs", "future")
+
+    def __init__(self, pairs: Sequence[Pair]):
+        self.pairs = pairs
+        self.future: Future = Future()
+
+
+class MicroBatcher:
+    """
+    Collects scoring requests from concurrent callers for up to window_ms (or
+    until max_batch pairs) and scores them in one call. The window is only
+    waited out while other callers are active, so a lone request is scored
+    immediately. The worker thread starts on first use, so the batcher is safe
+    to create before a pre-fork server forks.
+    """
+
+    def __init__(self, score_fn: Callable[[Sequence[Pair]], List[float]], window_ms: float = 5.0, max_batch: int = 64):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self.stats = {"requests": 0, "batches": 0, "pairs": 0}
+        self._queue: "queue.Queue[Optional[_Request]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._active = 0  # callers currently waiting in score()
+
+    def _ensure_worker(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="rerank-batcher", daemon=True)
+                    self._thread.start()
+
+    def qsize(self) -> int:
+        """Requests waiting for the worker thread (approximate, like queue.Queue.qsize)."""
+        return self._queue.qsize()
+
+    def submit(self, pairs: Sequence[Pair]) -> Future:
+        """Queue pairs for scoring; the future resolves to their scores in order."""
+        request = _Request(pairs)
+        if not pairs:
+            request.future.set_result([])
+            return request.future
+        self._ensure_worker()
+        self._queue.put(request)
+        return request.future
+
+    def score(self, pairs: Sequence[Pair], timeout: Optional[float] = None) -> List[float]:
+        """Blocking helper around submit()."""
+        with self._lock:
+            self._active += 1
+        try:
+            return self.submit(pairs).result(timeout=timeout)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            batch = [first]
+            size = len(first.pairs)
+            deadline = time.monotonic() + self.window
+            stop = False
+            while size < self.max_batch and self._active > len(batch):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                size += len(item.pairs)
+
+            flat = [pair for request in batch for pair in request.pairs]
+            try:
+                scores = self.score_fn(flat)
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+            else:
+                offset = 0
+                for request in batch:
+                    request.future.set_result(scores[offset:offset + len(request.pairs)])
+                    offset += len(request.pairs)
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            self.stats["pairs"] += len(flat)
+            if stop:
+                return
+
+    def close(self) -> None:
+        """Stop the worker thread after it drains queued requests."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self._thread = None
+
+
+class LocalRerankStage:
+    """Reranks candidates in-process, batching pairs across concurrent callers."""
+
+    def __init__(self, scorer: Callable[[Sequence[Pair]], List[float]], window_ms: float = 5.0, max_batch: int = 64):
+        self.scorer = scorer
+        self.name = getattr(scorer, "model_name", type(scorer).__name__)
+        self.batcher = MicroBatcher(scorer, window_ms=window_ms, max_batch=max_batch)
+
+    def rerank(self, query: str, candidates: Sequence[SearchResult], top_n: int = 5) -> List[SearchResult]:
+        """
+        Score every candidate against the query and return the best top_n.
+
+        Args:
+            query: Natural language query
+            candidates: First-stage candidates
+            top_n: Number of results to return
+
+        Returns:
+            List of SearchResult objects scored by the local model
+        """
+        if not candidates:
+            return []
+        scores = self.batcher.score([(query, c.chunk_text) for c in candidates])
+        order = sorted(range(len(candidates)), key=scores.__getitem__, reverse=True)[:top_n]
+        return [replace(candidates[i], score=scores[i]) for i in order]
+
+    def close(self) -> None:
+        self.batcher.close()
+
+
+def build_reranker(
+    kind: str,
+    model_name: str = DEFAULT_CROSS_ENCODER,
+    window_ms: float = 5.0,
+    max_batch: int = 64
+) -> Optional[LocalRerankStage]:
+    """
+    Build the configured rerank stage.
+
+    Args:
+        kind: "hosted" (Pinecone inference, returns None), "local" (cross-encoder)
+            or "lexical" (dependency-free scorer)
+        model_name: Cross-encoder model for "local"
+        window_ms: Micro-batching window
+        max_batch: Maximum pairs per forward pass
+
+    Returns:
+        LocalRerankStage, or None for the hosted reranker
+    """
+    if kind == "hosted":
+        return None
+    if kind == "local":
+        return LocalRerankStage(CrossEncoderScorer(model_name), window_ms=window_ms, max_batch=max_batch)
+    if kind == "lexical":
+        return LocalRerankStage(LexicalOverlapScorer(), window_ms=window_ms, max_batch=max_batch)
+    raise ValueError(f"Unknown reranker '{kind}'. Expected hosted, local or lexical")
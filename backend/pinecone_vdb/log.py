@@ -0,0 +1,139 @@
+"""
+Structured, level-gated logging for StorePal.
+Records go through a QueueHandler, so the caller (often the event loop) never
+blocks on the stream: QueueHandler.prepare merges the message and its args in
+the calling thread, and the background QueueListener only lays out the line
+(LOG_FORMAT) and writes it. Records below the level are dropped before any
+formatting. Every record carries the current session's context (session
+number and conversation ID), and high-rate events can be sampled.
+
+Usage:
+    from pinecone_vdb.log import get_logger, setup_logging, bind_session
+
+    setup_logging("INFO")            # once, at startup
+    logger = get_logger("relay")
+    bind_session(session=1)          # per websocket session (inherited by tasks and threads)
+    update_session(conversation_id="abc")
+    logger.debug("VAD %.2f", score, extra={"sample_every": 50})
+"""
+
+import atexit
+import contextvars
+import logging
+import queue
+import sys
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, Tuple
+
+ROOT_LOGGER = "storepal"
+LOG_FORMAT = "%(asctime)s %(levelname)-7s %(name)s [s%(session)s %(conversation_id)s] %(message)s"
+
+# A mutable dict per session: tasks and to_thread workers copy the context
+# (and so share the dict), so update_session() is visible to all of them.
+_session: contextvars.ContextVar[Optional[Dict[str, object]]] = contextvars.ContextVar("storepal_session", default=None)
+
+_listener: Optional[QueueListener] = None
+
+
+def bind_session(**fields) -> Dict[str, object]:
+    """Start a new logging context for the current task (e.g. session=3)."""
+    context = dict(fields)
+    _session.set(context)
+    return context
+
+
+def update_session(**fields) -> None:
+    """Add fields (e.g. conversation_id) to the current session context."""
+    context = _session.get()
+    if context is None:
+        bind_session(**fields)
+    else:
+        context.update(fields)
+
+
+def session_from_context(context: contextvars.Context) -> Optional[Dict[str, object]]:
+    """Session context stored in another contextvars.Context (e.g. a loop callback's)."""
+    return context.get(_session)
+
+
+def session_field(name: str, default=None):
+    context = _session.get()
+    return context.get(name, default) if context else default
+
+
+class SessionContextFilter(logging.Filter):
+    """Copies the session context onto every record."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _session.get() or {}
+        record.session = context.get("session", "-")
+        record.conversation_id = context.get("conversation_id", "-")
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps 1 in N records that set extra={"sample_every": N}, counted per
+    call site (logger name and message template). Other records pass through.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counts: Dict[Tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        every = getattr(record, "sample_every", 1)
+        if every <= 1:
+            return True
+        key = (record.name, str(record.msg))
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        return count % every == 0
+
+
+def get_logger(name: str) -> logging.Logger:
+    """Logger under the storepal hierarchy (storepal.<name>)."""
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+
+def setup_logging(level: str = "INFO", stream=None) -> QueueListener:
+    """
+    Configure the storepal loggers with a non-blocking queue-backed handler.
+
+    Args:
+        level: Minimum level (DEBUG, INFO, WARNING, ...); calls below it
+            return after a cached level check, before any formatting
+        stream: Output stream (defaults to stdout)
+
+    Returns:
+        The running QueueListener (stopped automatically at exit)
+    """
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(stream or sys.stdout)
+    output.setFormatter(logging.Formatter(LOG_FORMAT))
+
+    records: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = QueueHandler(records)
+    # Filters run in the calling thread, where the session context is set
+    handler.addFilter(SamplingFilter())
+    handler.addFilter(SessionContextFilter())
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.handlers = [handler]
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+    root.propagate = False
+
+    _listener = QueueListener(records, output, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+@atexit.register
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,249 @@
+"""
+Store map files served under /static: upload pipeline and content-hash metadata.
+
+Uploads are streamed to a temp file in chunks, minified (SVG), and published
+with an atomic rename, followed by precompressed .gz/.br variants compressed
+once at the best level. Every file is identified by the SHA-256 of its
+content: plain names (/static/store_map.svg) are revalidated with a strong
+ETag, and hashed names (/static/store_map.3f2a9c1b7d4e.svg) are cacheable
+forever, since a new upload gets a new name.
+
+Files copied into the folder by hand are picked up too (hashed on first
+request); they get variants only once re-uploaded.
+
+Usage:
+    store = MapStore("static", compressor)
+    asset = await store.save(upload_file, "store_map.svg")
+    found = store.lookup("store_map.3f2a9c1b7d4e.svg")  # (asset, immutable) or None
+"""
+
+import asyncio
+import hashlib
+import mimetypes
+import os
+import re
+import tempfile
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+try:
+    from .compression import BodyCompressor, choose_encoding, coded_etag, etag_matches
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from compression import BodyCompressor, choose_encoding, coded_etag, etag_matches
+
+CHUNK_SIZE = 64 * 1024
+# Cache-Control for content-hashed URLs
+IMMUTABLE = "public, max-age=31536000, immutable"
+VARIANT_SUFFIXES = {"gzip": ".gz", "br": ".br"}
+
+_HASHED_NAME = re.compile(r"^(?P<stem>.+)\.(?P<digest>[0-9a-f]{12})(?P<suffix>\.[A-Za-z0-9]+)$")
+# Comments, CDATA sections, tags (attribute values may contain ">") and text between them
+_SVG_TOKEN = re.compile(rb"<!--.*?-->|<!\[CDATA\[.*?\]\]>|<(?:\"[^\"]*\"|'[^']*'|[^'\">])*>|[^<]+", re.S)
+_TAG_NAME = re.compile(rb"</?\s*([A-Za-z][\w:.-]*)")
+# Elements whose text content is rendered or parsed (whitespace inside is kept)
+_PRESERVE = {b"text", b"tspan", b"textPath", b"style", b"script", b"title", b"desc", b"pre"}
+
+
+class MapTooLarge(ValueError):
+    """Upload exceeds the store's max_bytes."""
+
+
+def minify_svg(data: bytes) -> bytes:
+    """
+    Drop comments and whitespace-only text between tags.
+    Text, style and script content is kept byte for byte, as are attributes.
+    """
+    out = []
+    preserve_depth = 0
+    for match in _SVG_TOKEN.finditer(data):
+        token = match.group()
+        if token.startswith(b"<!--"):
+            continue
+        if token.startswith(b"<") and not token.startswith(b"<!") and not token.startswith(b"<?"):
+            name = _TAG_NAME.match(token)
+            if name and name.group(1) in _PRESERVE and not token.endswith(b"/>"):
+                preserve_depth += -1 if token.startswith(b"</") else 1
+            out.append(token)
+        elif preserve_depth > 0 or token.strip():
+            out.append(token)
+    return b"".join(out).strip()
+
+
+def _atomic_write(path: str, data: bytes) -> None:
+    """Write to a temp file next to `path`, then rename over it (readers see old or new, never partial)."""
+    directory, name = os.path.split(path)
+    fd, tmp = tempfile.mkstemp(dir=directory, prefix=f".{name}.", suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+@dataclass(slots=True, frozen=True)
+class MapAsset:
+    """One served file: its content hash and the precompressed variants that match it."""
+    name: str
+    path: str
+    digest: str
+    size: int
+    mtime_ns: int
+    variants: Dict[str, Tuple[str, int]] = field(default_factory=dict)  # coding -> (path, bytes)
+
+    @property
+    def hashed_name(self) -> str:
+        stem, suffix = os.path.splitext(self.name)
+        return f"{stem}.{self.digest[:12]}{suffix}"
+
+    @property
+    def media_type(self) -> str:
+        """Guessed from the extension, as StaticFiles did (octet-stream only when unknown)."""
+        return mimetypes.guess_type(self.name)[0] or "application/octet-stream"
+
+    def etag(self, encoding: Optional[str] = None) -> str:
+        """Strong ETag of one representation (each content coding has its own)."""
+        return coded_etag(f'"{self.digest[:20]}"', encoding)
+
+    def matches(self, if_none_match: str) -> bool:
+        """True if the client holds any representation of this content."""
+        return etag_matches(if_none_match, [self.etag(e) for e in (None, *self.variants)])
+
+    def negotiate(self, accept_encoding: str) -> Optional[str]:
+        return choose_encoding(accept_encoding, [e for e in ("br", "gzip") if e in self.variants])
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "filename": self.name,
+            "url": f"/static/{self.hashed_name}",
+            "etag": self.etag(),
+            "bytes": {"identity": self.size, **{e: size for e, (_, size) in self.variants.items()}},
+        }
+
+
+class MapStore:
+    """Files under one folder, indexed by content hash (re-hashed when a file changes)."""
+
+    def __init__(self, directory: str, compressor: BodyCompressor, max_bytes: int = 20 * 1024 * 1024):
+        """
+        Args:
+            directory: Folder served under /static
+            compressor: Provides the codings variants are written for
+            max_bytes: Largest accepted upload
+        """
+        self.directory = directory
+        self.compressor = compressor
+        self.max_bytes = max_bytes
+        self._assets: Dict[str, MapAsset] = {}
+        self._lock = threading.Lock()
+
+    async def save(self, upload, filename: str) -> MapAsset:
+        """
+        Publish an upload under `filename`.
+
+        Args:
+            upload: Object with an async read(size) (FastAPI UploadFile)
+            filename: Target name (a bare file name)
+
+        Returns:
+            The published MapAsset
+
+        Raises:
+            MapTooLarge: Upload exceeds max_bytes
+            ValueError: Bad file name, or not an SVG document
+        """
+        if os.path.basename(filename) != filename or filename.startswith("."):
+            raise ValueError(f"Invalid file name: {filename}")
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=".upload-", suffix=".part")
+        try:
+            size = 0
+            with os.fdopen(fd, "wb") as out:
+                while chunk := await upload.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > self.max_bytes:
+                        raise MapTooLarge(f"Map exceeds {self.max_bytes} bytes")
+                    await asyncio.to_thread(out.write, chunk)
+            return await asyncio.to_thread(self._publish, tmp, filename)
+        finally:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+
+    def _publish(self, tmp: str, filename: str) -> MapAsset:
+        path = os.path.join(self.directory, filename)
+        with open(tmp, "rb") as f:
+            content = f.read()
+        if filename.lower().endswith(".svg"):
+            content = minify_svg(content)
+            if b"<svg" not in content:
+                raise ValueError("Not an SVG document")
+        _atomic_write(path, content)
+        # Variants go in after the file, so a variant is current only if it is not older
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            if encoding in self.compressor.available:
+                _atomic_write(path + suffix, self.compressor.compress(content, encoding, best=True))
+            elif os.path.exists(path + suffix):
+                os.unlink(path + suffix)
+        return self._index(filename, path, content)
+
+    def _index(self, name: str, path: str, content: Optional[bytes] = None) -> Optional[MapAsset]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._assets.pop(name, None)
+            return None
+        with self._lock:
+            asset = self._assets.get(name)
+        if asset is not None and asset.mtime_ns == stat.st_mtime_ns and asset.size == stat.st_size and content is None:
+            return asset
+        if content is None:
+            digest = hashlib.sha256()
+            with open(path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    digest.update(chunk)
+        else:
+            digest = hashlib.sha256(content)
+        variants = {}
+        for encoding, suffix in VARIANT_SUFFIXES.items():
+            try:
+                variant = os.stat(path + suffix)
+            except FileNotFoundError:
+                continue
+            if variant.st_mtime_ns >= stat.st_mtime_ns:
+                variants[encoding] = (path + suffix, variant.st_size)
+        asset = MapAsset(name, path, digest.hexdigest(), stat.st_size, stat.st_mtime_ns, variants)
+        with self._lock:
+            self._assets[name] = asset
+        return asset
+
+    def lookup(self, name: str) -> Optional[Tuple[MapAsset, bool]]:
+        """
+        Resolve a requested name to (asset, immutable); None if there is no such file.
+        A hashed name resolves only while it matches the current content.
+        """
+        if os.path.basename(name) != name or name.startswith(".") or name.endswith(".part"):
+            return None
+        hashed = _HASHED_NAME.match(name)
+        if hashed:
+            plain = hashed.group("stem") + hashed.group("suffix")
+            asset = self._index(plain, os.path.join(self.directory, plain))
+            if asset is not None and asset.digest.startswith(hashed.group("digest")):
+                return asset, True
+        asset = self._index(name, os.path.join(self.directory, name))
+        return (asset, False) if asset is not None else None
+
+    def assets(self) -> Dict[str, MapAsset]:
+        """Every file in the folder (variants and temp files excluded), indexed."""
+        if not os.path.isdir(self.directory):
+            return {}
+        found = {}
+        for name in sorted(os.listdir(self.directory)):
+            if name.startswith(".") or name.endswith((".gz", ".br", ".part")):
+                continue
+            asset = self._index(name, os.path.join(self.directory, name))
+            if asset is not None:
+                found[name] = asset
+        return found
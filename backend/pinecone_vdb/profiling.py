@@ -0,0 +1,410 @@
+"""
+Runtime profiling hooks for the StorePal server.
+- SamplingProfiler samples every thread's stack for N seconds and returns
+  collapsed stacks ("frame;frame;frame count"), the input format of
+  flamegraph.pl, speedscope and inferno.
+- LoopMonitor measures asyncio event-loop lag and times every loop callback,
+  recording callbacks that block the loop longer than a threshold (e.g. a
+  synchronous Pinecone call inside handle_elevenlabs_messages).
+
+- LoopWatchdog adds a watchdog thread that catches the loop while it is
+  blocked, and keeps a ring buffer of lag spikes attributed to the blocking
+  code path, task and session, with the sessions that were affected.
+
+main.py exposes them under /admin (guarded by ADMIN_TOKEN).
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import time
+import weakref
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+try:
+    from .log import get_logger, session_from_context
+    from .metrics import REGISTRY
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from log import get_logger, session_from_context
+    from metrics import REGISTRY
+
+logger = get_logger("profiling")
+
+
+LOOP_LAG = REGISTRY.histogram(
+    "storepal_event_loop_lag_seconds",
+    "Delay between when the loop lag probe should have woken up and when it did",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+SLOW_CALLBACKS = REGISTRY.counter(
+    "storepal_slow_callbacks_total", "Event loop callbacks that ran longer than the slow-callback threshold"
+)
+LOOP_SPIKES = REGISTRY.counter(
+    "storepal_event_loop_spikes_total", "Event loop lag spikes recorded by the watchdog"
+)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})"
+
+
+class SamplingProfiler:
+    """Samples the stacks of all threads at a fixed interval (wall-clock profile)."""
+
+    _lock = threading.Lock()  # one profile at a time per process
+
+    def __init__(self, interval: float = 0.005):
+        """
+        Args:
+            interval: Seconds between samples
+        """
+        self.interval = interval
+
+    @classmethod
+    def busy(cls) -> bool:
+        return cls._lock.locked()
+
+    def run(self, seconds: float) -> str:
+        """
+        Sample for the given duration (blocking; call it from a worker thread).
+
+        Returns:
+            Collapsed stacks, one "thread;outer;...;inner count" line per unique stack
+        """
+        if not self._lock.acquire(blocking=False):
+            raise RuntimeError("A profile is already running")
+        try:
+            own = threading.get_ident()
+            names = {}
+            stacks: Counter = Counter()
+            deadline = time.monotonic() + seconds
+            while time.monotonic() < deadline:
+                if len(names) != threading.active_count():
+                    names = {t.ident: t.name for t in threading.enumerate()}
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    labels = []
+                    while frame is not None:
+                        labels.append(_frame_label(frame))
+                        frame = frame.f_back
+                    labels.append(names.get(ident, f"thread-{ident}"))
+                    stacks[";".join(reversed(labels))] += 1
+                time.sleep(self.interval)
+            return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+        finally:
+            self._lock.release()
+
+
+def describe_task(task: asyncio.Task) -> str:
+    """Task name and await chain; the innermost coroutine is where it is suspended."""
+    chain = []
+    coro = task.get_coro()
+    while coro is not None and hasattr(coro, "cr_frame") and len(chain) < 8:
+        frame = coro.cr_frame
+        where = f" ({os.path.basename(frame.f_code.co_filename)}:{frame.f_lineno})" if frame else ""
+        chain.append(f"{coro.__qualname__}{where}")
+        coro = coro.cr_await
+    return f"Task {task.get_name()}: " + " > ".join(chain or [repr(task.get_coro())])
+
+
+# asyncio.Handle keeps what it runs in a private attribute, with no public accessor;
+# if a Python version drops it, callbacks are named by repr(handle) instead
+_HANDLE_CALLBACK = "_callback" in getattr(asyncio.Handle, "__slots__", ())
+if not _HANDLE_CALLBACK:
+    logger.warning("⚠️  asyncio.Handle has no _callback: slow callbacks are reported without their task")
+
+
+def describe_callback(handle: asyncio.Handle) -> str:
+    """Human-readable name of what a loop callback runs (task coroutine or function)."""
+    callback = getattr(handle, "_callback", None) if _HANDLE_CALLBACK else None
+    if callback is None:
+        return repr(handle)
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Task):
+        return describe_task(owner)
+    return getattr(callback, "__qualname__", None) or repr(callback)
+
+
+class LoopMonitor:
+    """
+    Event-loop lag probe plus slow-callback detection.
+
+    Lag is measured by a task that sleeps for `interval` and records how late
+    it woke up. Slow callbacks are found by timing asyncio.Handle._run, which
+    every loop callback (including each task step) goes through on the stock
+    asyncio loop; loops with their own handles (uvloop) are not supported. The
+    timing is off until enable_slow_callbacks() is called.
+    """
+
+    def __init__(self, interval: float = 0.1, slow_callback_ms: float = 50.0, history: int = 200):
+        """
+        Args:
+            interval: Seconds between lag probes
+            slow_callback_ms: Callbacks running longer than this are recorded
+            history: Slow callbacks kept (oldest dropped first)
+        """
+        self.interval = interval
+        self.slow_threshold = slow_callback_ms / 1000
+        self.slow_callbacks: Deque[Dict[str, Any]] = deque(maxlen=history)
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self._recent_lags: Deque[float] = deque(maxlen=600)
+        self._task: Optional[asyncio.Task] = None
+        self._original_run = None
+        self.slow_callbacks_unsupported: Optional[str] = None
+
+    # Lag probe
+
+    def start(self) -> None:
+        """Start the lag probe on the running loop."""
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._probe(), name="loop-lag-probe")
+
+    async def stop(self) -> None:
+        self.disable_slow_callbacks()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _probe(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            start = loop.time()
+            await asyncio.sleep(self.interval)
+            self.record_lag(max(0.0, loop.time() - start - self.interval))
+
+    def record_lag(self, lag: float) -> None:
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self._recent_lags.append(lag)
+        LOOP_LAG.observe(lag)
+
+    # Slow callbacks
+
+    @property
+    def slow_callbacks_enabled(self) -> bool:
+        return self._original_run is not None
+
+    @staticmethod
+    def slow_callback_support(loop: asyncio.AbstractEventLoop) -> Optional[str]:
+        """None if the loop runs its callbacks through asyncio.Handle._run, else why not."""
+        if isinstance(loop, asyncio.BaseEventLoop):
+            return None
+        return f"{type(loop).__module__}.{type(loop).__qualname__} does not run callbacks through asyncio.Handle"
+
+    def enable_slow_callbacks(self, threshold_ms: Optional[float] = None) -> None:
+        """
+        Start timing every loop callback (about a microsecond each).
+
+        Raises:
+            RuntimeError: The running loop is not an asyncio loop (e.g. uvloop),
+                so patching asyncio.Handle would time nothing
+        """
+        self.slow_callbacks_unsupported = self.slow_callback_support(asyncio.get_running_loop())
+        if self.slow_callbacks_unsupported:
+            raise RuntimeError(f"Slow-callback timing is not available: {self.slow_callbacks_unsupported}")
+        if threshold_ms is not None:
+            self.slow_threshold = threshold_ms / 1000
+        if self._original_run is not None:
+            return
+        original = self._original_run = asyncio.events.Handle._run
+        monitor = self
+
+        def _timed_run(handle):
+            start = time.perf_counter()
+            try:
+                return original(handle)
+            finally:
+                elapsed = time.perf_counter() - start
+                if elapsed >= monitor.slow_threshold:
+                    monitor.record_slow_callback(handle, elapsed)
+
+        asyncio.events.Handle._run = _timed_run
+
+    def disable_slow_callbacks(self) -> None:
+        if self._original_run is not None:
+            asyncio.events.Handle._run = self._original_run
+            self._original_run = None
+
+    def record_slow_callback(self, handle: asyncio.Handle, elapsed: float) -> Dict[str, Any]:
+        entry = {
+            "at": time.time(),
+            "duration_ms": round(elapsed * 1000, 2),
+            "callback": describe_callback(handle),
+        }
+        self.slow_callbacks.append(entry)
+        SLOW_CALLBACKS.inc()
+        return entry
+
+    def to_dict(self) -> Dict[str, Any]:
+        recent = sorted(self._recent_lags)
+        p99 = recent[min(len(recent) - 1, int(len(recent) * 0.99))] if recent else 0.0
+        return {
+            "lag_ms": {
+                "last": round(self.last_lag * 1000, 2),
+                "p99_recent": round(p99 * 1000, 2),
+                "max": round(self.max_lag * 1000, 2),
+            },
+            "probe_interval_ms": self.interval * 1000,
+            "slow_callbacks": {
+                "enabled": self.slow_callbacks_enabled,
+                "unsupported": self.slow_callbacks_unsupported,
+                "threshold_ms": self.slow_threshold * 1000,
+                "recent": list(self.slow_callbacks)[-20:],
+            },
+        }
+
+
+class LoopWatchdog(LoopMonitor):
+    """
+    LoopMonitor plus lag-spike attribution.
+
+    A watchdog thread checks the probe's heartbeat; when the loop has been
+    stuck for longer than the spike threshold it samples the loop thread's
+    stack and the running task while the blocking code is still on the stack.
+    When the probe wakes up late, the spike is stored in a bounded ring buffer
+    with that capture, the slow callbacks that ran during the stall (each
+    attributed to its session through the callback's contextvars context) and
+    the sessions that were connected, and therefore delayed, at the time.
+    """
+
+    def __init__(
+        self,
+        interval: float = 0.05,
+        slow_callback_ms: float = 50.0,
+        spike_ms: float = 25.0,
+        history: int = 200,
+        spike_history: int = 500,
+        active_sessions: Optional[Callable[[], List[Dict[str, Any]]]] = None
+    ):
+        """
+        Args:
+            interval: Seconds between lag probes
+            slow_callback_ms: Callbacks running longer than this are recorded
+            spike_ms: Lag that counts as a spike
+            history: Slow callbacks kept
+            spike_history: Spikes kept in the ring buffer
+            active_sessions: Returns the connected sessions' log contexts
+                ({"session", "conversation_id"})
+        """
+        super().__init__(interval, slow_callback_ms, history)
+        self.spike_threshold = spike_ms / 1000
+        self.spikes: Deque[Dict[str, Any]] = deque(maxlen=spike_history)
+        self.active_sessions = active_sessions or (lambda: [])
+        self._task_sessions: "weakref.WeakKeyDictionary[asyncio.Task, Dict[str, Any]]" = weakref.WeakKeyDictionary()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[int] = None
+        self._watch_thread: Optional[threading.Thread] = None
+        self._stopping = threading.Event()
+        self._heartbeat = time.monotonic()
+        self._window_start = time.time()
+        self._capture: Optional[Dict[str, Any]] = None
+
+    def register_task(self, task: asyncio.Task, session: Dict[str, Any]) -> None:
+        """Attribute a session's long-lived tasks (the watchdog cannot read task contexts)."""
+        self._task_sessions[task] = session
+
+    def start(self) -> None:
+        super().start()
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        if self._watch_thread is None or not self._watch_thread.is_alive():
+            self._stopping.clear()
+            self._watch_thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+            self._watch_thread.start()
+
+    async def stop(self) -> None:
+        self._stopping.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=1)
+            self._watch_thread = None
+        await super().stop()
+
+    def _watch(self) -> None:
+        stall_after = self.interval + self.spike_threshold
+        while not self._stopping.wait(self.interval / 2):
+            if self._capture is None and time.monotonic() - self._heartbeat > stall_after:
+                self._capture = self._capture_loop()
+
+    def _capture_loop(self) -> Dict[str, Any]:
+        """Snapshot of what the (blocked) loop thread is running right now."""
+        frame = sys._current_frames().get(self._loop_thread)
+        stack = []
+        while frame is not None:
+            stack.append(_frame_label(frame))
+            frame = frame.f_back
+        # current_task() with an explicit loop only reads the loop's entry, so it is safe
+        # from this thread (None while the loop runs a plain callback, not a task step)
+        task = asyncio.current_task(self._loop) if self._loop else None
+        session = self._task_sessions.get(task) if task is not None else None
+        return {
+            "stack": list(reversed(stack))[-25:],
+            "task": describe_task(task) if task is not None else None,
+            "session": dict(session) if session else None,
+        }
+
+    def record_lag(self, lag: float) -> None:
+        super().record_lag(lag)
+        self._heartbeat = time.monotonic()
+        capture, self._capture = self._capture, None
+        if lag >= self.spike_threshold:
+            self._record_spike(lag, capture)
+        self._window_start = time.time()
+
+    def record_slow_callback(self, handle: asyncio.Handle, elapsed: float) -> Dict[str, Any]:
+        entry = super().record_slow_callback(handle, elapsed)
+        context = getattr(handle, "_context", None)
+        session = session_from_context(context) if context is not None else None
+        entry["session"] = dict(session) if session else None
+        return entry
+
+    def _record_spike(self, lag: float, capture: Optional[Dict[str, Any]]) -> None:
+        window_start = self._window_start
+        culprits = [c for c in list(self.slow_callbacks) if c["at"] >= window_start]
+        self.spikes.append({
+            "at": time.time(),
+            "lag_ms": round(lag * 1000, 2),
+            "blocked_in": capture,
+            "slow_callbacks": culprits,
+            "sessions_affected": [dict(s) for s in self.active_sessions()],
+        })
+        LOOP_SPIKES.inc()
+
+    def spikes_to_dict(self, limit: int = 50) -> Dict[str, Any]:
+        """Recent spikes plus per-session totals over the whole ring buffer."""
+        spikes = list(self.spikes)
+        by_session: Dict[str, Dict[str, float]] = {}
+
+        def bucket(session: Optional[Dict[str, Any]]) -> Dict[str, float]:
+            key = f"s{session.get('session', '-')} {session.get('conversation_id', '-')}" if session else "unattributed"
+            return by_session.setdefault(key, {"caused": 0, "caused_lag_ms": 0.0, "affected": 0, "affected_lag_ms": 0.0})
+
+        for spike in spikes:
+            causes = [c["session"] for c in spike["slow_callbacks"] if c.get("session")]
+            if spike["blocked_in"] and spike["blocked_in"]["session"]:
+                causes.append(spike["blocked_in"]["session"])
+            cause = causes[0] if causes else None
+            entry = bucket(cause)
+            entry["caused"] += 1
+            entry["caused_lag_ms"] = round(entry["caused_lag_ms"] + spike["lag_ms"], 2)
+            for session in spike["sessions_affected"]:
+                entry = bucket(session)
+                entry["affected"] += 1
+                entry["affected_lag_ms"] = round(entry["affected_lag_ms"] + spike["lag_ms"], 2)
+
+        return {
+            "spike_threshold_ms": self.spike_threshold * 1000,
+            "buffered": len(spikes),
+            "capacity": self.spikes.maxlen,
+            "by_session": by_session,
+            "spikes": spikes[-limit:][::-1],
+        }
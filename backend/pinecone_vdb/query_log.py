@@ -0,0 +1,167 @@
+"""
+Opt-in query log for offline replays of the search stack.
+One compact JSON line per final user transcript, with the search calls it
+triggered, appended by a background thread (the event loop never waits on
+the file). benchmarks/replay_query_log.py replays the log against any
+backend.
+
+Transcripts are anonymized before they are written: e-mail addresses and
+runs of 4 or more digits (phone, card and loyalty numbers) are masked, and
+sessions are identified by a hash salted per process, so turns of one
+conversation can be grouped but not traced back to a kiosk or conversation.
+
+Record keys are kept short:
+    {"v":1,"t":1760000000,"k":"3f2a9c1b","q":"do you have oat milk","s":1,"p":"search",
+     "ms":412.5,"c":[["do you have oat milk",5,398.2,[12,40]]],"r":[12,40]}
+
+    t   unix seconds           k   session (salted hash)
+    q   anonymized transcript  s   should_search_products (0/1)
+    p   answer path: search, lexical, answer_cache or none
+    ms  search_products time   r   product ids in the answer
+    c   search calls: [query, top_n, ms, product ids]
+"""
+
+import hashlib
+import json
+import queue
+import random
+import re
+import secrets
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+VERSION = 1
+
+_EMAIL = re.compile(r"\S+@\S+\.\w+")
+_LONG_NUMBER = re.compile(r"\d[\d\s-]{2,}\d")
+
+# Turn being recorded by the current session task (copied into search threads)
+CURRENT_TURN: ContextVar[Optional["QueryTurn"]] = ContextVar("query_turn", default=None)
+
+
+def anonymize(text: str) -> str:
+    """Mask e-mail addresses and runs of 4+ digits; short numbers ("size 2") are kept."""
+    text = _EMAIL.sub("<email>", text)
+    return _LONG_NUMBER.sub(
+        lambda m: "<number>" if sum(c.isdigit() for c in m.group()) >= 4 else m.group(), text
+    )
+
+
+def _product_ids(results: Sequence[Any]) -> List[int]:
+    return [getattr(r, "product_id", 0) for r in results]
+
+
+class QueryTurn:
+    """What one final transcript triggered; filled in by search_products and search_in_thread."""
+
+    __slots__ = ("session", "query", "started", "path", "calls")
+
+    def __init__(self, session: str, query: str):
+        self.session = session
+        self.query = query
+        self.started = time.time()
+        self.path = "none"
+        self.calls: List[list] = []
+
+    def record_call(self, query: str, top_n: int, elapsed_ms: float, results: Sequence[Any]) -> None:
+        self.calls.append([anonymize(query), top_n, round(elapsed_ms, 1), _product_ids(results)])
+
+    def to_record(self, searched: bool, answer_items: Sequence[Any], elapsed_ms: Optional[float]) -> Dict[str, Any]:
+        return {
+            "v": VERSION,
+            "t": int(self.started),
+            "k": self.session,
+            "q": self.query,
+            "s": int(searched),
+            "p": self.path,
+            "ms": round(elapsed_ms, 1) if elapsed_ms is not None else None,
+            "c": self.calls,
+            "r": _product_ids(answer_items),
+        }
+
+
+def note_path(path: str) -> None:
+    """Record how the current turn was answered (no-op when the turn is not logged)."""
+    turn = CURRENT_TURN.get()
+    if turn is not None:
+        turn.path = path
+
+
+def note_call(query: str, top_n: int, elapsed_ms: float, results: Sequence[Any]) -> None:
+    """Record a search call of the current turn (no-op when the turn is not logged)."""
+    turn = CURRENT_TURN.get()
+    if turn is not None:
+        turn.record_call(query, top_n, elapsed_ms, results)
+
+
+class QueryLog:
+    """Append-only JSON lines writer for sampled turns."""
+
+    def __init__(self, path: Union[str, Path], sample: float = 1.0):
+        """
+        Args:
+            path: Log file (appended to; created with its parent folder if missing)
+            sample: Share of turns recorded
+        """
+        self.path = Path(path)
+        self.sample = sample
+        self.written = 0
+        self._salt = secrets.token_bytes(16)
+        self._lines: "queue.SimpleQueue[Optional[str]]" = queue.SimpleQueue()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._write, name="query-log", daemon=True)
+        self._thread.start()
+
+    def session_key(self, session: Any) -> str:
+        return hashlib.blake2b(str(session).encode(), key=self._salt, digest_size=4).hexdigest()
+
+    def begin(self, transcript: str, session: Any) -> Optional[QueryTurn]:
+        """Start recording a turn in the current context (None if it is not sampled)."""
+        turn = None
+        if self.sample >= 1 or random.random() < self.sample:
+            turn = QueryTurn(self.session_key(session), anonymize(transcript))
+        CURRENT_TURN.set(turn)
+        return turn
+
+    def finish(self, turn: QueryTurn, searched: bool, answer_items: Sequence[Any] = (), elapsed_ms: Optional[float] = None) -> None:
+        CURRENT_TURN.set(None)
+        self._lines.put(json.dumps(turn.to_record(searched, answer_items, elapsed_ms), separators=(",", ":")))
+
+    def _write(self) -> None:
+        while True:
+            line = self._lines.get()
+            batch = []
+            while line is not None:
+                batch.append(line)
+                try:
+                    line = self._lines.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._file.write("\n".join(batch) + "\n")
+                self._file.flush()
+                self.written += len(batch)
+            if line is None:
+                return
+
+    def close(self) -> None:
+        self._lines.put(None)
+        self._thread.join(timeout=5)
+        self._file.close()
+
+
+def read_log(path: Union[str, Path]) -> Iterator[Dict[str, Any]]:
+    """
+    Read turns from a query log, or from a plain text file of transcripts
+    (one per line; "#" comments skipped), as records with at least "q".
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            yield json.loads(line) if line.startswith("{") else {"q": line}
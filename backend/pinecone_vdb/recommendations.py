@@ -0,0 +1,243 @@
+"""
+Precomputed product-to-product recommendations for WinMart inventory.
+An offline job computes the top-N nearest neighbors of every product from the
+embedding matrix (blocked matrix multiply, optionally within the same
+category) and stores them in a compact .npz file. At runtime a
+recommendation is an O(1) array lookup by product_id.
+
+Usage (from the backend folder):
+    python -m pinecone_vdb.recommendations --source fetch --top-n 10 --out data/recommendations.npz
+    python -m pinecone_vdb.recommendations --source npy --embeddings vectors.npy --same-category
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+try:
+    from .catalog import load_catalog
+    from .engine_registry import get_engine
+    from .vector_search import SearchResult
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from catalog import load_catalog
+    from engine_registry import get_engine
+    from vector_search import SearchResult
+
+
+DEFAULT_PATH = Path(__file__).parent.parent / "data" / "recommendations.npz"
+
+
+def nearest_neighbors(
+    matrix: np.ndarray,
+    top_n: int = 10,
+    categories: Optional[Sequence[str]] = None,
+    block_size: int = 512
+):
+    """
+    Compute cosine top-N neighbors for every row with a blocked matrix multiply.
+
+    Args:
+        matrix: (n, d) embedding matrix, one row per product
+        top_n: Neighbors kept per product
+        categories: Optional per-row category; neighbors are restricted to the same one
+        block_size: Rows multiplied per block (bounds peak memory at block_size * n floats)
+
+    Returns:
+        (neighbors, scores): (n, top_n) row indices (-1 where fewer exist) and float32 scores
+    """
+    vectors = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1, norms)
+    count = len(vectors)
+    top_n = min(top_n, max(count - 1, 0))
+
+    codes = None
+    if categories is not None:
+        _, codes = np.unique(np.asarray(categories), return_inverse=True)
+
+    neighbors = np.full((count, top_n), -1, dtype=np.int32)
+    scores = np.zeros((count, top_n), dtype=np.float32)
+    if top_n == 0:
+        return neighbors, scores
+
+    for start in range(0, count, block_size):
+        end = min(start + block_size, count)
+        sims = vectors[start:end] @ vectors.T
+        rows = np.arange(end - start)
+        sims[rows, np.arange(start, end)] = -np.inf  # never recommend the product itself
+        if codes is not None:
+            sims[codes[start:end, None] != codes[None, :]] = -np.inf
+
+        part = np.argpartition(-sims, top_n - 1, axis=1)[:, :top_n]
+        part_scores = np.take_along_axis(sims, part, axis=1)
+        order = np.argsort(-part_scores, axis=1)
+        best = np.take_along_axis(part, order, axis=1)
+        best_scores = np.take_along_axis(part_scores, order, axis=1)
+
+        valid = np.isfinite(best_scores)
+        neighbors[start:end] = np.where(valid, best, -1)
+        scores[start:end] = np.where(valid, best_scores, 0)
+    return neighbors, scores
+
+
+class RecommendationTable:
+    """Neighbor lookup table keyed by product_id."""
+
+    def __init__(
+        self,
+        product_ids: np.ndarray,
+        neighbors: np.ndarray,
+        scores: np.ndarray,
+        products: Optional[Sequence[SearchResult]] = None
+    ):
+        """
+        Args:
+            product_ids: (n,) product ids, row order of the table
+            neighbors: (n, N) neighbor product ids (0 = none)
+            scores: (n, N) neighbor similarity scores
+            products: Catalog rows used to build SearchResult objects (a list,
+                or a memory-mapped artifacts.MappedCatalog read row by row)
+        """
+        self.product_ids = product_ids
+        self.neighbors = neighbors
+        self.scores = scores
+        # product_id -> row, as a dense array for an O(1) lookup
+        self._row_of = np.full(int(product_ids.max(initial=0)) + 1, -1, dtype=np.int32)
+        self._row_of[product_ids] = np.arange(len(product_ids), dtype=np.int32)
+        self._products: Sequence[SearchResult] = products if products is not None else []
+        # product_id -> catalog row (rows are read from products on demand)
+        self._catalog_row: Dict[int, int] = {}
+        self._by_name: Dict[str, int] = {}
+        for row, p in enumerate(self._products):
+            self._catalog_row[p.product_id] = row
+            self._by_name[p.item_name.lower()] = p.product_id
+
+    @classmethod
+    def load(cls, path: Union[str, Path] = DEFAULT_PATH, products: Optional[List[SearchResult]] = None) -> "RecommendationTable":
+        """Load a table written by `build` (products default to the inventory CSV)."""
+        data = np.load(path)
+        return cls(data["product_ids"], data["neighbors"], data["scores"], products or load_catalog())
+
+    def save(self, path: Union[str, Path] = DEFAULT_PATH) -> None:
+        np.savez(path, product_ids=self.product_ids, neighbors=self.neighbors, scores=self.scores)
+
+    def __contains__(self, product_id: int) -> bool:
+        return 0 <= product_id < len(self._row_of) and self._row_of[product_id] >= 0
+
+    def product_id_for_name(self, name: str) -> Optional[int]:
+        return self._by_name.get(name.strip().lower())
+
+    def recommend(self, product_id: int, top_k: int = 5) -> List[SearchResult]:
+        """
+        Get precomputed recommendations for a product.
+
+        Args:
+            product_id: Product to find neighbors for
+            top_k: Number of recommendations
+
+        Returns:
+            List of SearchResult objects scored by embedding similarity
+            (empty if the product is unknown)
+        """
+        if product_id not in self:
+            return []
+        row = self._row_of[product_id]
+        results = []
+        for neighbor, score in zip(self.neighbors[row, :top_k].tolist(), self.scores[row, :top_k].tolist()):
+            catalog_row = self._catalog_row.get(neighbor)
+            if neighbor <= 0 or catalog_row is None:
+                continue
+            product = self._products[catalog_row]
+            results.append(SearchResult(
+                product.product_id, product.item_name, product.category, product.description,
+                product.aisle_location, score, product.chunk_text
+            ))
+        return results
+
+
+def build(
+    matrix: np.ndarray,
+    products: List[SearchResult],
+    top_n: int = 10,
+    same_category: bool = False
+) -> RecommendationTable:
+    """Build a RecommendationTable from an embedding matrix aligned with products."""
+    ids = np.array([p.product_id for p in products], dtype=np.int32)
+    categories = [p.category for p in products] if same_category else None
+    rows, scores = nearest_neighbors(matrix, top_n=top_n, categories=categories)
+    neighbor_ids = np.where(rows >= 0, ids[np.clip(rows, 0, None)], 0).astype(np.int32)
+    return RecommendationTable(ids, neighbor_ids, scores.astype(np.float16), products)
+
+
+def fetch_embeddings(products: List[SearchResult], index_name: str, namespace: str, batch_size: int = 100) -> np.ndarray:
+    """Fetch the stored vectors for every product from the Pinecone index."""
+    engine = get_engine(index_name, namespace)
+    vectors = {}
+    ids = [f"prod_{p.product_id}" for p in products]
+    for i in range(0, len(ids), batch_size):
+        response = engine.index.fetch(ids=ids[i:i + batch_size], namespace=namespace)
+        fetched = response["vectors"] if isinstance(response, dict) else response.vectors
+        for vector_id, vector in fetched.items():
+            vectors[vector_id] = vector["values"] if isinstance(vector, dict) else vector.values
+    missing = [vector_id for vector_id in ids if vector_id not in vectors]
+    if missing:
+        raise ValueError(f"{len(missing)} products have no vector in '{index_name}' (e.g. {missing[:3]})")
+    return np.array([vectors[vector_id] for vector_id in ids], dtype=np.float32)
+
+
+def embed_products(products: List[SearchResult], model: str = "llama-text-embed-v2", batch_size: int = 96) -> np.ndarray:
+    """Embed chunk_text for every product with Pinecone inference."""
+    engine = get_engine()
+    rows = []
+    for i in range(0, len(products), batch_size):
+        batch = products[i:i + batch_size]
+        response = engine.pc.inference.embed(
+            model=model,
+            inputs=[p.chunk_text for p in batch],
+            parameters={"input_type": "passage"}
+        )
+        data = response["data"] if isinstance(response, dict) else response.data
+        rows.extend(item["values"] if isinstance(item, dict) else item.values for item in data)
+    return np.array(rows, dtype=np.float32)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute product recommendation neighbors")
+    parser.add_argument("--source", choices=["fetch", "embed", "npy"], default="fetch",
+                        help="fetch stored vectors, embed chunk_text, or load a .npy matrix")
+    parser.add_argument("--embeddings", type=Path, help="(n, d) .npy matrix in CSV row order (--source npy)")
+    parser.add_argument("--index-name", default="winmart-inventory")
+    parser.add_argument("--namespace", default="winmart-products")
+    parser.add_argument("--top-n", type=int, default=10)
+    parser.add_argument("--same-category", action="store_true", help="Only recommend within the same category")
+    parser.add_argument("--out", type=Path, default=DEFAULT_PATH)
+    args = parser.parse_args()
+
+    products = load_catalog()
+    print(f"📁 Loaded {len(products)} products")
+
+    if args.source == "npy":
+        if not args.embeddings:
+            parser.error("--embeddings is required with --source npy")
+        matrix = np.load(args.embeddings)
+    elif args.source == "embed":
+        matrix = embed_products(products)
+    else:
+        matrix = fetch_embeddings(products, args.index_name, args.namespace)
+    if len(matrix) != len(products):
+        print(f"❌ Embedding rows ({len(matrix)}) do not match products ({len(products)})")
+        sys.exit(1)
+
+    start = time.perf_counter()
+    table = build(matrix, products, top_n=args.top_n, same_category=args.same_category)
+    elapsed = time.perf_counter() - start
+    table.save(args.out)
+    print(f"✅ {len(products)} x {args.top_n} neighbors in {elapsed * 1000:.0f} ms -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
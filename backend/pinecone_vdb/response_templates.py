@@ -0,0 +1,92 @@
+"""
+Response templates for turning search results into agent-facing text.
+Renders with precompiled templates and str.join, and returns a structured
+FormattedResults so callers can branch on `found` instead of re-scanning text.
+"""
+
+from dataclasses import dataclass
+from typing import Sequence, Tuple, Any
+
+
+NOT_FOUND_TEXT = "I couldn't find any products matching your query. Could you rephrase your question?"
+
+# Template variants:
+#   verbose - numbered list with descriptions (the original agent format)
+#   terse   - numbered list, name and aisle only
+#   voice   - a single spoken sentence, no list markup; fewest tokens for TTS
+STYLES = ("verbose", "terse", "voice")
+
+_SINGLE_TEMPLATES = {
+    "verbose": (
+        "I found {0.item_name}! It's in the {0.category} section, "
+        "located in aisle {0.aisle_location}. {0.description}"
+    ).format,
+    "terse": "I found {0.item_name} in aisle {0.aisle_location}.".format,
+    "voice": "{0.item_name} is in aisle {0.aisle_location}.".format,
+}
+
+_HEADER_TEMPLATES = {
+    "verbose": "I found {0} products that might help:\n\n".format,
+    "terse": "I found {0} products that might help:\n\n".format,
+}
+
+_LINE_TEMPLATES = {
+    "verbose": "{0}. {1.item_name} - Aisle {1.aisle_location}\n   {1.description}".format,
+    "terse": "{0}. {1.item_name} - Aisle {1.aisle_location}".format,
+    "voice": "{1.item_name} in aisle {1.aisle_location}".format,
+}
+
+_LINE_SEPARATORS = {
+    "verbose": "\n\n",
+    "terse": "\n",
+}
+
+
+@dataclass(slots=True, frozen=True)
+class FormattedResults:
+    """Structured formatting outcome: whether anything was found, the items, and the text."""
+    found: bool
+    items: Tuple[Any, ...]
+    text: str
+    style: str = "verbose"
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def _render_voice_list(results: Sequence[Any]) -> str:
+    """Render several results as one spoken sentence ("A in aisle A1, B in aisle B2, and C ...")."""
+    line = _LINE_TEMPLATES["voice"]
+    parts = [line(i, result) for i, result in enumerate(results, 1)]
+    if len(parts) == 2:
+        return f"I found {parts[0]} and {parts[1]}."
+    return f"I found {', '.join(parts[:-1])}, and {parts[-1]}."
+
+
+def render_results(results: Sequence[Any], style: str = "verbose") -> FormattedResults:
+    """
+    Render search results with one of the template variants.
+
+    Args:
+        results: SearchResult (or FrozenSearchResult) objects
+        style: One of "verbose", "terse" or "voice"
+
+    Returns:
+        FormattedResults with the found flag, items and rendered text
+    """
+    if style not in _LINE_TEMPLATES:
+        raise ValueError(f"Unknown response style '{style}'. Expected one of {STYLES}")
+
+    items = tuple(results)
+    if not items:
+        return FormattedResults(False, items, NOT_FOUND_TEXT, style)
+
+    if len(items) == 1:
+        return FormattedResults(True, items, _SINGLE_TEMPLATES[style](items[0]), style)
+
+    if style == "voice":
+        return FormattedResults(True, items, _render_voice_list(items), style)
+
+    line = _LINE_TEMPLATES[style]
+    body = _LINE_SEPARATORS[style].join([line(i, result) for i, result in enumerate(items, 1)])
+    return FormattedResults(True, items, _HEADER_TEMPLATES[style](len(items)) + body, style)
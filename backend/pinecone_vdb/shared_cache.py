@@ -0,0 +1,190 @@
+"""
+Cross-process LRU cache over a Unix domain socket.
+The cluster supervisor runs one SharedCacheServer; every worker process
+talks to it with a SharedCacheClient, so a search answered by one worker is
+a cache hit for all of them. A lookup is one small request/response on a
+local socket (tens of microseconds); any socket error is treated as a miss,
+so the cache can go away without taking search down.
+
+Usage:
+    python -m pinecone_vdb.shared_cache serve --socket /tmp/storepal-cache.sock
+
+    cache = SharedCacheClient("/tmp/storepal-cache.sock")
+    cache.set("hybrid|5|decaf coffee", payload)
+    cache.get("hybrid|5|decaf coffee")
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import struct
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+# op (G get, S set), key length, value length
+_REQUEST = struct.Struct("!cII")
+# status (H/M/K), value length
+_RESPONSE = struct.Struct("!cI")
+
+MAX_KEY_BYTES = 4096
+MAX_VALUE_BYTES = 1 << 20
+
+
+class SharedCacheServer:
+    """LRU cache with a TTL, served on a Unix domain socket."""
+
+    def __init__(self, path: str, max_entries: int = 10000, ttl: float = 300.0):
+        """
+        Args:
+            path: Socket path (replaced if it exists)
+            max_entries: Entries kept (least recently used dropped first)
+            ttl: Seconds an entry stays valid
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[bytes, Tuple[float, bytes]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"hits": 0, "misses": 0, "sets": 0, "evictions": 0}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return entry[1]
+
+    def set(self, key: bytes, value: bytes) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        self.stats["sets"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                op, key_len, value_len = _REQUEST.unpack(await reader.readexactly(_REQUEST.size))
+                if key_len > MAX_KEY_BYTES or value_len > MAX_VALUE_BYTES:
+                    break
+                key = await reader.readexactly(key_len)
+                value = await reader.readexactly(value_len)
+                if op == b"G":
+                    found = self.get(key)
+                    writer.write(_RESPONSE.pack(b"H", len(found)) + found if found is not None else _RESPONSE.pack(b"M", 0))
+                elif op == b"S":
+                    self.set(key, value)
+                    writer.write(_RESPONSE.pack(b"K", 0))
+                else:
+                    break
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        self._server = await asyncio.start_unix_server(self._handle, path=self.path)
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+
+class SharedCacheClient:
+    """Blocking client (one connection per thread); errors count as misses."""
+
+    def __init__(self, path: str, timeout: float = 0.05):
+        """
+        Args:
+            path: Server socket path
+            timeout: Seconds to wait for the server before giving up
+        """
+        self.path = path
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            conn.settimeout(self.timeout)
+            conn.connect(self.path)
+            self._local.conn = conn
+        return conn
+
+    def _drop(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def _recv(self, conn: socket.socket, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = conn.recv(size - len(data))
+            if not chunk:
+                raise ConnectionError("shared cache closed the connection")
+            data += chunk
+        return bytes(data)
+
+    def _call(self, op: bytes, key: str, value: bytes = b"") -> Optional[bytes]:
+        encoded = key.encode("utf-8")
+        if len(encoded) > MAX_KEY_BYTES or len(value) > MAX_VALUE_BYTES:
+            return None
+        try:
+            conn = self._connection()
+            conn.sendall(_REQUEST.pack(op, len(encoded), len(value)) + encoded + value)
+            status, length = _RESPONSE.unpack(self._recv(conn, _RESPONSE.size))
+            return self._recv(conn, length) if status == b"H" else None
+        except (OSError, ConnectionError, struct.error):
+            self._drop()
+            return None
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._call(b"G", key)
+
+    def set(self, key: str, value: bytes) -> None:
+        self._call(b"S", key, value)
+
+
+async def serve(path: str, max_entries: int, ttl: float) -> None:
+    server = SharedCacheServer(path, max_entries, ttl)
+    await server.start()
+    print(f"✅ Shared cache on {path} ({max_entries} entries, {ttl:.0f} s TTL)")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StorePal shared cache server")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve_parser = sub.add_parser("serve", help="Run the cache server")
+    serve_parser.add_argument("--socket", default="/tmp/storepal-cache.sock")
+    serve_parser.add_argument("--max-entries", type=int, default=10000)
+    serve_parser.add_argument("--ttl", type=float, default=300.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.socket, args.max_entries, args.ttl))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Bounded top-K merge of ranked result lists, keyed by product ID.
+Used wherever several searches feed one answer (multi_query_search, the
+query variants of main.py's search_products): lists are added as they
+arrive, only the K best products are kept, and the caller can stop early
+once K confident results are in hand.
+
+Fusion:
+    max  a product keeps its best score; a min-heap of the current top K
+         gives the cut-off, and the rest of a list is skipped once it falls below
+    rrf  reciprocal-rank fusion, score = sum(1 / (rrf_k + rank)); every
+         product is accumulated and the top K picked with a heap at the end.
+         min_score still filters each list (on its own scores) before fusion;
+         confident_score is not supported (fused scores have no absolute scale)
+
+Usage:
+    merger = TopKMerger(k=5, min_score=0.003, confident_score=0.8)
+    for results in finished_searches:
+        merger.add(results)
+        if merger.done:
+            break
+    best = merger.results()
+"""
+
+import heapq
+import itertools
+from dataclasses import replace
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
+
+if TYPE_CHECKING:  # vector_search imports this module
+    from .vector_search import SearchResult
+
+FUSIONS = ("max", "rrf")
+
+
+class TopKMerger:
+    """Incremental top-K merge of ranked lists (ties keep the order results arrived in)."""
+
+    def __init__(
+        self,
+        k: Optional[int] = 5,
+        fusion: str = "max",
+        rrf_k: int = 60,
+        min_score: Optional[float] = None,
+        confident_score: Optional[float] = None
+    ):
+        """
+        Args:
+            k: Results kept (None keeps every product)
+            fusion: "max" or "rrf"
+            rrf_k: RRF damping constant
+            min_score: Results scoring below this are dropped on arrival (rrf: before
+                ranking each list, so a dropped result takes no rank)
+            confident_score: done becomes True once k results score at least this (max fusion only)
+        """
+        if fusion not in FUSIONS:
+            raise ValueError(f"Unknown fusion '{fusion}'. Expected one of {', '.join(FUSIONS)}")
+        if fusion == "rrf" and confident_score is not None:
+            raise ValueError("confident_score requires max fusion (RRF scores have no absolute scale)")
+        self.k = k
+        self.fusion = fusion
+        self.rrf_k = rrf_k
+        self.min_score = min_score
+        self.confident_score = confident_score
+        self.lists_added = 0
+        self._order = itertools.count()
+        # max: product_id -> [score, -arrival, product_id, result, live]; the heap holds
+        # the same entries (lowest score, then latest arrival, on top), stale ones marked dead
+        self._entries: Dict[int, list] = {}
+        self._heap: List[list] = []
+        # rrf: product_id -> [score, -first arrival, result]
+        self._fused: Dict[int, list] = {}
+
+    def add(self, results: Sequence["SearchResult"]) -> None:
+        """Merge one ranked list (best first: max fusion stops reading it at the first result that cannot place)."""
+        self.lists_added += 1
+        if self.fusion == "rrf":
+            if self.min_score is not None:
+                results = [result for result in results if result.score >= self.min_score]
+            for rank, result in enumerate(results, 1):
+                entry = self._fused.get(result.product_id)
+                if entry is None:
+                    self._fused[result.product_id] = [1.0 / (self.rrf_k + rank), -next(self._order), result]
+                else:
+                    entry[0] += 1.0 / (self.rrf_k + rank)
+            return
+        entries, heap, k, min_score = self._entries, self._heap, self.k, self.min_score
+        for result in results:
+            score = result.score
+            if min_score is not None and score < min_score:
+                break  # the rest of the list scores lower still
+            current = entries.get(result.product_id)
+            if current is not None:
+                if score <= current[0]:
+                    continue
+                current[4] = False  # superseded by the better-scoring occurrence
+            elif k is not None and len(entries) >= k:
+                self._drop_dead()
+                if score <= heap[0][0]:
+                    break  # neither this nor anything after it can make the top K
+                del entries[heapq.heappop(heap)[2]]
+            entry = [score, -next(self._order), result.product_id, result, True]
+            entries[result.product_id] = entry
+            heapq.heappush(heap, entry)
+
+    def _drop_dead(self) -> None:
+        while self._heap and not self._heap[0][4]:
+            heapq.heappop(self._heap)
+
+    def __len__(self) -> int:
+        return len(self._fused) if self.fusion == "rrf" else len(self._entries)
+
+    @property
+    def done(self) -> bool:
+        """True once k results at or above confident_score are held (max fusion only)."""
+        if self.fusion != "max" or self.confident_score is None or self.k is None or len(self._entries) < self.k:
+            return False
+        self._drop_dead()
+        return self._heap[0][0] >= self.confident_score
+
+    def results(self) -> List["SearchResult"]:
+        """The merged top k, best first (RRF results carry their fused score, not the retriever's)."""
+        if self.fusion == "rrf":
+            ranked: List[Tuple[float, int, "SearchResult"]] = [tuple(e) for e in self._fused.values()]
+            top = heapq.nlargest(self.k, ranked) if self.k is not None else sorted(ranked, reverse=True)
+            return [replace(result, score=score) for score, _, result in top]
+        live = sorted(self._entries.values(), key=lambda e: (e[0], e[1]), reverse=True)
+        return [e[3] for e in live]
@@ -0,0 +1,356 @@
+"""
+Per-turn span tracing for the StorePal voice pipeline.
+A turn starts at the user's final transcript and ends at the first agent
+audio frame of the answer. Spans opened while a turn is current (in the relay
+task, or in worker threads it starts) are attached to it. Finished turns are
+exported as JSON lines or as OTLP/HTTP JSON to a local collector.
+
+Tracing is off unless main.py is given TRACE_EXPORT; with no current turn a
+span costs one contextvar lookup.
+
+Usage (from the backend folder):
+    TRACE_EXPORT=jsonl:traces.jsonl python main.py
+    TRACE_EXPORT=otlp:http://localhost:4318/v1/traces python main.py
+    python -m pinecone_vdb.tracing summarize traces.jsonl
+"""
+
+import argparse
+import contextvars
+import functools
+import json
+import os
+import queue
+import statistics
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+
+@dataclass(slots=True)
+class Span:
+    """One timed stage of a turn (times are Unix epoch nanoseconds)."""
+    name: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int
+    end_ns: int = 0
+    attributes: Dict[str, Any] = field(default_factory=dict)
+
+
+class Turn:
+    """All spans of one user turn in one conversation."""
+
+    __slots__ = ("conversation_id", "turn", "trace_id", "spans", "root")
+
+    def __init__(self, conversation_id: str, turn: int, **attributes):
+        self.conversation_id = conversation_id
+        self.turn = turn
+        self.trace_id = os.urandom(16).hex()
+        self.root = Span("turn", os.urandom(8).hex(), None, time.time_ns(), attributes=attributes)
+        self.spans: List[Span] = [self.root]
+
+    def add(self, name: str, start_ns: int, end_ns: int, parent: Optional[Span] = None, **attributes) -> Span:
+        """Attach a span measured by the caller."""
+        span = Span(name, os.urandom(8).hex(), (parent or self.root).span_id, start_ns, end_ns, attributes)
+        self.spans.append(span)  # list.append is atomic: safe from worker threads
+        return span
+
+
+_current_turn: contextvars.ContextVar[Optional[Turn]] = contextvars.ContextVar("storepal_turn", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("storepal_span", default=None)
+
+
+class _NullScope:
+    __slots__ = ()
+
+    def __enter__(self):
+        return None
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SCOPE = _NullScope()
+
+
+class _SpanScope:
+    __slots__ = ("turn", "name", "attributes", "span", "token")
+
+    def __init__(self, turn: Turn, name: str, attributes: Dict[str, Any]):
+        self.turn = turn
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> Span:
+        self.span = self.turn.add(self.name, time.time_ns(), 0, _current_span.get(), **self.attributes)
+        self.token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb):
+        self.span.end_ns = time.time_ns()
+        if exc_type is not None:
+            self.span.attributes["error"] = exc_type.__name__
+        _current_span.reset(self.token)
+        return False
+
+
+def span(name: str, **attributes):
+    """
+    Context manager timing a stage of the current turn (no-op outside a turn).
+    Works in sync and async code; nested spans become children.
+    """
+    turn = _current_turn.get()
+    if turn is None:
+        return _NULL_SCOPE
+    return _SpanScope(turn, name, attributes)
+
+
+def traced(name: str):
+    """Decorator that records each call of a function as a span of the current turn."""
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            turn = _current_turn.get()
+            if turn is None:
+                return fn(*args, **kwargs)
+            with _SpanScope(turn, name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def current_turn() -> Optional[Turn]:
+    return _current_turn.get()
+
+
+class _BackgroundExporter:
+    """Exports finished turns from a daemon thread so the relay never waits on I/O."""
+
+    def __init__(self):
+        self._queue: "queue.Queue[Optional[Turn]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, turn: Turn) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            with self._lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+                    self._thread.start()
+        self._queue.put(turn)
+
+    def _run(self) -> None:
+        while True:
+            turn = self._queue.get()
+            if turn is None:
+                return
+            try:
+                self._write(turn)
+            except Exception as e:
+                print(f"⚠️  Trace export failed: {e}")
+
+    def _write(self, turn: Turn) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Stop the exporter thread after it drains queued turns."""
+        if self._thread is not None and self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+        self._thread = None
+
+
+def span_record(turn: Turn, span: Span) -> Dict[str, Any]:
+    """JSON lines representation of one span."""
+    return {
+        "conversation_id": turn.conversation_id,
+        "turn": turn.turn,
+        "trace_id": turn.trace_id,
+        "span_id": span.span_id,
+        "parent_id": span.parent_id,
+        "name": span.name,
+        "start_ns": span.start_ns,
+        "duration_ms": round((span.end_ns - span.start_ns) / 1e6, 3),
+        "attributes": span.attributes,
+    }
+
+
+class JsonLinesExporter(_BackgroundExporter):
+    """Appends one JSON object per span to a file."""
+
+    def __init__(self, path: Union[str, Path]):
+        super().__init__()
+        self.path = Path(path)
+
+    def _write(self, turn: Turn) -> None:
+        with open(self.path, "a", encoding="utf-8") as f:
+            for s in turn.spans:
+                f.write(json.dumps(span_record(turn, s)) + "\n")
+
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+class OtlpHttpExporter(_BackgroundExporter):
+    """Posts each turn as OTLP/HTTP JSON (e.g. to an OpenTelemetry collector on :4318)."""
+
+    def __init__(self, endpoint: str = "http://localhost:4318/v1/traces", service_name: str = "storepal", timeout: float = 2.0):
+        super().__init__()
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.timeout = timeout
+
+    def payload(self, turn: Turn) -> Dict[str, Any]:
+        common = {"conversation_id": turn.conversation_id, "turn": turn.turn}
+        return {"resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": self.service_name}}]},
+            "scopeSpans": [{
+                "scope": {"name": "storepal.tracing"},
+                "spans": [
+                    {
+                        "traceId": turn.trace_id,
+                        "spanId": s.span_id,
+                        "parentSpanId": s.parent_id or "",
+                        "name": s.name,
+                        "kind": 1,
+                        "startTimeUnixNano": str(s.start_ns),
+                        "endTimeUnixNano": str(s.end_ns),
+                        "attributes": [
+                            {"key": key, "value": _otlp_value(value)}
+                            for key, value in {**common, **s.attributes}.items()
+                        ],
+                    }
+                    for s in turn.spans
+                ],
+            }],
+        }]}
+
+    def _write(self, turn: Turn) -> None:
+        request = urllib.request.Request(
+            self.endpoint,
+            data=json.dumps(self.payload(turn)).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        urllib.request.urlopen(request, timeout=self.timeout).close()
+
+
+def build_exporter(spec: Optional[str]) -> Optional[_BackgroundExporter]:
+    """
+    Build an exporter from a TRACE_EXPORT value.
+
+    Args:
+        spec: "jsonl:<path>", "otlp" or "otlp:<endpoint>"; empty disables tracing
+
+    Returns:
+        Exporter, or None when tracing is off
+    """
+    if not spec:
+        return None
+    kind, _, target = spec.partition(":")
+    if kind == "jsonl":
+        return JsonLinesExporter(target or "traces.jsonl")
+    if kind == "otlp":
+        return OtlpHttpExporter(target) if target else OtlpHttpExporter()
+    raise ValueError(f"Unknown TRACE_EXPORT '{spec}'. Expected jsonl:<path> or otlp[:<endpoint>]")
+
+
+class Tracer:
+    """Starts and finishes turns and hands them to the exporter."""
+
+    def __init__(self, exporter: Optional[_BackgroundExporter] = None):
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def start_turn(self, conversation_id: Optional[str], turn: int, **attributes) -> Optional[Turn]:
+        """Make a new turn current in this task (returns None when tracing is off)."""
+        if self.exporter is None:
+            return None
+        current = Turn(conversation_id or "-", turn, **attributes)
+        _current_turn.set(current)
+        _current_span.set(None)
+        return current
+
+    def end_turn(self, turn: Optional[Turn], **attributes) -> None:
+        """Close the turn's root span and export it."""
+        if turn is None:
+            return
+        turn.root.end_ns = time.time_ns()
+        turn.root.attributes.update(attributes)
+        if _current_turn.get() is turn:
+            _current_turn.set(None)
+        self.exporter.export(turn)
+
+    def close(self) -> None:
+        if self.exporter is not None:
+            self.exporter.close()
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def summarize(path: Union[str, Path]) -> Dict[str, Dict[str, float]]:
+    """
+    Per-stage latency percentiles from a JSON lines trace file.
+
+    Returns:
+        {stage: {"count", "p50", "p90", "p99", "max", "mean"}} in milliseconds
+    """
+    durations: Dict[str, List[float]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                record = json.loads(line)
+                durations[record["name"]].append(record["duration_ms"])
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {
+            "count": len(values),
+            "p50": _percentile(values, 0.50),
+            "p90": _percentile(values, 0.90),
+            "p99": _percentile(values, 0.99),
+            "max": values[-1],
+            "mean": statistics.fmean(values),
+        }
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="StorePal turn traces")
+    sub = parser.add_subparsers(dest="command", required=True)
+    summarize_parser = sub.add_parser("summarize", help="Per-stage percentiles from a JSON lines trace file")
+    summarize_parser.add_argument("trace_file", type=Path)
+    args = parser.parse_args()
+
+    summary = summarize(args.trace_file)
+    turns = summary.get("turn", {}).get("count", 0)
+    print("\n" + "=" * 70)
+    print(f"  Turn latency by stage ({turns} turns, {args.trace_file})")
+    print("=" * 70 + "\n")
+    print(f"  {'stage':<28}{'count':>7}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, stats in sorted(summary.items(), key=lambda item: item[1]["p50"], reverse=True):
+        print(
+            f"  {name:<28}{stats['count']:>7}{stats['p50']:>10.1f}{stats['p90']:>10.1f}"
+            f"{stats['p99']:>10.1f}{stats['max']:>10.1f}"
+        )
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -12,6 +12,11 @@ from pathlib import Path
 from dotenv import load_dotenv
 from pinecone import Pinecone
 
+try:
+    from .catalog import build_chunk_text
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from catalog import build_chunk_text
+
 # Fix Windows console encoding for emojis
 if sys.platform == "win32":
     sys.stdout.reconfigure(encoding='utf-8')
@@ -65,10 +70,8 @@ def prepare_records(df):
     records = []
     for _, row in df.iterrows():
         # Create a rich text description for embedding
-        chunk_text = (
-            f"{row['item_name']} in {row['category']}. "
-            f"{row['description']} "
-            f"Located in aisle {row['aisle_location']}."
+        chunk_text = build_chunk_text(
+            row['item_name'], row['category'], row['description'], row['aisle_location']
         )
         
         record = {
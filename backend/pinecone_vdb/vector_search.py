@@ -6,10 +6,26 @@ Supports semantic search, filtering, and reranking.
 
 import os
 import sys
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable, Tuple
+from dataclasses import dataclass, replace
 from dotenv import load_dotenv
-from pinecone import Pinecone
+
+try:
+    from .response_templates import FormattedResults, render_results
+    from .adaptive_rerank import RerankPolicy, AdaptiveRerankStats, decide
+    from .metrics import REGISTRY, timed
+    from .log import get_logger
+    from .tracing import traced
+    from .topk import TopKMerger
+except ImportError:  # running as a script from inside pinecone_vdb/
+    from response_templates import FormattedResults, render_results
+    from adaptive_rerank import RerankPolicy, AdaptiveRerankStats, decide
+    from metrics import REGISTRY, timed
+    from log import get_logger
+    from tracing import traced
+    from topk import TopKMerger
 
 # Fix Windows console encoding for emojis
 if sys.platform == "win32":
@@ -20,20 +36,33 @@ if sys.platform == "win32":
 
 load_dotenv()
 
+logger = get_logger("search")
+
+# Shadow full reranks (adaptive_search quality checks) waiting or running per engine;
+# more are dropped rather than queued, so a slow reranker cannot build a backlog
+SHADOW_MAX_PENDING = 4
+
+SEARCH_LATENCY = REGISTRY.histogram(
+    "storepal_search_latency_seconds", "VectorSearchEngine call latency by method", ["method"]
+)
+
+
+def instrumented(method: str):
+    """Record each call in SEARCH_LATENCY and as a span of the current turn."""
+    def decorator(fn):
+        return traced(method)(timed(SEARCH_LATENCY, method)(fn))
+    return decorator
+
+
+class _SearchResultMixin:
+    """Shared behaviour for the mutable and frozen search result types."""
+
+    __slots__ = ()
 
-@dataclass
-class SearchResult:
-    """Data class to represent a search result."""
-    product_id: int
-    item_name: str
-    category: str
-    description: str
-    aisle_location: str
-    score: float
-    chunk_text: str
-    
     def to_dict(self) -> Dict[str, Any]:
         """Convert search result to dictionary."""
+        # A single dict display is the cheapest way to build this in CPython;
+        # dataclasses.asdict() deep-copies every field and is several times slower.
         return {
             "product_id": self.product_id,
             "item_name": self.item_name,
@@ -43,7 +72,7 @@ class SearchResult:
             "score": self.score,
             "chunk_text": self.chunk_text
         }
-    
+
     def to_natural_language(self) -> str:
         """Convert search result to natural language response."""
         return (
@@ -52,6 +81,105 @@ class SearchResult:
         )
 
 
+@dataclass(slots=True)
+class SearchResult(_SearchResultMixin):
+    """Data class to represent a search result."""
+    product_id: int
+    item_name: str
+    category: str
+    description: str
+    aisle_location: str
+    score: float
+    chunk_text: str
+
+
+@dataclass(slots=True, frozen=True)
+class FrozenSearchResult(_SearchResultMixin):
+    """Immutable, hashable variant of SearchResult (safe to cache and share)."""
+    product_id: int
+    item_name: str
+    category: str
+    description: str
+    aisle_location: str
+    score: float
+    chunk_text: str
+
+
+def _read_mapping_hit(hit) -> Tuple[Dict[str, Any], float]:
+    """Read (fields, score) from a plain dict hit."""
+    return hit.get('fields') or {}, hit.get('_score', 0.0)
+
+
+def _make_attribute_reader(score_attr: str) -> Callable[[Any], Tuple[Dict[str, Any], float]]:
+    """Build a (fields, score) reader for SDK hit objects exposing attributes."""
+    def _read_attribute_hit(hit) -> Tuple[Dict[str, Any], float]:
+        return hit.fields or {}, getattr(hit, score_attr)
+    return _read_attribute_hit
+
+
+def _read_subscript_hit(hit) -> Tuple[Dict[str, Any], float]:
+    """Read (fields, score) from an SDK hit that only supports subscripting."""
+    return hit['fields'] or {}, hit['_score']
+
+
+# Hit reader per concrete hit type, so the shape of a response is probed once
+# per type rather than once per hit.
+_HIT_READERS: Dict[type, Callable[[Any], Tuple[Dict[str, Any], float]]] = {dict: _read_mapping_hit}
+
+
+def _hit_reader(hit) -> Callable[[Any], Tuple[Dict[str, Any], float]]:
+    """Return (and cache) the reader for the type of the given hit."""
+    hit_type = type(hit)
+    reader = _HIT_READERS.get(hit_type)
+    if reader is None:
+        if isinstance(hit, dict):
+            reader = _read_mapping_hit
+        elif hasattr(hit, 'fields') and hasattr(hit, '_score'):
+            reader = _make_attribute_reader('_score')
+        elif hasattr(hit, 'fields') and hasattr(hit, 'score'):
+            reader = _make_attribute_reader('score')
+        else:
+            reader = _read_subscript_hit
+        _HIT_READERS[hit_type] = reader
+    return reader
+
+
+def parse_hits(hits, result_type: type = SearchResult) -> List[SearchResult]:
+    """
+    Parse Pinecone search hits into search result objects in a single pass.
+
+    Args:
+        hits: List of hits from Pinecone (dicts or SDK hit objects)
+        result_type: SearchResult or FrozenSearchResult
+
+    Returns:
+        List of result_type objects
+    """
+    if not hits:
+        return []
+
+    read = _hit_reader(hits[0])
+    first_type = type(hits[0])
+    results = []
+    append = results.append
+    for hit in hits:
+        if type(hit) is not first_type:
+            read = _hit_reader(hit)
+            first_type = type(hit)
+        fields, score = read(hit)
+        product_id = fields.get('product_id')
+        append(result_type(
+            int(product_id) if product_id else 0,
+            fields.get('item_name', ''),
+            fields.get('category', ''),
+            fields.get('description', ''),
+            fields.get('aisle_location', ''),
+            score if score is not None else 0.0,
+            fields.get('chunk_text', '')
+        ))
+    return results
+
+
 class VectorSearchEngine:
     """
     Vector Search Engine for WinMart inventory.
@@ -62,7 +190,15 @@ class VectorSearchEngine:
         self,
         index_name: str = "winmart-inventory",
         namespace: str = "winmart-products",
-        api_key: Optional[str] = None
+        api_key: Optional[str] = None,
+        frozen_results: bool = False,
+        sparse_index=None,
+        rerank_policy: Optional[RerankPolicy] = None,
+        reranker=None,
+        recommendations=None,
+        catalog_filters=None,
+        client=None,
+        index=None
     ):
         """
         Initialize the Vector Search Engine.
@@ -71,20 +207,51 @@ class VectorSearchEngine:
             index_name: Name of the Pinecone index
             namespace: Namespace within the index
             api_key: Pinecone API key (defaults to env variable)
+            frozen_results: Return immutable FrozenSearchResult objects
+            sparse_index: Optional hybrid.BM25Index used by hybrid_search
+            rerank_policy: Thresholds for adaptive_search (defaults to RerankPolicy())
+            reranker: Optional local_rerank.LocalRerankStage used instead of
+                Pinecone's hosted reranker
+            recommendations: Optional recommendations.RecommendationTable of
+                precomputed neighbors for get_product_recommendations
+            catalog_filters: Optional catalog_filters.CatalogFilters used to serve
+                browse requests locally (defaults to the sparse index's filters,
+                or is built from the inventory CSV on first use)
+            client: Optional Pinecone-compatible client used instead of the SDK
+                (e.g. local_backend.LocalClient for offline replays)
+            index: Optional index handle from client.Index(index_name), shared
+                by engines on the same index (see engine_registry)
         """
         self.index_name = index_name
         self.namespace = namespace
+        self.result_type = FrozenSearchResult if frozen_results else SearchResult
+        self.sparse_index = sparse_index
+        self.hybrid_stats = {"searches": 0, "rerank_calls": 0, "rerank_skipped": 0}
+        self.rerank_policy = rerank_policy or RerankPolicy()
+        self.adaptive_stats = AdaptiveRerankStats()
+        self._shadow_executor: Optional[ThreadPoolExecutor] = None
+        self._shadow_pending = 0
+        self._shadow_lock = threading.Lock()
+        self.reranker = reranker
+        self.recommendations = recommendations
+        if catalog_filters is None and sparse_index is not None:
+            catalog_filters = sparse_index.filters
+        self.catalog_filters = catalog_filters
         self.api_key = api_key or os.getenv("PINECONE_API_KEY")
         
-        if not self.api_key:
+        if client is None and not self.api_key:
             raise ValueError("PINECONE_API_KEY must be set in environment or passed as argument")
         
-        # Initialize Pinecone client
-        self.pc = Pinecone(api_key=self.api_key)
+        # Initialize Pinecone client (the SDK is imported here: modules that only
+        # need SearchResult should not pay for it)
+        if client is None:
+            from pinecone import Pinecone
+            client = Pinecone(api_key=self.api_key)
+        self.pc = client
         
         # Get the index
         try:
-            self.index = self.pc.Index(self.index_name)
+            self.index = index if index is not None else self.pc.Index(self.index_name)
             print(f"✅ VectorSearchEngine initialized with index '{self.index_name}'")
         except Exception as e:
             print(f"❌ Error initializing index: {e}")
@@ -100,27 +267,9 @@ class VectorSearchEngine:
         Returns:
             List of SearchResult objects
         """
-        results = []
-        for i, hit in enumerate(hits):
-            # Access hit as dict-like object (not calling .keys())
-            fields = hit.get('fields', {}) if hasattr(hit, 'get') else hit.get('fields', {}) if isinstance(hit, dict) else {}
-            
-            # Handle both dict and object access
-            if not fields and hasattr(hit, '__getitem__'):
-                fields = hit['fields'] if 'fields' in hit else {}
-            
-            result = SearchResult(
-                product_id=int(fields.get('product_id', 0)) if fields.get('product_id') else 0,
-                item_name=fields.get('item_name', ''),
-                category=fields.get('category', ''),
-                description=fields.get('description', ''),
-                aisle_location=fields.get('aisle_location', ''),
-                score=hit.get('_score', 0.0) if hasattr(hit, 'get') else hit['_score'] if '_score' in hit else 0.0,
-                chunk_text=fields.get('chunk_text', '')
-            )
-            results.append(result)
-        return results
+        return parse_hits(hits, self.result_type)
     
+    @instrumented("semantic_search")
     def semantic_search(
         self,
         query: str,
@@ -165,23 +314,24 @@ class VectorSearchEngine:
             return results
             
         except Exception as e:
-            print(f"❌ Error during semantic search: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error during semantic search: %s", e)
             return []
     
+    @instrumented("search_with_filter")
     def search_with_filter(
         self,
-        query: str,
+        query: Optional[str],
         category: Optional[str] = None,
         aisle: Optional[str] = None,
         top_k: int = 5
     ) -> List[SearchResult]:
         """
         Perform semantic search with metadata filters.
+        Without a query this is a browse request and is served from the
+        local catalog filters (no embedding call).
         
         Args:
-            query: Natural language query
+            query: Natural language query (None or empty to browse)
             category: Filter by product category (e.g., "Produce", "Dairy")
             aisle: Filter by aisle location (e.g., "A1", "B2")
             top_k: Number of results to return
@@ -189,6 +339,9 @@ class VectorSearchEngine:
         Returns:
             List of SearchResult objects
         """
+        if not query or not query.strip():
+            return self.browse(category=category, aisle=aisle, top_k=top_k)
+        
         try:
             # Build filter expression
             filter_expr = {}
@@ -216,9 +369,38 @@ class VectorSearchEngine:
             return results
             
         except Exception as e:
-            print(f"❌ Error during filtered search: {e}")
+            logger.error("❌ Error during filtered search: %s", e)
             return []
     
+    @instrumented("browse")
+    def browse(
+        self,
+        category: Optional[str] = None,
+        aisle: Optional[str] = None,
+        top_k: int = 10
+    ) -> List[SearchResult]:
+        """
+        List products in a category and/or aisle straight from the local
+        category/aisle bitsets, without embedding or calling Pinecone.
+        
+        Args:
+            category: Product category (e.g., "Produce", "Dairy")
+            aisle: Aisle location (e.g., "A1", "B2")
+            top_k: Number of results to return
+            
+        Returns:
+            List of SearchResult objects in catalog order
+        """
+        if self.catalog_filters is None:
+            # Imported here: catalog_filters imports this module
+            try:
+                from .catalog_filters import CatalogFilters
+            except ImportError:  # running as a script from inside pinecone_vdb/
+                from catalog_filters import CatalogFilters
+            self.catalog_filters = CatalogFilters.from_csv()
+        return self.catalog_filters.browse(category=category, aisle=aisle, top_k=top_k)
+    
+    @instrumented("search_with_reranking")
     def search_with_reranking(
         self,
         query: str,
@@ -238,6 +420,11 @@ class VectorSearchEngine:
         Returns:
             List of SearchResult objects (reranked)
         """
+        if self.reranker is not None:
+            # Local rerank stage: first stage from Pinecone, scoring in-process
+            candidates = self.semantic_search(query, top_k=top_k)
+            return self.rerank(query, candidates, top_n=top_n, rerank_model=rerank_model)
+        
         try:
             # Perform search with reranking
             response = self.index.search(
@@ -266,12 +453,182 @@ class VectorSearchEngine:
             return results
             
         except Exception as e:
-            print(f"❌ Error during reranked search: {e}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("❌ Error during reranked search: %s", e)
             # Fallback to regular search
             return self.semantic_search(query, top_k=top_n)
     
+    @instrumented("rerank")
+    def rerank(
+        self,
+        query: str,
+        candidates: List[SearchResult],
+        top_n: int = 5,
+        rerank_model: str = "bge-reranker-v2-m3"
+    ) -> List[SearchResult]:
+        """
+        Rerank an existing candidate list with the local rerank stage, if
+        configured, or Pinecone's hosted reranker.
+        
+        Args:
+            query: Natural language query
+            candidates: Candidates to rerank (e.g. fused hybrid results)
+            top_n: Number of results to return after reranking
+            rerank_model: Reranking model to use
+            
+        Returns:
+            List of SearchResult objects (reranked), or the first top_n
+            candidates unchanged if the rerank call fails
+        """
+        if not candidates:
+            return []
+        if self.reranker is not None:
+            try:
+                return self.reranker.rerank(query, candidates, top_n=top_n)
+            except Exception as e:
+                logger.error("❌ Error during local rerank (%s): %s", self.reranker.name, e)
+                return list(candidates[:top_n])
+        try:
+            response = self.pc.inference.rerank(
+                model=rerank_model,
+                query=query,
+                documents=[{"id": str(c.product_id), "chunk_text": c.chunk_text} for c in candidates],
+                top_n=top_n,
+                rank_fields=["chunk_text"],
+                return_documents=False
+            )
+            ranked = response['data'] if isinstance(response, dict) else response.data
+            results = []
+            for item in ranked:
+                if isinstance(item, dict):
+                    position, score = item['index'], item['score']
+                else:
+                    position, score = item.index, item.score
+                results.append(replace(candidates[position], score=score))
+            return results
+        except Exception as e:
+            logger.error("❌ Error during rerank: %s", e)
+            return list(candidates[:top_n])
+    
+    @instrumented("hybrid_search")
+    def hybrid_search(
+        self,
+        query: str,
+        top_k: int = 20,
+        top_n: int = 5,
+        fusion: str = "rrf",
+        alpha: float = 0.5,
+        rerank: str = "auto",
+        skip_rerank_margin: float = 0.01,
+        rerank_model: str = "bge-reranker-v2-m3",
+        category: Optional[str] = None,
+        aisle: Optional[str] = None
+    ) -> List[SearchResult]:
+        """
+        Perform hybrid BM25 + dense search with score fusion.
+        
+        Args:
+            query: Natural language query
+            top_k: Number of candidates to retrieve from each retriever
+            top_n: Number of results to return
+            fusion: "rrf" (reciprocal-rank) or "weighted" (min-max normalized scores)
+            alpha: Dense weight for weighted fusion
+            rerank: "auto" (skip when the fused top-1 is clearly separated),
+                "always" or "never"
+            skip_rerank_margin: Relative top-1 lead required to skip reranking
+            rerank_model: Reranking model to use
+            category: Restrict both retrievers to this category
+            aisle: Restrict both retrievers to this aisle
+            
+        Returns:
+            List of SearchResult objects
+        """
+        # Imported here: hybrid imports this module
+        try:
+            from .hybrid import fuse_rrf, fuse_weighted, top1_separated
+        except ImportError:  # running as a script from inside pinecone_vdb/
+            from hybrid import fuse_rrf, fuse_weighted, top1_separated
+        
+        if self.sparse_index is None:
+            raise ValueError("hybrid_search requires a sparse_index (hybrid.BM25Index)")
+        
+        if category or aisle:
+            dense = self.search_with_filter(query, category=category, aisle=aisle, top_k=top_k)
+        else:
+            dense = self.semantic_search(query, top_k=top_k)
+        sparse = self.sparse_index.search(query, top_k=top_k, category=category, aisle=aisle)
+        if fusion == "weighted":
+            fused = fuse_weighted(dense, sparse, alpha=alpha)
+        else:
+            fused = fuse_rrf([dense, sparse])
+        
+        self.hybrid_stats["searches"] += 1
+        if rerank == "never" or (
+            rerank == "auto" and top1_separated(fused, dense, sparse, skip_rerank_margin)
+        ):
+            self.hybrid_stats["rerank_skipped"] += 1
+            return fused[:top_n]
+        
+        self.hybrid_stats["rerank_calls"] += 1
+        return self.rerank(query, fused[:top_k], top_n=top_n, rerank_model=rerank_model)
+    
+    @instrumented("adaptive_search")
+    def adaptive_search(
+        self,
+        query: str,
+        top_k: int = 20,
+        top_n: int = 5,
+        rerank_model: str = "bge-reranker-v2-m3"
+    ) -> List[SearchResult]:
+        """
+        Perform semantic search and rerank only as much as the query needs.
+        
+        The first-stage score margin and entropy decide (see rerank_policy)
+        whether to skip reranking, rerank the top shrink_k candidates, or
+        rerank all top_k.
+        
+        Args:
+            query: Natural language query
+            top_k: Number of initial results to retrieve
+            top_n: Number of results to return
+            rerank_model: Reranking model to use
+            
+        Returns:
+            List of SearchResult objects
+        """
+        candidates = self.semantic_search(query, top_k=top_k)
+        decision = decide([c.score for c in candidates], self.rerank_policy)
+        self.adaptive_stats.record(decision, len(candidates))
+        
+        if decision.action == "skip":
+            results = candidates[:top_n]
+        else:
+            results = self.rerank(query, candidates[:decision.candidates], top_n=top_n, rerank_model=rerank_model)
+        
+        if results and self.adaptive_stats.should_shadow(decision):
+            self._submit_shadow(query, candidates, results[0].product_id, rerank_model)
+        
+        return results
+    
+    def _submit_shadow(self, query: str, candidates: List[SearchResult], top1_id: int, rerank_model: str) -> None:
+        """Check top1_id against a full rerank in a background thread (dropped when SHADOW_MAX_PENDING are waiting)."""
+        with self._shadow_lock:
+            if self._shadow_pending >= SHADOW_MAX_PENDING:
+                return
+            self._shadow_pending += 1
+            if self._shadow_executor is None:
+                self._shadow_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rerank-shadow")
+        self._shadow_executor.submit(self._shadow_rerank, query, candidates, top1_id, rerank_model)
+    
+    def _shadow_rerank(self, query: str, candidates: List[SearchResult], top1_id: int, rerank_model: str) -> None:
+        try:
+            full = self.rerank(query, candidates, top_n=1, rerank_model=rerank_model)
+            self.adaptive_stats.record_shadow(bool(full) and full[0].product_id == top1_id)
+        except Exception as e:
+            logger.error("❌ Error during shadow rerank: %s", e)
+        finally:
+            with self._shadow_lock:
+                self._shadow_pending -= 1
+    
     def search_by_category(
         self,
         category: str,
@@ -293,9 +650,8 @@ class VectorSearchEngine:
             # Search with category filter
             return self.search_with_filter(query, category=category, top_k=top_k)
         else:
-            # Just browse category
-            search_query = f"Show me products in {category}"
-            return self.search_with_filter(search_query, category=category, top_k=top_k)
+            # Just browse category (served locally, no embedding)
+            return self.browse(category=category, top_k=top_k)
     
     def search_by_aisle(
         self,
@@ -318,14 +674,16 @@ class VectorSearchEngine:
             # Search with aisle filter
             return self.search_with_filter(query, aisle=aisle, top_k=top_k)
         else:
-            # Just browse aisle
-            search_query = f"What is in aisle {aisle}"
-            return self.search_with_filter(search_query, aisle=aisle, top_k=top_k)
+            # Just browse aisle (served locally, no embedding)
+            return self.browse(aisle=aisle, top_k=top_k)
     
     def multi_query_search(
         self,
         queries: List[str],
-        top_k_per_query: int = 3
+        top_k_per_query: int = 3,
+        top_n: Optional[int] = None,
+        fusion: str = "max",
+        confident_score: Optional[float] = None
     ) -> List[SearchResult]:
         """
         Perform multiple searches and combine results.
@@ -334,24 +692,20 @@ class VectorSearchEngine:
         Args:
             queries: List of query strings
             top_k_per_query: Number of results per query
+            top_n: Number of combined results to keep (None keeps all)
+            fusion: "max" (a product's best score) or "rrf" (reciprocal-rank fusion)
+            confident_score: Stop issuing queries once top_n results score at
+                least this (max fusion only; ValueError with rrf)
             
         Returns:
-            Combined list of SearchResult objects (deduplicated)
+            Combined list of SearchResult objects (deduplicated by product ID), best first
         """
-        all_results = []
-        seen_ids = set()
-        
+        merger = TopKMerger(k=top_n, fusion=fusion, confident_score=confident_score)
         for query in queries:
-            results = self.semantic_search(query, top_k=top_k_per_query)
-            for result in results:
-                if result.product_id not in seen_ids:
-                    all_results.append(result)
-                    seen_ids.add(result.product_id)
-        
-        # Sort by score
-        all_results.sort(key=lambda x: x.score, reverse=True)
-        
-        return all_results
+            merger.add(self.semantic_search(query, top_k=top_k_per_query))
+            if merger.done:
+                break
+        return merger.results()
     
     def get_product_recommendations(
         self,
@@ -360,7 +714,8 @@ class VectorSearchEngine:
     ) -> List[SearchResult]:
         """
         Get product recommendations based on a product name.
-        Finds similar products using semantic search.
+        Uses the precomputed neighbor table when available, otherwise finds
+        similar products using semantic search.
         
         Args:
             product_name: Name of the product
@@ -369,8 +724,16 @@ class VectorSearchEngine:
         Returns:
             List of SearchResult objects (similar products)
         """
+        if self.recommendations is not None:
+            product_id = self.recommendations.product_id_for_name(product_name)
+            if product_id is not None:
+                return self.recommendations.recommend(product_id, top_k=top_k)
+        
         query = f"Products similar to {product_name}"
-        return self.semantic_search(query, top_k=top_k + 1)[1:]  # Exclude the product itself
+        results = self.semantic_search(query, top_k=top_k + 1)
+        # Exclude the product itself (wherever it ranks), not just the first hit
+        name = product_name.strip().lower()
+        return [r for r in results if r.item_name.lower() != name][:top_k]
     
     def format_results_for_agent(
         self,
@@ -387,29 +750,26 @@ class VectorSearchEngine:
         Returns:
             Formatted string response
         """
-        if not results:
-            return "I couldn't find any products matching your query. Could you rephrase your question?"
-        
-        if len(results) == 1:
-            result = results[0]
-            return (
-                f"I found {result.item_name}! It's in the {result.category} section, "
-                f"located in aisle {result.aisle_location}. {result.description}"
-            )
-        
-        # Multiple results
-        response = f"I found {len(results)} products that might help:\n\n"
-        
-        for i, result in enumerate(results, 1):
-            if include_all_info:
-                response += (
-                    f"{i}. {result.item_name} - Aisle {result.aisle_location}\n"
-                    f"   {result.description}\n\n"
-                )
-            else:
-                response += f"{i}. {result.item_name} - Aisle {result.aisle_location}\n"
+        # A single hit always gets the full sentence, as before
+        style = "verbose" if include_all_info or len(results) == 1 else "terse"
+        return render_results(results, style).text
+    
+    def render_results_for_agent(
+        self,
+        results: List[SearchResult],
+        style: str = "verbose"
+    ) -> FormattedResults:
+        """
+        Format search results for the AI agent as a structured result.
         
-        return response.strip()
+        Args:
+            results: List of SearchResult objects
+            style: Template variant ("verbose", "terse" or "voice")
+            
+        Returns:
+            FormattedResults with found flag, items and rendered text
+        """
+        return render_results(results, style)
     
     def get_index_stats(self) -> Dict[str, Any]:
         """
@@ -431,7 +791,15 @@ class VectorSearchEngine:
             return {}
 
 
-# Convenience functions for quick usage
+# Convenience functions for quick usage (they share one engine per process)
+
+def _shared_engine() -> VectorSearchEngine:
+    try:
+        from .engine_registry import get_engine
+    except ImportError:  # running as a script from inside pinecone_vdb/
+        from engine_registry import get_engine
+    return get_engine()
+
 
 def quick_search(query: str, top_k: int = 5) -> List[SearchResult]:
     """
@@ -444,8 +812,7 @@ def quick_search(query: str, top_k: int = 5) -> List[SearchResult]:
     Returns:
         List of SearchResult objects
     """
-    engine = VectorSearchEngine()
-    return engine.semantic_search(query, top_k=top_k)
+    return _shared_engine().semantic_search(query, top_k=top_k)
 
 
 def search_and_format(query: str, top_k: int = 5) -> str:
@@ -459,7 +826,7 @@ def search_and_format(query: str, top_k: int = 5) -> str:
     Returns:
         Formatted string response
     """
-    engine = VectorSearchEngine()
+    engine = _shared_engine()
     results = engine.search_with_reranking(query, top_k=20, top_n=top_k)
     return engine.format_results_for_agent(results)
 
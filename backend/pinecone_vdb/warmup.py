@@ -0,0 +1,123 @@
+"""
+Boot-time warm-up helpers for the StorePal API.
+main.py replays the most frequent historical queries through the search
+engine before /health reports ready, so the first shoppers after a deploy
+do not pay for the first Pinecone connection, embedding, rerank or template
+render. AnswerCache is the opt-in cache of rendered answers.
+
+Warm-up query files are plain text (one query per line) or JSON lines with a
+"q" (a query_log.py log), "query" or "transcript" field; repeated queries
+rank higher.
+"""
+
+import json
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+DEFAULT_QUERIES_PATH = Path(__file__).parent.parent / "data" / "warmup_queries.txt"
+
+
+def normalize_query(query: str) -> str:
+    """Cache key for a transcript: lowercased, whitespace collapsed, trailing punctuation dropped."""
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def load_queries(path: Optional[Union[str, Path]] = None, top_n: int = 20) -> List[str]:
+    """
+    Read warm-up queries, most frequent first.
+
+    Args:
+        path: Text or JSON lines file (defaults to data/warmup_queries.txt)
+        top_n: Number of distinct queries to return
+
+    Returns:
+        Up to top_n queries (first spelling seen for each normalized query)
+    """
+    counts: Counter = Counter()
+    spelling: Dict[str, str] = {}
+    with open(path or DEFAULT_QUERIES_PATH, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                record = json.loads(line)
+                line = record.get("q") or record.get("query") or record.get("transcript") or ""
+            key = normalize_query(line)
+            if key:
+                counts[key] += 1
+                spelling.setdefault(key, line)
+    return [spelling[key] for key, _ in counts.most_common(top_n)]
+
+
+class AnswerCache:
+    """Small LRU of rendered product answers keyed by normalized query."""
+
+    def __init__(self, max_entries: int = 1000, ttl: float = 300.0):
+        """
+        Args:
+            max_entries: Answers kept (least recently used dropped first)
+            ttl: Seconds an answer stays valid (0 disables the cache)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, query: str) -> Optional[Any]:
+        key = normalize_query(query)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def put(self, query: str, answer: Any) -> None:
+        if self.ttl <= 0:
+            return
+        key = normalize_query(query)
+        self._entries[key] = (time.monotonic() + self.ttl, answer)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"entries": len(self._entries), "max_entries": self.max_entries, "hits": self.hits, "misses": self.misses}
+
+
+async def run_steps(steps: List[Tuple[str, Callable[[], Awaitable[Any]]]]) -> Dict[str, Any]:
+    """
+    Run warm-up steps in order, timing each; a failing step is reported, not raised.
+
+    Args:
+        steps: (name, coroutine function) pairs; a step's return value is its detail
+
+    Returns:
+        {"duration_ms", "steps": {name: {"ms", "ok", "detail" or "error"}}}
+    """
+    report: Dict[str, Any] = {"steps": {}}
+    start = time.perf_counter()
+    for name, step in steps:
+        step_start = time.perf_counter()
+        try:
+            outcome = {"ok": True, "detail": await step()}
+        except Exception as e:
+            outcome = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        outcome["ms"] = round((time.perf_counter() - step_start) * 1000, 1)
+        report["steps"][name] = outcome
+    report["duration_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return report
@@ -0,0 +1,21 @@
+"""
+Unit tests for the pure-logic modules (merging, lookup, admission, negotiation).
+No Pinecone account, network or optional model packages are needed.
+
+Usage (from the backend folder):
+    python -m pytest tests
+"""
+
+import os
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+# main.py checks its credentials at import; the tests never connect upstream
+os.environ.setdefault("ELEVENLABS_API_KEY", "test")
+os.environ.setdefault("ELEVENLABS_AGENT_ID", "test-agent-id")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ["WARMUP"] = "0"
+os.environ.pop("QUERY_LOG", None)
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from pinecone_vdb.admission import (
+    ADMITTED, DEFAULT_SHED_THRESHOLDS, QUEUE_FULL, TIMEOUT, AdmissionController, parse_shed_thresholds
+)
+
+
+def test_unlimited_admits_everyone_and_never_sheds():
+    async def scenario():
+        admission = AdmissionController(max_sessions=0)
+        outcomes = [await admission.acquire() for _ in range(100)]
+        return admission, outcomes
+
+    admission, outcomes = asyncio.run(scenario())
+    assert set(outcomes) == {ADMITTED}
+    assert not any(admission.shedding(feature) for feature in DEFAULT_SHED_THRESHOLDS)
+
+
+def test_release_hands_the_slot_to_the_longest_waiter():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=2, wait_timeout=5)
+        positions = []
+
+        async def on_queued(position):
+            positions.append(position)
+
+        assert await admission.acquire() == ADMITTED
+        first = asyncio.create_task(admission.acquire(on_queued))
+        second = asyncio.create_task(admission.acquire(on_queued))
+        await asyncio.sleep(0)
+        assert admission.waiting == 2
+        assert await admission.acquire() == QUEUE_FULL
+
+        admission.release()
+        assert await first == ADMITTED
+        assert not second.done()
+        assert admission.active == 1  # the slot moved over; it was never freed
+
+        admission.release()
+        assert await second == ADMITTED
+        admission.release()
+        return admission, positions
+
+    admission, positions = asyncio.run(scenario())
+    assert positions == [1, 2]
+    assert (admission.active, admission.waiting) == (0, 0)
+
+
+def test_newcomers_do_not_jump_the_queue():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=5, wait_timeout=5)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        admission.release()
+        # The freed slot already belongs to the waiter, so a newcomer queues
+        newcomer = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        assert await waiter == ADMITTED
+        assert not newcomer.done()
+        admission.release()
+        return await newcomer
+
+    assert asyncio.run(scenario()) == ADMITTED
+
+
+def test_wait_times_out_and_leaves_the_queue():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=1, wait_timeout=0.01)
+        await admission.acquire()
+        outcome = await admission.acquire()
+        return admission, outcome
+
+    admission, outcome = asyncio.run(scenario())
+    assert outcome == TIMEOUT
+    assert (admission.active, admission.waiting) == (1, 0)
+
+
+def test_cancelled_waiter_is_skipped_by_release():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=2, wait_timeout=5)
+        await admission.acquire()
+        gone = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        gone.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await gone
+        admission.release()
+        return admission
+
+    admission = asyncio.run(scenario())
+    assert (admission.active, admission.waiting) == (0, 0)
+
+
+def test_cancellation_after_handover_gives_the_slot_back():
+    async def scenario():
+        admission = AdmissionController(max_sessions=1, max_waiting=1, wait_timeout=5)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        admission.release()  # hands the slot over...
+        waiter.cancel()      # ...but the client disconnects before it wakes up
+        try:
+            # Depending on the Python version, wait_for either still reports the
+            # handover or raises; the slot must end up owned or given back
+            if await waiter == ADMITTED:
+                admission.release()
+        except asyncio.CancelledError:
+            pass
+        return admission
+
+    admission = asyncio.run(scenario())
+    assert (admission.active, admission.waiting) == (0, 0)
+
+
+def test_shedding_follows_utilization_thresholds():
+    admission = AdmissionController(
+        max_sessions=20, shed_thresholds={"vad_forwarding": 0.5, "search_variants": 0.9}
+    )
+    admission.active = 9
+    assert not admission.shedding("vad_forwarding")
+    admission.active = 10
+    assert admission.shedding("vad_forwarding")
+    assert not admission.shedding("search_variants")
+    admission.active = 18
+    assert admission.shedding("search_variants")
+    assert admission.to_dict()["shedding"] == {"vad_forwarding": True, "search_variants": True}
+
+
+def test_parse_shed_thresholds():
+    assert parse_shed_thresholds(None) == DEFAULT_SHED_THRESHOLDS
+    thresholds = parse_shed_thresholds(" vad_forwarding=0.6, search_variants=1.5 ,")
+    assert thresholds["vad_forwarding"] == 0.6
+    assert thresholds["search_variants"] == 1.5
+    assert thresholds["interim_transcripts"] == DEFAULT_SHED_THRESHOLDS["interim_transcripts"]
+    with pytest.raises(ValueError):
+        parse_shed_thresholds("vad=0.5")
+
+
+def test_retry_after_hint_is_jittered_and_positive():
+    admission = AdmissionController(retry_after=10)
+    assert all(10 <= admission.retry_after_hint() <= 20 for _ in range(50))
+    assert AdmissionController(retry_after=0).retry_after_hint() == 1
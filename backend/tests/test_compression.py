@@ -0,0 +1,78 @@
+import gzip
+
+import pytest
+
+from pinecone_vdb.compression import (
+    BodyCompressor, choose_encoding, coded_etag, etag_matches, parse_accept_encoding
+)
+
+
+def test_parse_accept_encoding():
+    assert parse_accept_encoding("gzip, br;q=0.9") == {"gzip": 1.0, "br": 0.9}
+    assert parse_accept_encoding(" GZIP ;q=0.5,,identity") == {"gzip": 0.5, "identity": 1.0}
+    assert parse_accept_encoding("gzip;q=abc") == {"gzip": 0.0}
+    assert parse_accept_encoding("") == {}
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("gzip", "gzip"),
+    ("gzip, br", "br"),              # equal q: server preference
+    ("gzip, br;q=0.5", "gzip"),      # client preference wins
+    ("br;q=0, gzip;q=0.1", "gzip"),  # q=0 means "not acceptable"
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),           # an explicit coding overrides the wildcard
+    ("gzip;q=0, *;q=0", None),
+    ("deflate, identity", None),
+])
+def test_choose_encoding(header, expected):
+    assert choose_encoding(header, ["br", "gzip"]) == expected
+
+
+def test_negotiate_respects_min_size():
+    compressor = BodyCompressor(min_size=100)
+    assert compressor.negotiate("gzip", 99) is None
+    assert compressor.negotiate("gzip", 100) == "gzip"
+    assert compressor.negotiate("identity", 100) is None
+    assert BodyCompressor(min_size=0).negotiate("gzip", 10**6) is None
+
+
+def test_encode_caches_static_bodies():
+    compressor = BodyCompressor(max_cached=1)
+    body = b'{"products": []}' * 100
+    first = compressor.encode(body, "gzip", cache_key='"a"')
+    assert gzip.decompress(first) == body
+    assert compressor.encode(b"ignored", "gzip", cache_key='"a"') is first
+    compressor.encode(body, "gzip", cache_key='"b"')
+    assert compressor.to_dict()["cached_bodies"] == 1
+    assert gzip.decompress(compressor.encode(body, "gzip")) == body
+
+
+def test_coded_etag():
+    assert coded_etag('"3f2a"', "gzip") == '"3f2a-gzip"'
+    assert coded_etag('"3f2a"', "br") == '"3f2a-br"'
+    assert coded_etag('"3f2a"', None) == '"3f2a"'
+
+
+@pytest.mark.parametrize("header, matches", [
+    ('"3f2a-gzip"', True),
+    ('W/"3f2a-gzip"', True),                 # weak comparison
+    ('"other", "3f2a-gzip"', True),
+    ('"a,b", "3f2a-gzip"', True),            # a comma inside a tag does not split it
+    ("*", True),
+    (' * ', True),
+    ('"3f2a"', False),                       # the identity representation is a different tag
+    ('"3f2a-gzip-old"', False),
+    ('"3f2"', False),                        # no prefix or substring matches
+    ("3f2a-gzip", False),                    # unquoted is not an entity tag
+    ("", False),
+])
+def test_etag_matches(header, matches):
+    assert etag_matches(header, ['"3f2a-gzip"', '"3f2a-br"']) is matches
+
+
+def test_etag_matches_any_coding():
+    etags = [coded_etag('"3f2a"', e) for e in (None, "br", "gzip")]
+    assert etag_matches('"3f2a"', etags)
+    assert etag_matches('"3f2a-br"', etags)
+    assert not etag_matches('"3f2a-deflate"', etags)
@@ -0,0 +1,105 @@
+import pytest
+
+from pinecone_vdb.hybrid import BM25Index, fuse_rrf, fuse_weighted, top1_separated
+from pinecone_vdb.vector_search import SearchResult
+
+
+def result(product_id: int, score: float = 0.0, name: str = "", category: str = "Grocery", aisle: str = "A1") -> SearchResult:
+    name = name or f"Item {product_id}"
+    return SearchResult(product_id, name, category, "", aisle, score, name)
+
+
+def ids(results):
+    return [r.product_id for r in results]
+
+
+def test_fuse_rrf_sums_reciprocal_ranks():
+    fused = fuse_rrf([[result(1), result(2)], [result(2), result(3)]], k=60)
+    assert ids(fused) == [2, 1, 3]
+    assert fused[0].score == pytest.approx(1 / 62 + 1 / 61)
+    assert fused[1].score == pytest.approx(1 / 61)
+    assert fused[2].score == pytest.approx(1 / 62)
+
+
+def test_fuse_rrf_ignores_input_scores_and_keeps_first_seen_fields():
+    # BM25 scores (tens) and dense scores (< 1) never meet: only ranks count
+    dense = [result(1, 0.9, name="Dense Name"), result(2, 0.1)]
+    sparse = [result(2, 40.0), result(1, 12.0, name="Sparse Name")]
+    fused = fuse_rrf([dense, sparse])
+    assert fused[0].score == pytest.approx(fused[1].score)
+    assert ids(fused) == [1, 2]  # ties keep the order products were first seen
+    assert fused[0].item_name == "Dense Name"
+
+
+def test_fuse_rrf_of_nothing():
+    assert fuse_rrf([]) == []
+    assert fuse_rrf([[], []]) == []
+
+
+def test_fuse_weighted_normalizes_each_list():
+    dense = [result(1, 0.9), result(2, 0.5)]
+    sparse = [result(2, 30.0), result(3, 10.0)]
+    fused = fuse_weighted(dense, sparse, alpha=0.5)
+    scores = {r.product_id: r.score for r in fused}
+    assert scores == pytest.approx({1: 0.5, 2: 0.5, 3: 0.0})
+    assert ids(fuse_weighted(dense, sparse, alpha=1.0))[0] == 1
+    assert ids(fuse_weighted(dense, sparse, alpha=0.0))[0] == 2
+
+
+def test_top1_separated_needs_dense_and_sparse_to_agree():
+    fused = [result(1, 0.05), result(2, 0.01)]
+    assert top1_separated(fused, [result(1)], [result(1)], min_margin=0.5)
+    assert not top1_separated(fused, [result(1)], [result(2)], min_margin=0.5)
+    assert not top1_separated(fused, [result(1)], [], min_margin=0.5)
+
+
+def test_top1_separated_relative_margin():
+    dense, sparse = [result(1)], [result(1)]
+    assert top1_separated([result(1, 0.032), result(2, 0.030)], dense, sparse, min_margin=0.05)
+    assert not top1_separated([result(1, 0.032), result(2, 0.031)], dense, sparse, min_margin=0.05)
+    # A zero top score never counts as separated
+    assert not top1_separated([result(1, 0.0), result(2, 0.0)], dense, sparse, min_margin=0.0)
+
+
+def test_top1_separated_trivial_lists():
+    assert top1_separated([], [], [], min_margin=0.5)
+    assert top1_separated([result(1, 0.01)], [result(1)], [result(1)], min_margin=0.5)
+
+
+def test_bm25_ranks_and_filters():
+    index = BM25Index([
+        result(1, name="Whole Milk", category="Dairy", aisle="D1"),
+        result(2, name="Almond Milk", category="Dairy", aisle="D2"),
+        result(3, name="Milk Chocolate Bar", category="Snacks", aisle="S1"),
+        result(4, name="Bananas", category="Produce", aisle="P1"),
+    ])
+    assert set(ids(index.search("milk"))) == {1, 2, 3}
+    assert ids(index.search("almond milk"))[0] == 2
+    assert set(ids(index.search("milk", category="Dairy"))) == {1, 2}
+    assert ids(index.search("milk", aisle="S1")) == [3]
+    assert index.search("milk", category="Bakery") == []
+    assert index.search("lentils") == []
+
+
+def test_variant_merger_in_hybrid_mode_has_no_score_thresholds(monkeypatch):
+    # hybrid_search returns rerank scores or RRF scores (~0.03): absolute thresholds
+    # tuned for the reranker would drop every RRF-scored variant
+    import main
+    monkeypatch.setattr(main, "SEARCH_MODE", "hybrid")
+    monkeypatch.setattr(main, "SEARCH_CONFIDENT_SCORE", 0.8)
+    merger = main.variant_merger()
+    assert (merger.fusion, merger.min_score, merger.confident_score) == ("rrf", None, None)
+    merger.add([result(1, 0.0164), result(2, 0.0161)])
+    merger.add([result(2, 0.92), result(3, 0.40)])
+    assert ids(merger.results()) == [2, 1, 3]
+
+
+def test_variant_merger_outside_hybrid_mode(monkeypatch):
+    import main
+    monkeypatch.setattr(main, "SEARCH_MODE", "rerank")
+    monkeypatch.setattr(main, "SEARCH_FUSION", "max")
+    monkeypatch.setattr(main, "SEARCH_CONFIDENT_SCORE", 0.8)
+    merger = main.variant_merger()
+    assert (merger.fusion, merger.min_score, merger.confident_score) == ("max", 0.003, 0.8)
+    monkeypatch.setattr(main, "SEARCH_FUSION", "rrf")
+    assert main.variant_merger().confident_score is None
@@ -0,0 +1,99 @@
+import pytest
+
+from pinecone_vdb.lexical_index import LexicalIndex, tokenize
+from pinecone_vdb.vector_search import SearchResult
+
+NAMES = [
+    "Organic Whole Milk",
+    "Whole Milk",
+    "Granny Smith Apples",
+    "Apples",
+    "Cheddar Cheese",
+    "Baby Food Bananas",
+    "Almond Milk Original",
+    "Almond Milk Vanilla",
+]
+
+
+def product(product_id: int, name: str) -> SearchResult:
+    return SearchResult(product_id, name, "Grocery", "", "A1", 0.0, name)
+
+
+@pytest.fixture
+def index():
+    return LexicalIndex([product(i, name) for i, name in enumerate(NAMES, 1)])
+
+
+def names(match):
+    return [r.item_name for r in match.results]
+
+
+def test_tokenize_folds_plurals_and_punctuation():
+    assert tokenize("Apples, GLASS & eggs!") == ["apple", "glass", "egg"]
+
+
+def test_exact_mention_in_a_sentence(index):
+    match = index.lookup("do you have whole milk?")
+    assert (match.method, match.confident, names(match)) == ("exact", True, ["Whole Milk"])
+    assert match.results[0].score == 1.0
+
+
+def test_longest_mention_wins(index):
+    # "apples" is inside "granny smith apples", so only the longer name is meant
+    assert names(index.lookup("where are the granny smith apples")) == ["Granny Smith Apples"]
+
+
+def test_exact_needs_no_more_than_max_results():
+    catalog = [product(i, "Bananas") for i in range(1, 7)]
+    match = LexicalIndex(catalog, max_results=5).lookup("bananas")
+    assert match.method != "exact"
+    assert LexicalIndex(catalog, max_results=6).lookup("bananas").method == "exact"
+
+
+def test_reordered_name_resolves_by_token_cover(index):
+    # "Whole Milk" is covered too, but it is a subset of the longer name
+    match = index.lookup("milk organic whole")
+    assert (match.method, match.confident, names(match)) == ("token", True, ["Organic Whole Milk"])
+    assert match.confidence == 0.95
+
+
+def test_fuzzy_match_for_a_misheard_name(index):
+    match = index.lookup("chedder cheese please")
+    assert (match.method, match.confident, names(match)) == ("fuzzy", True, ["Cheddar Cheese"])
+    assert index.min_fuzzy_similarity <= match.confidence < 1.0
+
+
+def test_fuzzy_needs_the_name_to_be_covered(index):
+    # Similar enough to "Baby Food Bananas", but most of that name was not said
+    match = index.lookup("baby food")
+    assert not match.confident
+    assert match.results == []
+
+
+def test_fuzzy_needs_a_margin_over_the_runner_up():
+    # "Chedar Cheese" is almost as close as the best match: fall through to vector search
+    query = "chedder cheese"
+    assert LexicalIndex([product(1, "Cheddar Cheese"), product(2, "Cheddar Chess")]).lookup(query).confident
+    match = LexicalIndex([product(1, "Cheddar Cheese"), product(2, "Chedar Cheese")]).lookup(query)
+    assert (match.method, match.confident, match.results) == ("none", False, [])
+    assert match.confidence >= 0.75  # similar enough on its own
+
+
+def test_similarity_threshold_is_configurable():
+    catalog = [product(1, "Cheddar Cheese")]
+    assert LexicalIndex(catalog).lookup("chedder cheese").confident
+    assert not LexicalIndex(catalog, min_fuzzy_similarity=0.95).lookup("chedder cheese").confident
+
+
+@pytest.mark.parametrize("query", ["", "?!", "where is it please", "hello there"])
+def test_queries_without_product_words(index, query):
+    match = index.lookup(query)
+    assert (match.method, match.confident, match.results) == ("none", False, [])
+
+
+def test_stats_count_fast_path_lookups(index):
+    index.lookup("whole milk")
+    index.lookup("almond milk")
+    assert index.stats.lookups == 2
+    assert index.stats.fast_path == 1
+    assert index.stats.to_dict()["by_method"] == {"exact": 1, "none": 1}
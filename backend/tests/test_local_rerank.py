@@ -0,0 +1,81 @@
+import sys
+import types
+
+import pytest
+
+from pinecone_vdb.local_rerank import CrossEncoderScorer, LocalRerankStage
+from pinecone_vdb.vector_search import SearchResult
+
+
+class Identity:
+    """Stands in for torch.nn.Identity (checked by class name)."""
+
+
+class Sigmoid:
+    pass
+
+
+def install_cross_encoder(monkeypatch, activation, outputs):
+    """Replace sentence_transformers with a CrossEncoder that returns `outputs` in order."""
+    class CrossEncoder:
+        def __init__(self, model_name, device="cpu"):
+            if activation is not None:
+                self.activation_fn = activation
+
+        def predict(self, pairs, batch_size=32, show_progress_bar=False):
+            assert len(pairs) == len(outputs)
+            return list(outputs)
+
+    module = types.ModuleType("sentence_transformers")
+    module.CrossEncoder = CrossEncoder
+    monkeypatch.setitem(sys.modules, "sentence_transformers", module)
+
+
+@pytest.mark.parametrize("activation", [Identity(), None])
+def test_logits_map_to_probabilities_in_order(monkeypatch, activation):
+    logits = [9.2, -11.5, 0.0, 3.1, -0.4]
+    install_cross_encoder(monkeypatch, activation, logits)
+    scorer = CrossEncoderScorer("stub")
+    scores = scorer([("milk", f"doc {i}") for i in range(len(logits))])
+
+    assert scorer.outputs_logits
+    assert all(0.0 < s < 1.0 for s in scores)
+    assert scores[2] == pytest.approx(0.5)
+    assert sorted(range(len(scores)), key=scores.__getitem__) == sorted(range(len(logits)), key=logits.__getitem__)
+
+
+def test_probability_outputs_pass_through(monkeypatch):
+    install_cross_encoder(monkeypatch, Sigmoid(), [0.91, 0.12])
+    scorer = CrossEncoderScorer("stub")
+
+    assert not scorer.outputs_logits
+    assert scorer([("milk", "a"), ("milk", "b")]) == pytest.approx([0.91, 0.12])
+
+
+def test_default_activation_function_of_older_releases(monkeypatch):
+    install_cross_encoder(monkeypatch, None, [2.0])
+    # sentence-transformers before 4 named the attribute default_activation_function
+    module = sys.modules["sentence_transformers"]
+    original = module.CrossEncoder.__init__
+
+    def init(self, model_name, device="cpu"):
+        original(self, model_name, device)
+        self.default_activation_function = Sigmoid()
+
+    monkeypatch.setattr(module.CrossEncoder, "__init__", init)
+    assert not CrossEncoderScorer("stub").outputs_logits
+
+
+def test_stage_ranks_by_sigmoid_scores(monkeypatch):
+    install_cross_encoder(monkeypatch, Identity(), [-2.0, 4.0, 1.0])
+    stage = LocalRerankStage(CrossEncoderScorer("stub"), window_ms=0)
+    candidates = [
+        SearchResult(i, f"Item {i}", "Dairy", "", "A1", 0.0, f"Item {i}") for i in (1, 2, 3)
+    ]
+    try:
+        ranked = stage.rerank("milk", candidates, top_n=2)
+    finally:
+        stage.close()
+
+    assert [r.product_id for r in ranked] == [2, 3]
+    assert all(0.0 < r.score < 1.0 for r in ranked)
@@ -0,0 +1,158 @@
+import asyncio
+
+import pytest
+
+from pinecone_vdb.topk import TopKMerger
+from pinecone_vdb.response_templates import FormattedResults
+from pinecone_vdb.vector_search import SearchResult
+from pinecone_vdb.warmup import AnswerCache
+
+
+def result(product_id: int, score: float) -> SearchResult:
+    return SearchResult(product_id, f"Item {product_id}", "Grocery", "", "A1", score, f"Item {product_id}")
+
+
+def ranked(*pairs):
+    return [result(product_id, score) for product_id, score in pairs]
+
+
+def ids(results):
+    return [r.product_id for r in results]
+
+
+def test_max_keeps_each_products_best_score():
+    merger = TopKMerger(k=3)
+    merger.add(ranked((1, 0.9), (2, 0.5), (3, 0.4)))
+    merger.add(ranked((3, 0.95), (2, 0.3)))
+    assert [(r.product_id, r.score) for r in merger.results()] == [(3, 0.95), (1, 0.9), (2, 0.5)]
+
+
+def test_improved_product_does_not_leave_a_stale_entry_behind():
+    # Product 1's old 0.1 entry is still on the heap (marked dead) after it improves;
+    # the cut-off must come from the live entries, not the stale one
+    merger = TopKMerger(k=2)
+    merger.add(ranked((1, 0.1), (2, 0.5)))
+    merger.add(ranked((1, 0.8)))
+    merger.add(ranked((3, 0.3)))
+    assert ids(merger.results()) == [1, 2]
+    merger.add(ranked((3, 0.6)))
+    assert ids(merger.results()) == [1, 3]
+    assert len(merger) == 2
+
+
+def test_max_stops_reading_a_list_below_the_cut_off():
+    merger = TopKMerger(k=2)
+    merger.add(ranked((1, 0.9), (2, 0.8)))
+    # 3 cannot place; 4 would, but the list is assumed best-first
+    merger.add(ranked((3, 0.7), (4, 0.99)))
+    assert ids(merger.results()) == [1, 2]
+
+
+def test_max_min_score_drops_the_tail():
+    merger = TopKMerger(k=5, min_score=0.5)
+    merger.add(ranked((1, 0.9), (2, 0.4), (3, 0.6)))
+    assert ids(merger.results()) == [1]
+
+
+def test_ties_keep_arrival_order():
+    merger = TopKMerger(k=2)
+    merger.add(ranked((1, 0.5)))
+    merger.add(ranked((2, 0.5), (3, 0.5)))
+    assert ids(merger.results()) == [1, 2]
+
+
+def test_k_none_keeps_every_product():
+    merger = TopKMerger(k=None)
+    merger.add(ranked((1, 0.1), (2, 0.2)))
+    merger.add(ranked((3, 0.3)))
+    assert ids(merger.results()) == [3, 2, 1]
+    rrf = TopKMerger(k=None, fusion="rrf")
+    rrf.add(ranked((1, 0.1), (2, 0.2), (3, 0.3)))
+    assert ids(rrf.results()) == [1, 2, 3]
+
+
+def test_done_needs_k_confident_results():
+    merger = TopKMerger(k=2, confident_score=0.8)
+    merger.add(ranked((1, 0.9), (2, 0.5)))
+    assert not merger.done
+    merger.add(ranked((2, 0.85)))  # the improvement, not the stale 0.5, sets the floor
+    assert merger.done
+    assert not TopKMerger(k=2).done
+
+
+def test_rrf_fuses_by_rank():
+    merger = TopKMerger(k=2, fusion="rrf", rrf_k=60)
+    merger.add(ranked((1, 0.9), (2, 0.8)))
+    merger.add(ranked((2, 0.9), (3, 0.8)))
+    top = merger.results()
+    assert ids(top) == [2, 1]
+    assert top[0].score == pytest.approx(1 / 62 + 1 / 61)
+    assert not merger.done
+
+
+def test_rrf_min_score_filters_before_ranking():
+    merger = TopKMerger(k=5, fusion="rrf", min_score=0.5)
+    merger.add(ranked((1, 0.1), (2, 0.9)))
+    top = merger.results()
+    assert ids(top) == [2]
+    assert top[0].score == pytest.approx(1 / 61)  # the dropped result took no rank
+
+
+def test_rrf_rejects_confident_score_and_unknown_fusions():
+    with pytest.raises(ValueError):
+        TopKMerger(fusion="rrf", confident_score=0.8)
+    with pytest.raises(ValueError):
+        TopKMerger(fusion="sum")
+
+
+class FakeEngine:
+    def render_results_for_agent(self, results, style):
+        return FormattedResults(bool(results), tuple(results), " ".join(r.item_name for r in results))
+
+
+def search_products(monkeypatch, delays, results):
+    """Run ElevenLabsAgent.search_products over fake variant searches; returns (answer, answer cache)."""
+    import main
+
+    async def fake_search(engine, query, top_n=5):
+        await asyncio.sleep(delays[query])
+        return results[query]
+
+    cache = AnswerCache(ttl=60)
+    monkeypatch.setattr(main, "vector_search", FakeEngine())
+    monkeypatch.setattr(main, "lexical_index", None)
+    monkeypatch.setattr(main, "search_in_thread", fake_search)
+    monkeypatch.setattr(main, "answer_cache", cache)
+    monkeypatch.setattr(main, "SEARCH_MODE", "rerank")
+    monkeypatch.setattr(main, "SEARCH_FUSION", "max")
+    monkeypatch.setattr(main, "SEARCH_CONFIDENT_SCORE", 0.8)
+    answer = asyncio.run(main.ElevenLabsAgent().search_products("recommend something"))
+    return answer, cache
+
+
+def confident(first_id):
+    return ranked(*((product_id, 0.9) for product_id in range(first_id, first_id + 5)))
+
+
+def test_early_exit_waits_for_the_customers_own_query(monkeypatch):
+    # A variant alone is confident first, but the answer must include the query itself
+    delays = {"recommend something": 0.05, "popular": 0, "best": 0.5, "top": 0.5}
+    results = {
+        "recommend something": ranked((100, 0.95)),
+        "popular": confident(1), "best": confident(10), "top": confident(20),
+    }
+    answer, cache = search_products(monkeypatch, delays, results)
+    assert ids(answer.items)[0] == 100
+    assert not {10, 20} & set(ids(answer.items))
+    assert cache.get("recommend something") is None  # a cut-short answer is not cached
+
+
+def test_full_answer_is_cached(monkeypatch):
+    delays = dict.fromkeys(["recommend something", "popular", "best", "top"], 0)
+    results = {
+        "recommend something": ranked((100, 0.5)),
+        "popular": ranked((1, 0.4)), "best": ranked((2, 0.3)), "top": ranked((3, 0.2)),
+    }
+    answer, cache = search_products(monkeypatch, delays, results)
+    assert ids(answer.items) == [100, 1, 2, 3]
+    assert cache.get("recommend something") == answer